@@ -1,13 +1,34 @@
-from datetime import datetime
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import parse_date, parse_time
+
 _RESERVATIONS = "reservations.txt"
 
+# The whole receipt as one template, printed with a single call
+RECEIPT = (
+    "Reservation number: %d\n"
+    "Booker: %s\n"
+    "Date: %s\n"
+    "Start time: %s\n"
+    "Number of hours: %s\n"
+    "Hourly price: %s €\n"
+    "Total price: %s €\n"
+    "Paid: %s\n"
+    "Location: %s\n"
+    "Phone: %s\n"
+    "Email: %s\n"
+)
+
 def main():
     with open(_RESERVATIONS, 'r', encoding="utf-8") as r:
         texts = r.read().strip().split('|')
         reservation = int(texts[0])
         name = texts[1].strip()
-        date = datetime.strptime(texts[2].strip(), "%Y-%m-%d").date()
-        start = datetime.strptime(texts[3].strip(), "%H:%M").time()
+        date = parse_date(texts[2].strip())
+        start = parse_time(texts[3].strip())
         hours = float(texts[4])
         price = float(texts[5])
         paid = texts[6].strip() == "True"
@@ -17,18 +38,11 @@ def main():
 
         total = hours * price
 
-        print(f"Reservation number: {reservation}")
-        print(f"Booker: {name}")
-        print(f"Date: {date}")
-        print(f"Start time: {start}")
-        print(f"Number of hours: {hours}")
-        print(f"Hourly price: {price:.2f} €".replace('.', ','))
-        print(f"Total price: {total:.2f} €".replace('.', ','))
-        print(f"Paid: {'Yes' if paid else 'No'}")
-        print(f"Location: {room}")
-        print(f"Phone: {phone}")
-        print(f"Email: {email}")
-        print()
+        print(RECEIPT % (
+            reservation, name, date, start, hours,
+            f"{price:.2f}".replace('.', ','), f"{total:.2f}".replace('.', ','),
+            'Yes' if paid else 'No', room, phone, email,
+        ))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+"""
+Benchmarks for the TaskB receipts on generated reservations
+
+Usage:
+ python benchmark.py receipts [rows]
+"""
+
+from datetime import date, timedelta
+import io
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time as timer
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from receipts import render_receipts, write_receipt_files
+from shared.helpers import ReportSink
+from task_b import print_receipt, read_reservations
+
+NAMES = ["Anna Virtanen", "Matti Korhonen", "Laura Nieminen", "Jussi Mäkinen", "Sanna Heikkinen"]
+ROOMS = ["Meeting Room A", "Meeting Room B", "Conference Hall", "Sauna"]
+FILE_ROWS = 10_000  # receipts written as separate files, at most
+
+
+def generate_reservations(filename: str, rows: int, seed: int = 42) -> None:
+    """Writes a reservations.txt style file with one reservation per line."""
+    rng = random.Random(seed)
+    first = date(2025, 1, 1)
+    with open(filename, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            name = rng.choice(NAMES)
+            day = first + timedelta(days=rng.randrange(365))
+            f.write(
+                f"{100 + i}|{name}|{day.isoformat()}|{rng.randrange(8, 20):02d}:{rng.choice((0, 30)):02d}|"
+                f"{rng.randint(1, 6)}|{rng.randint(500, 9999) / 100}|{rng.random() < 0.7}|"
+                f"{rng.choice(ROOMS)}|040{rng.randrange(10**7):07d}|"
+                f"{name.lower().replace(' ', '.').replace('ä', 'a')}@example.com\n"
+            )
+
+
+def report(label: str, rows: int, seconds: float) -> None:
+    print(f"{label:<28} {seconds:8.3f} s  {rows / seconds:12,.0f} receipts/s")
+
+
+def print_receipts(reservations: list[dict], sink: ReportSink) -> None:
+    """The printer chain of task_b.py, with the same blank line between receipts."""
+    for i, r in enumerate(reservations):
+        if i:
+            sink.writeline()
+        print_receipt(r, sink)
+
+
+def bench_receipts(directory: str, rows: int) -> None:
+    """Compares the printer chain with the compiled template, into one stream and into files."""
+    filename = os.path.join(directory, "reservations.txt")
+    generate_reservations(filename, rows)
+    reservations = list(read_reservations(filename))
+
+    chain = io.StringIO()
+    start = timer.perf_counter()
+    with ReportSink(chain) as sink:
+        print_receipts(reservations, sink)
+    report("printer chain: one stream", rows, timer.perf_counter() - start)
+
+    compiled = io.StringIO()
+    start = timer.perf_counter()
+    with ReportSink(compiled) as sink:
+        render_receipts(reservations, sink)
+    report("template: one stream", rows, timer.perf_counter() - start)
+    print(f"identical output: {compiled.getvalue() == chain.getvalue()}")
+
+    subset = reservations[:FILE_ROWS]
+    start = timer.perf_counter()
+    for r in subset:
+        with ReportSink.to_file(os.path.join(directory, f"chain_{r['id']}.txt")) as sink:
+            print_receipt(r, sink)
+    report("printer chain: files", len(subset), timer.perf_counter() - start)
+    start = timer.perf_counter()
+    write_receipt_files(subset, os.path.join(directory, "receipts"))
+    report("template: files", len(subset), timer.perf_counter() - start)
+
+
+BENCHMARKS = {
+    "receipts": bench_receipts,
+}
+
+
+def main() -> None:
+    name = sys.argv[1] if len(sys.argv) > 1 else "receipts"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    print(f"Benchmark '{name}' on {rows:,} reservations")
+    with tempfile.TemporaryDirectory() as tmp:
+        BENCHMARKS[name](tmp, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Receipts rendered from one compiled template
+
+The printer chain in task_b.py formats a receipt line by line: eleven
+function calls, two strftime calls and a sink write per line. Here the
+layout is joined once into a single %-format template, and a receipt is
+rendered with one tuple of values and one % operation. The output is the
+same text the printer chain writes.
+
+ - render_receipts writes many receipts to one buffered ReportSink,
+   separated by a blank line
+ - write_receipt_files writes one receipt_<id>.txt file per reservation
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import os
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import ReportSink
+
+# (label, format) of every receipt line, in print order
+RECEIPT_LINES = [
+    ("Reservation number", "%d"),
+    ("Booker", "%s"),
+    ("Date", "%02d.%02d.%04d"),
+    ("Start time", "%02d.%02d"),
+    ("Number of hours", "%s"),
+    ("Hourly price", "%s €"),
+    ("Total price", "%s €"),
+    ("Paid", "%s"),
+    ("Location", "%s"),
+    ("Phone", "%s"),
+    ("Email", "%s"),
+]
+
+RECEIPT_TEMPLATE = "".join(f"{label}: {fmt}\n" for label, fmt in RECEIPT_LINES)
+
+
+def receipt_values(r: dict) -> tuple:
+    """Returns the values of a reservation in RECEIPT_TEMPLATE order."""
+    d = r["date"]
+    start = r["start"]
+    return (
+        r["id"],
+        r["name"],
+        d.day, d.month, d.year,
+        start.hour, start.minute,
+        r["hours"],
+        ("%.2f" % r["price"]).replace(".", ","),
+        ("%.2f" % (r["hours"] * r["price"])).replace(".", ","),
+        "Yes" if r["paid"] else "No",
+        r["room"],
+        r["phone"],
+        r["email"],
+    )
+
+
+def render_receipt(r: dict) -> str:
+    """Returns the receipt of one reservation, ending with a line break."""
+    return RECEIPT_TEMPLATE % receipt_values(r)
+
+
+def render_receipts(reservations: Iterable[dict], sink: ReportSink) -> int:
+    """Writes the receipts to the sink, a blank line between two receipts. Returns the count."""
+    write = sink.write
+    template = RECEIPT_TEMPLATE
+    count = 0
+    for r in reservations:
+        if count:
+            write("\n")
+        write(template % receipt_values(r))
+        count += 1
+    return count
+
+
+def write_receipt_files(reservations: Iterable[dict], directory: str) -> int:
+    """
+    Writes each receipt to receipt_<id>.txt in the directory and returns the
+    count. A reservation number that appears twice keeps the last receipt.
+    """
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for r in reservations:
+        with open(os.path.join(directory, f"receipt_{r['id']}.txt"), "w", encoding="utf-8") as f:
+            f.write(RECEIPT_TEMPLATE % receipt_values(r))
+        count += 1
+    return count
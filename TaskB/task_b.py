@@ -1,53 +1,70 @@
-from datetime import datetime
+import argparse
+import pathlib
+import sys
 
-_RESERVATIONS = "reservations.txt"
-
-def print_reservation_number(r):
-    print(f"Reservation number: {r['id']}")
-
-def print_booker(r):
-    print(f"Booker: {r['name']}")
-
-def print_date(r):
-    print(f"Date: {r['date'].strftime('%d.%m.%Y')}")
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
 
-def print_start_time(r):
+from receipts import render_receipts, write_receipt_files
+from shared.helpers import ReportSink, parse_date, parse_time
 
-    print(f"Start time: {r['start'].strftime('%H.%M')}")
-
-def print_hours(r):
-    print(f"Number of hours: {r['hours']}")
+_RESERVATIONS = "reservations.txt"
 
-def print_hourly_rate(r):
-    print(f"Hourly price: {r['price']:.2f} €".replace(".", ","))
+def print_reservation_number(r, out):
+    out.writeline(f"Reservation number: {r['id']}")
 
-def print_total_price(r):
-    total = r["hours"] * r["price"]
-    print(f"Total price: {total:.2f} €".replace(".", ","))
+def print_booker(r, out):
+    out.writeline(f"Booker: {r['name']}")
 
-def print_paid(r):
-    print(f"Paid: {'Yes' if r['paid'] else 'No'}")
+def print_date(r, out):
+    out.writeline(f"Date: {r['date'].strftime('%d.%m.%Y')}")
 
-def print_venue(r):
-    print(f"Location: {r['room']}")
+def print_start_time(r, out):
 
-def print_phone(r):
-    print(f"Phone: {r['phone']}")
+    out.writeline(f"Start time: {r['start'].strftime('%H.%M')}")
 
-def print_email(r):
-    print(f"Email: {r['email']}")
+def print_hours(r, out):
+    out.writeline(f"Number of hours: {r['hours']}")
 
-def main():
-    with open(_RESERVATIONS, encoding="utf-8") as f:
-        reservation_id, name, date, start, hours, price, paid, room, phone, email = (
-            f.read().strip().split("|")
-        )
+def print_hourly_rate(r, out):
+    out.writeline(f"Hourly price: {r['price']:.2f} €".replace(".", ","))
 
-    reservation = {
+def print_total_price(r, out):
+    total = r["hours"] * r["price"]
+    out.writeline(f"Total price: {total:.2f} €".replace(".", ","))
+
+def print_paid(r, out):
+    out.writeline(f"Paid: {'Yes' if r['paid'] else 'No'}")
+
+def print_venue(r, out):
+    out.writeline(f"Location: {r['room']}")
+
+def print_phone(r, out):
+    out.writeline(f"Phone: {r['phone']}")
+
+def print_email(r, out):
+    out.writeline(f"Email: {r['email']}")
+
+PRINTERS = [
+    print_reservation_number,
+    print_booker,
+    print_date,
+    print_start_time,
+    print_hours,
+    print_hourly_rate,
+    print_total_price,
+    print_paid,
+    print_venue,
+    print_phone,
+    print_email,
+]
+
+def parse_reservation(line):
+    reservation_id, name, date, start, hours, price, paid, room, phone, email = line.strip().split("|")
+    return {
         "id": int(reservation_id),
         "name": name.strip(),
-        "date": datetime.strptime(date.strip(), "%Y-%m-%d").date(),
-        "start": datetime.strptime(start.strip(), "%H:%M").time(),  # convert to time
+        "date": parse_date(date.strip()),
+        "start": parse_time(start.strip()),  # convert to time
         "hours": float(hours.strip()),
         "price": float(price.strip()),
         "paid": paid.strip() == "True",
@@ -56,22 +73,29 @@ def main():
         "email": email.strip(),
     }
 
-    printers = [
-        print_reservation_number,
-        print_booker,
-        print_date,
-        print_start_time,
-        print_hours,
-        print_hourly_rate,
-        print_total_price,
-        print_paid,
-        print_venue,
-        print_phone,
-        print_email,
-    ]
-
-    for printer in printers:
-        printer(reservation)
+def read_reservations(filename):
+    """Yields one reservation per non-empty line of the file."""
+    with open(filename, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield parse_reservation(line)
+
+def print_receipt(reservation, out):
+    for printer in PRINTERS:
+        printer(reservation, out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prints the receipt of every reservation.")
+    parser.add_argument("file", nargs="?", default=_RESERVATIONS, help="reservations file, one per line")
+    parser.add_argument("--out-dir", help="write one receipt_<id>.txt per reservation to this directory")
+    args = parser.parse_args(argv)
+
+    reservations = read_reservations(args.file)
+    if args.out_dir:
+        write_receipt_files(reservations, args.out_dir)
+        return
+    with ReportSink() as sink:
+        render_receipts(reservations, sink)
 
 if __name__ == "__main__":
     main()
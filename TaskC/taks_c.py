@@ -20,7 +20,28 @@ int | str | str | str | date | time | int | float | bool | str | datetime
 
 """
 
-from datetime import datetime
+import argparse
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+import os
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import (
+    Quarantine,
+    ReportSink,
+    open_sink,
+    parse_date,
+    parse_datetime,
+    parse_time,
+    read_lines,
+    split_file,
+)
+from shared.instrument import Instrumentation, add_profile_argument
+from shared.snapshot import read_snapshot, source_key, write_snapshot
 
 HEADERS = [
     "reservationId",
@@ -45,17 +66,14 @@ def convert_reservation_data(reservation: list) -> list:
     email = reservation[2]
     phone = reservation[3]
 
-    reservation_date = datetime.strptime(reservation[4], "%Y-%m-%d").date()
-
-    time_str = reservation[5]
-    time_format = "%H:%M:%S" if time_str.count(":") == 2 else "%H:%M"
-    reservation_time = datetime.strptime(time_str, time_format).time()
+    reservation_date = parse_date(reservation[4])
+    reservation_time = parse_time(reservation[5])
 
     duration_hours = int(reservation[6])
     price = float(reservation[7])
     confirmed = reservation[8] == "True"
     reserved_resource = reservation[9]
-    created_at = datetime.strptime(reservation[10], "%Y-%m-%d %H:%M:%S")
+    created_at = parse_datetime(reservation[10])
 
     return [
         reservation_id,
@@ -72,66 +90,234 @@ def convert_reservation_data(reservation: list) -> list:
     ]
 
 
-def fetch_reservations(reservation_file: str) -> list:
+def fetch_reservations(reservation_file: str, quarantine: Quarantine | None = None) -> list:
     """
     Reads reservations from a file and returns the reservations converted
     You don't need to modify this function!
 
     Parameters:
      reservation_file (str): Name of the file containing the reservations
+     quarantine (Quarantine): Optional. Lines the converter rejects are
+      quarantined with their line numbers and reasons instead of raising
 
     Returns:
      reservations (list): Read and converted reservations
     """
     reservations = []
     with open(reservation_file, "r", encoding="utf-8") as f:
+        if quarantine is not None:
+            return list(quarantine.convert_lines(f, convert_reservation_data))
         for line in f:
             fields = line.split("|")
             reservations.append(convert_reservation_data(fields))
     return reservations
 
 
-def confirmed_reservations(reservations: list[list]) -> None:
-    for r in reservations:
+EPOCH = datetime(1970, 1, 1)
+
+
+def reservations_to_columns(reservations: list) -> dict:
+    """
+    Convert reservations into typed columns for a binary snapshot
+
+    Parameters:
+     reservations (list): Converted reservations
+
+    Returns:
+     columns (dict): Column name -> array or list of strings
+    """
+    return {
+        "ids": array("q", (r[0] for r in reservations)),
+        "names": [r[1] for r in reservations],
+        "emails": [r[2] for r in reservations],
+        "phones": [r[3] for r in reservations],
+        "dates": array("i", (r[4].toordinal() for r in reservations)),
+        "times": array("i", (r[5].hour * 3600 + r[5].minute * 60 + r[5].second for r in reservations)),
+        "durations": array("q", (r[6] for r in reservations)),
+        "prices": array("d", (r[7] for r in reservations)),
+        "confirmed": array("B", (r[8] for r in reservations)),
+        "resources": [r[9] for r in reservations],
+        "created": array("q", ((r[10] - EPOCH) // timedelta(seconds=1) for r in reservations)),
+    }
+
+
+def columns_to_reservations(columns: dict) -> list:
+    """
+    Convert snapshot columns back into reservations
+
+    Parameters:
+     columns (dict): Columns from reservations_to_columns
+
+    Returns:
+     reservations (list): Reservations in the same form as convert_reservation_data
+    """
+    dates = {o: date.fromordinal(o) for o in set(columns["dates"])}
+    times = {
+        seconds: time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+        for seconds in set(columns["times"])
+    }
+    return [
+        list(row)
+        for row in zip(
+            columns["ids"],
+            columns["names"],
+            columns["emails"],
+            columns["phones"],
+            map(dates.__getitem__, columns["dates"]),
+            map(times.__getitem__, columns["times"]),
+            columns["durations"],
+            columns["prices"],
+            map(bool, columns["confirmed"]),
+            columns["resources"],
+            (EPOCH + timedelta(seconds=s) for s in columns["created"]),
+        )
+    ]
+
+
+def fetch_reservations_cached(reservation_file: str) -> list:
+    """
+    Reads reservations like fetch_reservations, but loads them from the binary
+    snapshot next to the file when the file has not changed since it was written
+
+    Parameters:
+     reservation_file (str): Name of the file containing the reservations
+
+    Returns:
+     reservations (list): Read and converted reservations
+    """
+    snapshot = read_snapshot(reservation_file)
+    if snapshot is not None:
+        return columns_to_reservations(snapshot[1])
+    key = source_key(reservation_file)  # before reading, so a file changed meanwhile is not cached as current
+    reservations = fetch_reservations(reservation_file)
+    write_snapshot(reservation_file, key, len(reservations), reservations_to_columns(reservations))
+    return reservations
+
+
+def parse_chunk(reservation_file: str, start: int, end: int) -> list:
+    """
+    Converts the reservations in one byte range of the file
+
+    Parameters:
+     reservation_file (str): Name of the file containing the reservations
+     start (int): First byte of the range, at the start of a line
+     end (int): Byte after the range, at the start of a line or end of file
+
+    Returns:
+     reservations (list): Converted reservations of the range
+    """
+    return [
+        convert_reservation_data(line.split("|"))
+        for line in read_lines(reservation_file, start, end)
+    ]
+
+
+def total_chunk(reservation_file: str, start: int, end: int) -> tuple:
+    """
+    Counts reservations and confirmed revenue in one byte range of the file
+
+    Returns:
+     totals (tuple): (confirmed count, not confirmed count, confirmed revenue)
+    """
+    confirmed_count = 0
+    not_confirmed_count = 0
+    total = 0.0
+    for r in parse_chunk(reservation_file, start, end):
         if r[8]:
-            name = r[1]
-            resource = r[9]
-            date_str = r[4].strftime("%d.%m.%Y")
-            time_str = r[5].strftime("%H.%M")
-            print(f"- {name}, {resource}, {date_str} at {time_str}")
+            confirmed_count += 1
+            total += r[6] * r[7]
+        else:
+            not_confirmed_count += 1
+    return confirmed_count, not_confirmed_count, total
+
 
+def fetch_reservations_parallel(reservation_file: str, workers: int | None = None) -> list:
+    """
+    Reads reservations like fetch_reservations, but converts newline-aligned
+    chunks of the file in parallel processes
+
+    Parameters:
+     reservation_file (str): Name of the file containing the reservations
+     workers (int): Number of processes, defaults to the CPU count
 
-def long_reservations(reservations: list[list]) -> None:
+    Returns:
+     reservations (list): Read and converted reservations in file order
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_file(reservation_file, workers)
+    reservations = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(parse_chunk, reservation_file, start, end) for start, end in chunks]
+        for future in futures:
+            reservations.extend(future.result())
+    return reservations
+
+
+def reservation_totals_parallel(reservation_file: str, workers: int | None = None) -> list:
+    """
+    Counts reservations and confirmed revenue in parallel processes without
+    sending the reservations back
+
+    Parameters:
+     reservation_file (str): Name of the file containing the reservations
+     workers (int): Number of processes, defaults to the CPU count
+
+    Returns:
+     totals (list): One (confirmed, not confirmed, revenue) tuple per chunk in file order
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_file(reservation_file, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(total_chunk, reservation_file, start, end) for start, end in chunks]
+        return [future.result() for future in futures]
+
+
+def confirmed_reservations(reservations: list[list], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for r in reservations:
+            if r[8]:
+                name = r[1]
+                resource = r[9]
+                date_str = r[4].strftime("%d.%m.%Y")
+                time_str = r[5].strftime("%H.%M")
+                out.writeline(f"- {name}, {resource}, {date_str} at {time_str}")
+
+
+def long_reservations(reservations: list[list], sink: ReportSink | None = None) -> None:
     """
     Print long reservations
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
-    for r in reservations:
-        if r[6] >= 3:
+    with open_sink(sink) as out:
+        for r in reservations:
+            if r[6] >= 3:
+                name = r[1]
+                date_str = r[4].strftime("%d.%m.%Y")
+                time_str = r[5].strftime("%H.%M")
+                duration = r[6]
+                resource = r[9]
+                out.writeline(f"- {name}, {date_str} at {time_str}, duration {duration} h, {resource}")
+
+
+def confirmation_statuses(reservations: list[list], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for r in reservations:
             name = r[1]
-            date_str = r[4].strftime("%d.%m.%Y")
-            time_str = r[5].strftime("%H.%M")
-            duration = r[6]
-            resource = r[9]
-            print(f"- {name}, {date_str} at {time_str}, duration {duration} h, {resource}")
+            status = "Confirmed" if r[8] else "NOT Confirmed"
+            out.writeline(f"{name} \u2192 {status}")
 
 
-def confirmation_statuses(reservations: list[list]) -> None:
-       for r in reservations:
-        name = r[1]
-        status = "Confirmed" if r[8] else "NOT Confirmed"
-        print(f"{name} \u2192 {status}")
-
 
-
-def confirmation_summary(reservations: list[list]) -> None:
+def confirmation_summary(reservations: list[list], sink: ReportSink | None = None) -> None:
     """
     Print confirmation summary
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
     confirmed_count = 0
     not_confirmed_count = 0
@@ -142,64 +328,129 @@ def confirmation_summary(reservations: list[list]) -> None:
         else:
             not_confirmed_count += 1
 
-    print(f"- Confirmed reservations: {confirmed_count} pcs")
-    print(f"- Not confirmed reservations: {not_confirmed_count} pcs")
+    with open_sink(sink) as out:
+        out.writeline(f"- Confirmed reservations: {confirmed_count} pcs")
+        out.writeline(f"- Not confirmed reservations: {not_confirmed_count} pcs")
 
 
-def total_revenue(reservations: list[list]) -> None:
+def total_revenue(reservations: list[list], sink: ReportSink | None = None) -> None:
     total = 0.0
     for r in reservations:
         if r[8]:
             total += r[6] * r[7]
 
     amount_str = f"{total:.2f}".replace(".", ",")
-    print(f"Total revenue from confirmed reservations: {amount_str} €")
+    with open_sink(sink) as out:
+        out.writeline(f"Total revenue from confirmed reservations: {amount_str} €")
 
 
-def main():
-    """
-    Prints reservation information according to requirements
-    Reservation-specific printing is done in functions
-    """
-    reservations = fetch_reservations("reservations.txt")
-    # PART A -> Before continuing to part B, make sure that the following lines
-    # print all the reservation data and the correct data types to the console. 
-    # After that, you can remove this section or comment it out up to part B.
-    print(" | ".join(HEADERS))
-    print("------------------------------------------------------------------------")
-    for reservation in reservations:
-        print(" | ".join(str(x) for x in reservation))
-        data_types = [type(x).__name__ for x in reservation]
-        print(" | ".join(data_types))
-        print(
-            "------------------------------------------------------------------------"
-        )
+SECTION_TITLES = [
+    "1) Confirmed Reservations",
+    "2) Long Reservations (\u2265 3 h)",
+    "3) Reservation Confirmation Status",
+    "4) Confirmation Summary",
+    "5) Total Revenue from Confirmed Reservations",
+]
 
-    # PART B -> Build the output required in part B from this using
-    # the predefined functions and the necessary print statements.
 
-    #print("1) Confirmed Reservations")
-    # confirmed_reservations(reservations)
-    # Continue from here
-    print("1) Confirmed Reservations")
-    confirmed_reservations(reservations)
-    print()
+def report_sections(reservations: list[list]) -> list[list[str]]:
+    """
+    Build the lines of all five report sections in a single pass
 
-    print("2) Long Reservations (\u2265 3 h)")
-    long_reservations(reservations)
-    print()
+    Parameters:
+     reservations (list): Reservations
 
-    print("3) Reservation Confirmation Status")
-    confirmation_statuses(reservations)
-    print()
+    Returns:
+     sections (list): One list of output lines per section, matching the
+     section functions above
+    """
+    confirmed_lines = []
+    long_lines = []
+    status_lines = []
+    confirmed_count = 0
+    not_confirmed_count = 0
+    total = 0.0
 
-    print("4) Confirmation Summary")
-    confirmation_summary(reservations)
-    print()
+    for r in reservations:
+        name = r[1]
+        long = r[6] >= 3
+        if r[8] or long:
+            date_str = r[4].strftime("%d.%m.%Y")
+            time_str = r[5].strftime("%H.%M")
+        if r[8]:
+            confirmed_lines.append(f"- {name}, {r[9]}, {date_str} at {time_str}")
+            status_lines.append(f"{name} \u2192 Confirmed")
+            confirmed_count += 1
+            total += r[6] * r[7]
+        else:
+            status_lines.append(f"{name} \u2192 NOT Confirmed")
+            not_confirmed_count += 1
+        if long:
+            long_lines.append(f"- {name}, {date_str} at {time_str}, duration {r[6]} h, {r[9]}")
+
+    amount_str = f"{total:.2f}".replace(".", ",")
+    return [
+        confirmed_lines,
+        long_lines,
+        status_lines,
+        [
+            f"- Confirmed reservations: {confirmed_count} pcs",
+            f"- Not confirmed reservations: {not_confirmed_count} pcs",
+        ],
+        [f"Total revenue from confirmed reservations: {amount_str} €"],
+    ]
 
-    print("5) Total Revenue from Confirmed Reservations")
-    total_revenue(reservations)
 
+def main(argv=None):
+    """
+    Prints reservation information according to requirements
+    Reservation-specific printing is done in functions
+    """
+    parser = argparse.ArgumentParser(description="Prints the reservation report.")
+    parser.add_argument("--quarantine", metavar="FILE",
+                        help="read the text file, rejecting malformed lines to FILE instead of stopping")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    prof = Instrumentation.from_args(args.profile)
+    with prof.run():
+        with prof.stage("read"):
+            if args.quarantine:
+                with Quarantine(args.quarantine) as quarantine:
+                    reservations = fetch_reservations("reservations.txt", quarantine)
+                prof.count("rejected", len(quarantine))
+                if len(quarantine):
+                    print(f"{len(quarantine)} malformed line(s) written to {args.quarantine}", file=sys.stderr)
+            else:
+                reservations = fetch_reservations_cached("reservations.txt")
+        prof.count("reservations", len(reservations))
+        # PART A -> Before continuing to part B, make sure that the following lines
+        # print all the reservation data and the correct data types to the console. 
+        # After that, you can remove this section or comment it out up to part B.
+        with prof.stage("output"), ReportSink() as sink:
+            with prof.stage("part_a"):
+                sink.writeline(" | ".join(HEADERS))
+                sink.writeline("------------------------------------------------------------------------")
+                for reservation in reservations:
+                    sink.writeline(" | ".join(str(x) for x in reservation))
+                    data_types = [type(x).__name__ for x in reservation]
+                    sink.writeline(" | ".join(data_types))
+                    sink.writeline(
+                        "------------------------------------------------------------------------"
+                    )
+
+            # PART B -> Build the output required in part B from this using
+            # the predefined functions and the necessary print statements.
+
+            #print("1) Confirmed Reservations")
+            # confirmed_reservations(reservations)
+            # Continue from here
+            with prof.stage("sections"):
+                sections = report_sections(reservations)
+            for i, (title, lines) in enumerate(zip(SECTION_TITLES, sections)):
+                if i > 0:
+                    sink.writeline()
+                sink.writeline(title)
+                sink.writelines(lines)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,7 +1,15 @@
+import argparse
 import csv
-from typing import List
+import pathlib
+import sys
+from typing import List, Optional
 from datetime import datetime
 
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.instrument import Instrumentation, add_profile_argument
+from shared.meter_store import is_store, read_store
+
 CVS_FIlE_PATH = './TaskD/week42.csv'
 
 # Läser in CSV
@@ -17,6 +25,14 @@ def read_csv_file(file_path: str) -> List:
     return data
 
 
+def read_data(file_path: str) -> List:
+    """Reads the rows of a CSV file, or of a .mcol store written by shared/meter_store.py."""
+
+    if is_store(file_path):
+        return read_store(file_path).text_rows()
+    return read_csv_file(file_path)
+
+
 # Skriver ut data
 def print_data(data: List) -> None:
     """Prints the electricity consumption and production data in a formatted table."""
@@ -29,26 +45,32 @@ def print_data(data: List) -> None:
           f"{'v1':>8}{'v2':>8}{'v3':>8}")
     print("-" * 68)
 
+    # Hourly rows share their date, so it is only decoded when the day changes
+    prefix = None
+    date_key = ""
     for row in data[1:]:
-        dt = datetime.fromisoformat(row[0])
-        date_key = dt.strftime("%d.%m.%Y")
-        cons_v1 = to_kwh(float(row[1]))
-        cons_v2 = to_kwh(float(row[2]))
-        cons_v3 = to_kwh(float(row[3]))
-        prod_v1 = to_kwh(float(row[4]))
-        prod_v2 = to_kwh(float(row[5]))
-        prod_v3 = to_kwh(float(row[6]))
-        print(f"{date_key:<12} "
-              f"{format_kwh(cons_v1):>8}{format_kwh(cons_v2):>8}{format_kwh(cons_v3):>8} "
-              f"{format_kwh(prod_v1):>8}{format_kwh(prod_v2):>8}{format_kwh(prod_v3):>8}")
+        if row[0][:10] != prefix:
+            prefix = row[0][:10]
+            date_key = datetime.fromisoformat(row[0]).strftime("%d.%m.%Y")
+        values = [to_kwh(float(v)) for v in row[1:7]]
+        print(f"{date_key:<12} " + format_kwh_row(ROW_TEMPLATE, values))
  
 
 # Huvudfunktion
-def main() -> None:
+def main(argv: Optional[List[str]] = None) -> None:
     """main function to execute the program."""
 
-    data = read_csv_file(CVS_FIlE_PATH)
-    print_data(data)
+    parser = argparse.ArgumentParser(description="Prints the week 42 electricity table.")
+    parser.add_argument("file", nargs="?", default=CVS_FIlE_PATH, help="week CSV or .mcol store")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    prof = Instrumentation.from_args(args.profile)
+    with prof.run():
+        with prof.stage("read"):
+            data = read_data(args.file)
+        prof.count("rows", len(data) - 1)
+        with prof.stage("print"):
+            print_data(data)
 
 
 def to_kwh(wh: float) -> float:
@@ -62,6 +84,16 @@ def format_kwh(value_kwh: float) -> str:
     return f"{value_kwh:.2f}".replace(".", ",")
 
 
+# consumption v1-v3, then production v1-v3
+ROW_TEMPLATE = "%8.2f%8.2f%8.2f %8.2f%8.2f%8.2f"
+
+
+def format_kwh_row(template: str, values: List[float]) -> str:
+    """Formats a row of kWh values like format_kwh, with one replace for the whole row."""
+
+    return (template % tuple(values)).replace(".", ",")
+
+
 # Kör huvudfunktionen
 if __name__ == "__main__":
     main()
\ No newline at end of file
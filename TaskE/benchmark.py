@@ -0,0 +1,127 @@
+"""
+Benchmarks for TaskE on generated hourly meter data
+
+Usage:
+ python benchmark.py summaries [days]
+ python benchmark.py format [days]     (166667 days = 1M values)
+"""
+
+from datetime import datetime, timedelta
+import os
+import random
+import sys
+import tempfile
+import time as timer
+from typing import List, Sequence
+
+import task_e
+from task_e import (
+    DAY_ROW,
+    calculate_daily_summaries,
+    calculate_daily_summaries_numpy,
+    format_kwh,
+    format_kwh_row,
+    read_daily_summaries_numpy,
+    read_data,
+)
+
+HEADER = (
+    "Time;Consumption phase 1 Wh;Consumption phase 2 Wh;Consumption phase 3 Wh;"
+    "Production phase 1 Wh;Production phase 2 Wh;Production phase 3 Wh"
+)
+
+
+def format_kwh_column(values: Sequence[float]) -> List[str]:
+    """Formats a column of kWh values like format_kwh, with one replace for all of them."""
+    if not values:
+        return []
+    return ("%.2f\n" * len(values) % tuple(values)).replace(".", ",").split("\n")[:-1]
+
+
+def generate_week_file(filename: str, start: datetime, days: int, seed: int = 42) -> None:
+    """Writes a week*.csv style file with hourly rows for the given number of days."""
+    rng = random.Random(seed)
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(HEADER + "\n")
+        for hour in range(days * 24):
+            ts = start + timedelta(hours=hour)
+            values = [rng.randint(0, 900) for _ in range(3)] + [rng.randint(0, 400) for _ in range(3)]
+            f.write(ts.isoformat() + ";" + ";".join(map(str, values)) + "\n")
+
+
+def report(label: str, rows: int, seconds: float, unit: str = "rows") -> None:
+    print(f"{label:<28} {seconds:8.3f} s  {rows / seconds:12,.0f} {unit}/s")
+
+
+def bench_summaries(directory: str, days: int) -> None:
+    """Compares the pure-Python daily summaries with the NumPy backend."""
+    filename = os.path.join(directory, "week.csv")
+    generate_week_file(filename, datetime(2015, 1, 1), days)
+    hours = days * 24
+
+    start = timer.perf_counter()
+    rows = read_data(filename)
+    parsed = timer.perf_counter()
+    expected = calculate_daily_summaries(rows)
+    done = timer.perf_counter()
+    report("pure Python: summaries", hours, done - parsed)
+    report("pure Python: read + sum", hours, done - start)
+
+    if task_e.np is None:
+        print("NumPy is not installed, skipping the NumPy backend")
+        return
+    start = timer.perf_counter()
+    from_rows = calculate_daily_summaries_numpy(rows)
+    report("NumPy: summaries", hours, timer.perf_counter() - start)
+    start = timer.perf_counter()
+    from_file = read_daily_summaries_numpy(filename)
+    report("NumPy: loadtxt + sum", hours, timer.perf_counter() - start)
+    for result in (from_rows, from_file):
+        print(f"identical result: {result == expected and list(result) == list(expected)}")
+
+
+def bench_format(directory: str, days: int) -> None:
+    """Compares format_kwh per value with the row and column formatters on six values per day."""
+    rng = random.Random(42)
+    rows = [tuple(rng.randint(0, 21600) / 1000 for _ in range(6)) for _ in range(days)]
+    values = [v for row in rows for v in row]
+
+    start = timer.perf_counter()
+    expected = [
+        f"{format_kwh(r[0]):>8} {format_kwh(r[1]):>8} {format_kwh(r[2]):>8}     "
+        f"{format_kwh(r[3]):>8} {format_kwh(r[4]):>8} {format_kwh(r[5]):>8}"
+        for r in rows
+    ]
+    report("format_kwh per value", len(values), timer.perf_counter() - start, "values")
+
+    start = timer.perf_counter()
+    result = [format_kwh_row(DAY_ROW, r) for r in rows]
+    report("format_kwh_row", len(values), timer.perf_counter() - start, "values")
+    print(f"identical rows: {result == expected}")
+
+    start = timer.perf_counter()
+    expected_column = [format_kwh(v) for v in values]
+    report("format_kwh column", len(values), timer.perf_counter() - start, "values")
+
+    start = timer.perf_counter()
+    column = format_kwh_column(values)
+    report("format_kwh_column", len(values), timer.perf_counter() - start, "values")
+    print(f"identical column: {column == expected_column}")
+
+
+BENCHMARKS = {
+    "summaries": bench_summaries,
+    "format": bench_format,
+}
+
+
+def main() -> None:
+    name = sys.argv[1] if len(sys.argv) > 1 else "summaries"
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 10 * 365
+    print(f"Benchmark '{name}' with {size:,} days of hourly data")
+    with tempfile.TemporaryDirectory() as tmp:
+        BENCHMARKS[name](tmp, size)
+
+
+if __name__ == "__main__":
+    main()
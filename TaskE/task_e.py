@@ -1,7 +1,26 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import csv
 from dataclasses import dataclass
 from datetime import datetime, date
-from typing import Dict, List, Tuple
+import hashlib
+import json
+import os
+import pathlib
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.instrument import Instrumentation, add_profile_argument
+from shared.meter_store import MeterTable, is_store, read_store
+
+try:
+    import numpy as np
+except ImportError:  # the NumPy backend is optional
+    np = None
 
 
 @dataclass(frozen=True)
@@ -32,6 +51,16 @@ def format_kwh(value_kwh: float) -> str:
     return f"{value_kwh:.2f}".replace(".", ",")
 
 
+def format_kwh_row(template: str, values: Sequence[float]) -> str:
+    """
+    Formats values into a %-style row template of numeric fields such as
+    "%8.2f" and turns the decimal points into commas with one replace for the
+    whole row. Gives the same text as format_kwh per value, as long as the
+    template itself has no other dots.
+    """
+    return (template % tuple(values)).replace(".", ",")
+
+
 def format_fi_date(d: date) -> str:
     """Formats a date as dd.mm.yyyy."""
     return d.strftime("%d.%m.%Y")
@@ -49,9 +78,13 @@ def calculate_daily_summaries(rows: List[List[str]]) -> Dict[date, Totals]:
     """
     daily_wh: Dict[date, List[float]] = {}  # [c1,c2,c3,p1,p2,p3] in Wh
 
-    for row in rows[1:]:  
-        dt = datetime.fromisoformat(row[0])
-        day = dt.date()
+    # Hourly rows share their date, so it is only decoded when the day changes
+    prefix = None
+    day = date.min
+    for row in rows[1:]:
+        if row[0][:10] != prefix:
+            prefix = row[0][:10]
+            day = datetime.fromisoformat(row[0]).date()
         # Parse Wh values
         c1, c2, c3 = float(row[1]), float(row[2]), float(row[3])
         p1, p2, p3 = float(row[4]), float(row[5]), float(row[6])
@@ -76,6 +109,91 @@ def calculate_daily_summaries(rows: List[List[str]]) -> Dict[date, Totals]:
     return daily_kwh
 
 
+def calculate_daily_summaries_store(table: MeterTable) -> Dict[date, Totals]:
+    """
+    Same as calculate_daily_summaries, but from the typed columns of a
+    meter store (see shared/meter_store.py) instead of text rows.
+    """
+    daily_wh: Dict[int, List[float]] = {}  # date ordinal -> [c1,c2,c3,p1,p2,p3] in Wh
+    phases = [column.values for column in table.columns[1:7]]
+    for ordinal, *values in zip(table.days(), *phases):
+        sums = daily_wh.get(ordinal)
+        if sums is None:
+            sums = daily_wh[ordinal] = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        for i, value in enumerate(values):
+            sums[i] += float(value)
+
+    return {
+        date.fromordinal(ordinal): Totals(
+            cons=(to_kwh(vals[0]), to_kwh(vals[1]), to_kwh(vals[2])),
+            prod=(to_kwh(vals[3]), to_kwh(vals[4]), to_kwh(vals[5])),
+        )
+        for ordinal, vals in daily_wh.items()
+    }
+
+
+def _daily_totals_numpy(days: "np.ndarray", values: "np.ndarray") -> Dict[date, Totals]:
+    """
+    Sums Wh values per day with np.bincount and converts them to kWh Totals.
+    days holds a YYYY-MM-DD string per row, values the six phase columns.
+    bincount adds rows in order, so the sums equal the pure-Python loop.
+    """
+    if len(days) == 0:
+        return {}
+    unique_days, first_seen, day_idx = np.unique(days, return_index=True, return_inverse=True)
+    # Number days by first appearance to keep the dict order of the loop version
+    order = np.argsort(first_seen, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    day_idx = rank[day_idx.ravel()]
+
+    sums = np.stack(
+        [np.bincount(day_idx, weights=values[:, col], minlength=len(order)) for col in range(6)],
+        axis=1,
+    )
+    kwh = (sums / 1000.0).tolist()
+
+    daily_kwh: Dict[date, Totals] = {}
+    for i, vals in zip(order.tolist(), kwh):
+        day = date.fromisoformat(str(unique_days[i]))
+        daily_kwh[day] = Totals(cons=(vals[0], vals[1], vals[2]), prod=(vals[3], vals[4], vals[5]))
+    return daily_kwh
+
+
+def calculate_daily_summaries_numpy(rows: List[List[str]]) -> Dict[date, Totals]:
+    """
+    NumPy version of calculate_daily_summaries with identical results.
+    Requires NumPy.
+    """
+    if np is None:
+        raise ImportError("calculate_daily_summaries_numpy requires NumPy")
+    data = rows[1:]
+    days = np.array([row[0][:10] for row in data], dtype="U10")
+    values = np.fromiter(
+        (float(v) for row in data for v in row[1:7]), dtype=np.float64, count=6 * len(data)
+    ).reshape(-1, 6)
+    return _daily_totals_numpy(days, values)
+
+
+WEEK_ROW = [("day", "U10"), ("wh", "f8", 6)]  # np.loadtxt dtype of one week CSV row
+
+
+def read_daily_summaries_numpy(filename: str) -> Dict[date, Totals]:
+    """
+    Reads a week CSV with np.loadtxt and returns the same result as
+    calculate_daily_summaries(read_data(filename)). Requires NumPy.
+    """
+    if np is None:
+        raise ImportError("read_daily_summaries_numpy requires NumPy")
+    # One pass over the file: the date part of the timestamp and the six phase columns
+    rows = np.loadtxt(filename, delimiter=";", skiprows=1, dtype=WEEK_ROW, ndmin=1, encoding="utf-8")
+    return _daily_totals_numpy(rows["day"], rows["wh"])
+
+
+DAY_ROW = "%8.2f %8.2f %8.2f     %8.2f %8.2f %8.2f"  # consumption and production v1-v3
+TOTALS_ROW = "%.2f  %.2f  %.2f"
+
+
 def format_week_section(week_number: int, daily: Dict[date, Totals]) -> str:
     """
     Formats one week's daily totals as a report section.
@@ -92,8 +210,7 @@ def format_week_section(week_number: int, daily: Dict[date, Totals]) -> str:
         line = (
             f"{weekday_fi(day):<12}  "
             f"{format_fi_date(day):<12}  "
-            f"{format_kwh(t.cons[0]):>8} {format_kwh(t.cons[1]):>8} {format_kwh(t.cons[2]):>8}     "
-            f"{format_kwh(t.prod[0]):>8} {format_kwh(t.prod[1]):>8} {format_kwh(t.prod[2]):>8}"
+            + format_kwh_row(DAY_ROW, (*t.cons, *t.prod))
         )
         lines.append(line)
 
@@ -107,46 +224,194 @@ def write_report(filename: str, content: str) -> None:
         file.write(content)
 
 
-def main() -> None:
+WEEK_FILE_PATTERN = re.compile(r"week(\d+)\.(csv|mcol)$")
+CACHE_FILE = "week_cache.json"
+
+
+def find_week_files(directory: str, suffix: str = ".csv") -> List[Tuple[int, str]]:
+    """
+    Returns (week number, path) for every week file in the directory, by week number.
+    suffix selects the CSV files or the .mcol stores written by shared/meter_store.py.
+    """
+    weeks = []
+    for path in pathlib.Path(directory).glob(f"week*{suffix}"):
+        match = WEEK_FILE_PATTERN.fullmatch(path.name)
+        if match:
+            weeks.append((int(match.group(1)), str(path)))
+    return sorted(weeks)
+
+
+def file_hash(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file."""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def load_cache(filename: str) -> Dict[str, dict]:
+    """Loads the per-week summary cache, or an empty one if it is missing or broken."""
+    try:
+        with open(filename, encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_cache(filename: str, cache: Dict[str, dict]) -> None:
+    """Writes the per-week summary cache atomically."""
+    tmp = f"{filename}.tmp"
+    with open(tmp, "w", encoding="utf-8") as file:
+        json.dump(cache, file)
+    os.replace(tmp, filename)
+
+
+def prune_cache(directory: str, cache: Dict[str, dict]) -> bool:
+    """Drops cache entries whose week file is gone from the directory. True if any were dropped."""
+    gone = [name for name in cache if not os.path.isfile(os.path.join(directory, name))]
+    for name in gone:
+        del cache[name]
+    return bool(gone)
+
+
+def totals_to_json(daily: Dict[date, Totals]) -> Dict[str, List[float]]:
+    """Converts daily totals to a JSON-friendly dict, keeping day order."""
+    return {day.isoformat(): [*t.cons, *t.prod] for day, t in daily.items()}
+
+
+def totals_from_json(days: Dict[str, List[float]]) -> Dict[date, Totals]:
+    """Converts the output of totals_to_json back to daily totals."""
+    return {
+        date.fromisoformat(day): Totals(cons=(v[0], v[1], v[2]), prod=(v[3], v[4], v[5]))
+        for day, v in days.items()
+    }
+
+
+def summarize_week(path: str) -> Tuple[Dict[date, Totals], float]:
+    """Reads one week file and returns its daily totals and the seconds it took."""
+    start = time.perf_counter()
+    if is_store(path):
+        daily = calculate_daily_summaries_store(read_store(path))
+    elif np is not None:
+        daily = read_daily_summaries_numpy(path)
+    else:
+        daily = calculate_daily_summaries(read_data(path))
+    return daily, time.perf_counter() - start
+
+
+def summarize_weeks(paths: List[str], workers: int = 1) -> List[Tuple[Dict[date, Totals], float]]:
+    """
+    Summarizes week files, in a process pool when workers > 1.
+    Results are returned in the order of paths.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        return [summarize_week(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        return list(pool.map(summarize_week, paths))
+
+
+def summarize_weeks_cached(
+    week_files: List[Tuple[int, str]], cache: Dict[str, dict], workers: int = 1
+) -> Tuple[List[Tuple[Dict[date, Totals], float]], List[int]]:
+    """
+    Returns the summaries of the week files in order, taking unchanged weeks
+    from the cache (keyed by file name and content hash) and recomputing only
+    new or modified ones. The cache is updated in place. Also returns the
+    positions of the recomputed weeks.
+    """
+    hashes = [file_hash(path) for _, path in week_files]
+    results: List[Optional[Tuple[Dict[date, Totals], float]]] = []
+    for (_, path), digest in zip(week_files, hashes):
+        entry = cache.get(os.path.basename(path))
+        if entry is not None and entry.get("sha256") == digest:
+            results.append((totals_from_json(entry["days"]), 0.0))
+        else:
+            results.append(None)
+
+    stale = [i for i, result in enumerate(results) if result is None]
+    computed = summarize_weeks([week_files[i][1] for i in stale], workers)
+    for i, result in zip(stale, computed):
+        results[i] = result
+        cache[os.path.basename(week_files[i][1])] = {"sha256": hashes[i], "days": totals_to_json(result[0])}
+    return results, stale
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parses the command line options."""
+    parser = argparse.ArgumentParser(description="Writes weekly electricity summaries to summary.txt.")
+    parser.add_argument("--dir", default=".", help="directory containing the week*.csv files")
+    parser.add_argument("--store", action="store_true", help="read week*.mcol stores instead of week*.csv")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every week and ignore the cache")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes for reading week files")
+    parser.add_argument("--timing", action="store_true", help="print how long each stage took")
+    add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main function: reads week files, computes summaries, and writes summary.txt."""
-    week_files = [
-        (41, "week41.csv"),
-        (42, "week42.csv"),
-        (43, "week43.csv"),
-    ]
+    args = parse_args(argv)
+    prof = Instrumentation.from_args(args.profile)
+    with prof.run():
+        run(args, prof)
+
+
+def run(args: argparse.Namespace, prof: Instrumentation) -> None:
+    """Writes summary.txt for the parsed command line, timing each stage in prof."""
+    started = time.perf_counter()
+    with prof.stage("find"):
+        week_files = find_week_files(args.dir, ".mcol" if args.store else ".csv")
+        cache_file = os.path.join(args.dir, CACHE_FILE)
+        cache = {} if args.no_cache else load_cache(cache_file)
+    prof.count("weeks", len(week_files))
 
     sections: List[str] = []
     grand_cons = [0.0, 0.0, 0.0]
     grand_prod = [0.0, 0.0, 0.0]
 
-    for week_no, path in week_files:
-        rows = read_data(path)
-        daily = calculate_daily_summaries(rows)
-
-        # accumulate grand totals (bonus)
-        for totals in daily.values():
-            for i in range(3):
-                grand_cons[i] += totals.cons[i]
-                grand_prod[i] += totals.prod[i]
-
-        sections.append(format_week_section(week_no, daily))
+    with prof.stage("summarize"):
+        results, stale = summarize_weeks_cached(week_files, cache, args.workers)
+        # Entries of deleted or renamed week files would otherwise stay forever
+        if (prune_cache(args.dir, cache) or stale) and not args.no_cache:
+            save_cache(cache_file, cache)
+    prof.count("weeks_recomputed", len(stale))
+    prof.count("days", sum(len(daily) for daily, _ in results))
+    summarized = time.perf_counter()
+
+    with prof.stage("format"):
+        # Merge in week order so the grand totals match a sequential run
+        for (week_no, _), (daily, _) in zip(week_files, results):
+            # accumulate grand totals (bonus)
+            for totals in daily.values():
+                for i in range(3):
+                    grand_cons[i] += totals.cons[i]
+                    grand_prod[i] += totals.prod[i]
+
+            sections.append(format_week_section(week_no, daily))
+
+        # Optional combined summary
+        sections.append("All weeks combined totals (kWh)")
+        sections.append("-" * 83)
+        sections.append(
+            "Consumption total (v1 v2 v3): " + format_kwh_row(TOTALS_ROW, grand_cons)
+        )
+        sections.append(
+            "Production total (v1 v2 v3):  " + format_kwh_row(TOTALS_ROW, grand_prod)
+        )
+        sections.append("")
 
-    # Optional combined summary
-    sections.append("All weeks combined totals (kWh)")
-    sections.append("-" * 83)
-    sections.append(
-        "Consumption total (v1 v2 v3): "
-        f"{format_kwh(grand_cons[0])}  {format_kwh(grand_cons[1])}  {format_kwh(grand_cons[2])}"
-    )
-    sections.append(
-        "Production total (v1 v2 v3):  "
-        f"{format_kwh(grand_prod[0])}  {format_kwh(grand_prod[1])}  {format_kwh(grand_prod[2])}"
-    )
-    sections.append("")
+        report = "\n".join(sections)
+    with prof.stage("write"):
+        write_report(os.path.join(args.dir, "summary.txt"), report)
 
-    report = "\n".join(sections)
-    write_report("summary.txt", report)
+    if args.timing:
+        finished = time.perf_counter()
+        for i, ((week_no, path), (_, seconds)) in enumerate(zip(week_files, results)):
+            source = "computed" if i in stale else "cached"
+            print(f"Week {week_no} ({path}): {seconds:.3f} s, {source}")
+        print(f"Summaries with {args.workers} worker(s), {len(stale)} recomputed: {summarized - started:.3f} s")
+        print(f"Report formatting and writing: {finished - summarized:.3f} s")
+        print(f"Total: {finished - started:.3f} s")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
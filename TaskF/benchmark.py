@@ -0,0 +1,228 @@
+"""
+Benchmarks for TaskF on generated hourly meter data
+
+Usage:
+ python benchmark.py reader [years]
+ python benchmark.py memory [years]
+ python benchmark.py timestamps [years]
+ python benchmark.py store [years]
+"""
+
+from datetime import datetime, timedelta, timezone
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from daily_index import DailyIndex
+from fast_reader import _parse_bytes, read_columns, read_store_columns, stream_daily_totals
+from shared.meter_store import export_csv
+from task_e import read_data
+
+HEADER = "Time; Consumption (net) kWh; Production (net) kWh; Daily average temperature"
+
+
+def finnish_offset(ts: datetime) -> int:
+    """Returns the UTC offset in hours in Finland: +3 in summer time, +2 otherwise."""
+    march_end = datetime(ts.year, 3, 31)
+    october_end = datetime(ts.year, 10, 31)
+    dst_start = march_end - timedelta(days=(march_end.weekday() + 1) % 7, hours=-1)  # last Sunday 01:00 UTC
+    dst_end = october_end - timedelta(days=(october_end.weekday() + 1) % 7, hours=-1)
+    return 3 if dst_start <= ts < dst_end else 2
+
+
+def generate_meter_file(filename: str, years: int, start_year: int = 2016, seed: int = 42) -> None:
+    """Writes a 2025.csv style file with hourly rows for the given number of years."""
+    rng = random.Random(seed)
+    utc = datetime(start_year, 1, 1) - timedelta(hours=2)
+    end = datetime(start_year + years, 1, 1) - timedelta(hours=2)
+    temp = 0.0
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(HEADER + "\n")
+        while utc < end:
+            offset = finnish_offset(utc)
+            local = utc + timedelta(hours=offset)
+            if local.hour == 0:
+                temp = rng.randint(-250, 250) / 10
+            consumption = f"{rng.randint(100, 3000) / 1000:.3f}".replace(".", ",")
+            production = f"{rng.randint(0, 2000) / 1000:.3f}".replace(".", ",")
+            temperature = f"{temp:.1f}".replace(".", ",")
+            f.write(f"{local:%Y-%m-%dT%H:%M:%S}.000+{offset:02d}:00;{consumption};{production};{temperature}\n")
+            utc += timedelta(hours=1)
+
+
+HOUR_DELTAS = {f"{h:02d}": timedelta(hours=h) for h in range(24)}
+
+
+def decode_per_day(stamps: list[str]) -> list[datetime]:
+    """
+    Candidate decoder: parses each date once, builds each UTC offset's tzinfo
+    once and adds a cached hour delta to the cached midnight. Only the
+    2025.csv layout is handled.
+    """
+    result = []
+    append = result.append
+    zones: dict[str, timezone] = {}
+    prefix = None
+    midnight = datetime.min
+    for ts in stamps:
+        if ts[:10] != prefix:
+            prefix = ts[:10]
+            midnight = datetime.fromisoformat(prefix)
+        offset = ts[-6:]
+        zone = zones.get(offset)
+        if zone is None:
+            zone = zones[offset] = timezone(timedelta(hours=int(offset[:3])))
+        append((midnight + HOUR_DELTAS[ts[11:13]]).replace(tzinfo=zone))
+    return result
+
+
+def report(label: str, rows: int, seconds: float) -> None:
+    print(f"{label:<32} {seconds:8.3f} s  {rows / seconds:12,.0f} rows/s")
+
+
+def bench_reader(filename: str, rows: int) -> None:
+    """
+    Compares csv.DictReader based read_data with the column reader: in place
+    over the mmap with NumPy, and the Python parser used without it.
+    """
+    start = time.perf_counter()
+    data = read_data(filename)
+    parsed = time.perf_counter()
+    expected = DailyIndex.from_rows(data)
+    indexed = time.perf_counter()
+    report("read_data (csv.DictReader)", rows, parsed - start)
+    report("read_data + DailyIndex", rows, indexed - start)
+
+    start = time.perf_counter()
+    columns = read_columns(filename)
+    parsed = time.perf_counter()
+    result = columns.to_index()
+    indexed = time.perf_counter()
+    report("read_columns (NumPy, mmap)", rows, parsed - start)
+    report("read_columns + DailyIndex", rows, indexed - start)
+
+    start = time.perf_counter()
+    with open(filename, "rb") as f:
+        fallback = _parse_bytes(f.read())
+    report("read_columns (Python parser)", rows, time.perf_counter() - start)
+    print(f"identical columns: {all(getattr(columns, n) == getattr(fallback, n) for n in ('days', 'consumption', 'production', 'temp'))}")
+
+    identical = all(
+        getattr(expected, name) == getattr(result, name)
+        for name in ("days", "day_start", "consumption", "production", "temp", "months", "total")
+    )
+    print(f"identical index: {identical}")
+
+
+def bench_memory(filename: str, rows: int) -> None:
+    """Compares peak and retained memory of the ways to load the report data."""
+    loaders = [
+        ("read_data rows", read_data),
+        ("read_data + DailyIndex", lambda f: DailyIndex.from_rows(read_data(f))),
+        ("read_columns + DailyIndex", lambda f: read_columns(f).to_index()),
+        ("stream_daily_totals", stream_daily_totals),
+    ]
+    for label, loader in loaders:
+        tracemalloc.start()
+        start = time.perf_counter()
+        data = loader(filename)
+        seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        print(f"{label:<28} kept {current / 2**20:7.1f} MiB  peak {peak / 2**20:7.1f} MiB  {seconds:6.2f} s")
+
+
+def bench_timestamps(filename: str, rows: int) -> None:
+    """
+    Compares ways to decode the Time column: full datetimes with fromisoformat
+    and the per-day candidate, then the dd.mm.yyyy day keys the reports use,
+    formatted per row or once per day.
+    """
+    with open(filename, encoding="utf-8") as f:
+        next(f)
+        stamps = [line.split(";", 1)[0] for line in f]
+
+    start = time.perf_counter()
+    expected = [datetime.fromisoformat(ts) for ts in stamps]
+    report("datetime.fromisoformat", rows, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    decoded = decode_per_day(stamps)
+    report("per-day decoder (Python)", rows, time.perf_counter() - start)
+    identical = all(a == b and a.utcoffset() == b.utcoffset() for a, b in zip(expected, decoded))
+    print(f"identical timestamps: {identical}")
+
+    start = time.perf_counter()
+    keys = [datetime.fromisoformat(ts).strftime("%d.%m.%Y") for ts in stamps]
+    report("day key per row", rows, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    cached = []
+    prefix = None
+    key = ""
+    for ts in stamps:
+        if ts[:10] != prefix:
+            prefix = ts[:10]
+            key = datetime.fromisoformat(ts).strftime("%d.%m.%Y")
+        cached.append(key)
+    report("day key once per day", rows, time.perf_counter() - start)
+    print(f"identical day keys: {keys == cached}")
+
+
+def bench_store(filename: str, rows: int) -> None:
+    """Compares loading the CSV with loading a compressed .mcol store of it."""
+    start = time.perf_counter()
+    store = export_csv(filename)
+    report("export to .mcol", rows, time.perf_counter() - start)
+    csv_size = os.path.getsize(filename)
+    store_size = os.path.getsize(store)
+    print(f"size: csv {csv_size / 2**20:.1f} MiB, store {store_size / 2**20:.1f} MiB ({csv_size / store_size:.1f}x smaller)")
+
+    loaders = [
+        ("read_data (csv.DictReader)", read_data, filename),
+        ("read_columns (mmap csv)", read_columns, filename),
+        ("read_store_columns (.mcol)", read_store_columns, store),
+    ]
+    loaded = []
+    for label, loader, source in loaders:
+        start = time.perf_counter()
+        loaded.append(loader(source))
+        seconds = time.perf_counter() - start
+        print(f"{label:<32} {seconds * 1000:8.1f} ms")
+
+    expected, result = loaded[1], loaded[2]
+    identical = all(
+        getattr(expected, name) == getattr(result, name) for name in ("days", "consumption", "production", "temp")
+    )
+    print(f"identical columns: {identical}")
+
+
+BENCHMARKS = {
+    "reader": bench_reader,
+    "memory": bench_memory,
+    "timestamps": bench_timestamps,
+    "store": bench_store,
+}
+
+
+def main() -> None:
+    name = sys.argv[1] if len(sys.argv) > 1 else "reader"
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "meter.csv")
+        generate_meter_file(filename, years)
+        with open(filename, encoding="utf-8") as f:
+            rows = sum(1 for _ in f) - 1
+        print(f"Benchmark '{name}' on {years} years, {rows:,} hourly rows")
+        BENCHMARKS[name](filename, rows)
+
+
+if __name__ == "__main__":
+    main()
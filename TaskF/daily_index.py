@@ -0,0 +1,188 @@
+"""
+Pre-aggregated index over the hourly meter data
+
+The index is built once while the data is loaded:
+
+ - the hourly values are kept in compact float arrays, with the position
+   of each day's first hour in a sorted day list, so a date range is
+   located with bisect instead of scanning every row
+ - month and whole-data totals are accumulated up front, so those
+   reports are answered without touching the rows at all
+
+DailyIndex totals are always summed row by row in file order, the same
+way the original report loops did, so every figure is identical to a full
+scan.
+
+DailyTotals is the bounded-memory variant for streaming input: it keeps
+the month and whole-data sums and the hour count of each day, so its size
+grows with the number of days instead of the number of hours. A date range
+is summed row by row from rows read back from the source, because adding
+up day sums would round differently: the 3-decimal kWh values often sum
+to an exact half-cent, where the last printed digit depends on the order
+of addition. Every figure is therefore identical to DailyIndex.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import reduce
+from itertools import groupby
+from operator import add
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+Totals = Tuple[float, float, float]  # consumption, production, average temperature
+RowReader = Callable[[int, int], Iterable[Totals]]  # (consumption, production, temp) rows of days lo..hi-1
+
+
+class DailyIndex:
+    """Hourly values grouped by day, plus precomputed month and total sums."""
+
+    def __init__(self) -> None:
+        self.days: List[date] = []
+        self.day_start: List[int] = []  # row position of each day's first hour
+        self.consumption = array("d")
+        self.production = array("d")
+        self.temp = array("d")
+        # month -> [consumption, production, temperature sum, hours]
+        self.months: Dict[int, List[float]] = {}
+        self.total: List[float] = [0.0, 0.0, 0.0, 0]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "DailyIndex":
+        """Builds the index from rows in the format returned by read_data."""
+        index = cls()
+        for row in rows:
+            index.add(row["day"], row["consumption"], row["production"], row["temp"])
+        return index
+
+    @classmethod
+    def from_columns(cls, days: Iterable[int], consumption: array, production: array, temp: array) -> "DailyIndex":
+        """
+        Builds the index from per-row date ordinals and value arrays, such as
+        the columns of fast_reader.read_columns. The arrays are used as is.
+        """
+        index = cls()
+        index.consumption, index.production, index.temp = consumption, production, temp
+        pos = 0
+        for ordinal, run in groupby(days):
+            day = date.fromordinal(ordinal)
+            if index.days and day <= index.days[-1]:
+                raise ValueError(f"Rows are not in date order: {day} after {index.days[-1]}")
+            end = pos + len(list(run))
+            index.days.append(day)
+            index.day_start.append(pos)
+            # Continue each month's sums from where they were, keeping row order
+            sums = index.months.setdefault(day.month, [0.0, 0.0, 0.0, 0])
+            sums[0] = reduce(add, consumption[pos:end], sums[0])
+            sums[1] = reduce(add, production[pos:end], sums[1])
+            sums[2] = reduce(add, temp[pos:end], sums[2])
+            sums[3] += end - pos
+            pos = end
+        index.total = [
+            reduce(add, consumption, 0.0),
+            reduce(add, production, 0.0),
+            reduce(add, temp, 0.0),
+            len(consumption),
+        ]
+        return index
+
+    def add(self, day: date, consumption: float, production: float, temp: float) -> None:
+        """Adds one hourly row. Rows must arrive in chronological order."""
+        if not self.days or day != self.days[-1]:
+            if self.days and day < self.days[-1]:
+                raise ValueError(f"Rows are not in date order: {day} after {self.days[-1]}")
+            self.days.append(day)
+            self.day_start.append(len(self.consumption))
+        self.consumption.append(consumption)
+        self.production.append(production)
+        self.temp.append(temp)
+        for sums in (self.months.setdefault(day.month, [0.0, 0.0, 0.0, 0]), self.total):
+            sums[0] += consumption
+            sums[1] += production
+            sums[2] += temp
+            sums[3] += 1
+
+    def range_totals(self, start: date, end: date) -> Totals:
+        """Returns (consumption, production, average temperature) for start..end inclusive."""
+        first = bisect_left(self.days, start)
+        last = bisect_right(self.days, end)
+        lo = self.day_start[first] if first < len(self.days) else len(self.consumption)
+        hi = self.day_start[last] if last < len(self.days) else len(self.consumption)
+        count = hi - lo
+        if count <= 0:
+            return 0.0, 0.0, 0.0
+        return (
+            reduce(add, self.consumption[lo:hi], 0.0),
+            reduce(add, self.production[lo:hi], 0.0),
+            reduce(add, self.temp[lo:hi], 0.0) / count,
+        )
+
+    def month_totals(self, month: int) -> Totals:
+        """Returns the totals for one calendar month (1–12) across all data."""
+        return _averaged(self.months.get(month, [0.0, 0.0, 0.0, 0]))
+
+    def all_totals(self) -> Totals:
+        """Returns the totals over all data."""
+        return _averaged(self.total)
+
+
+class DailyTotals:
+    """
+    Per-day hour counts and per-month sums folded from a stream of hourly rows.
+    Answers the same queries as DailyIndex without keeping the rows: read_rows
+    yields the rows of a span of days again, by their position in days.
+    """
+
+    def __init__(self, read_rows: RowReader) -> None:
+        self.read_rows = read_rows
+        self.days: List[date] = []
+        self.hours = array("i")
+        self.months: Dict[int, List[float]] = {}
+        self.total: List[float] = [0.0, 0.0, 0.0, 0]
+
+    def add(self, day: date, consumption: float, production: float, temp: float) -> None:
+        """Folds one hourly row into the sums. Rows must arrive in chronological order."""
+        if not self.days or day != self.days[-1]:
+            if self.days and day < self.days[-1]:
+                raise ValueError(f"Rows are not in date order: {day} after {self.days[-1]}")
+            self.days.append(day)
+            self.hours.append(0)
+        self.hours[-1] += 1
+        for sums in (self.months.setdefault(day.month, [0.0, 0.0, 0.0, 0]), self.total):
+            sums[0] += consumption
+            sums[1] += production
+            sums[2] += temp
+            sums[3] += 1
+
+    def range_totals(self, start: date, end: date) -> Totals:
+        """
+        Returns (consumption, production, average temperature) for start..end inclusive,
+        summed row by row in file order like DailyIndex.
+        """
+        lo = bisect_left(self.days, start)
+        hi = bisect_right(self.days, end)
+        count = sum(self.hours[lo:hi])
+        if count <= 0:
+            return 0.0, 0.0, 0.0
+        total_c = total_p = total_t = 0.0
+        for consumption, production, temp in self.read_rows(lo, hi):
+            total_c += consumption
+            total_p += production
+            total_t += temp
+        return total_c, total_p, total_t / count
+
+    def month_totals(self, month: int) -> Totals:
+        """Returns the totals for one calendar month (1–12) across all data."""
+        return _averaged(self.months.get(month, [0.0, 0.0, 0.0, 0]))
+
+    def all_totals(self) -> Totals:
+        """Returns the totals over all data."""
+        return _averaged(self.total)
+
+
+ReportData = Union[DailyIndex, DailyTotals]  # anything the reports can be built from
+
+
+def _averaged(sums: List[float]) -> Totals:
+    count = sums[3]
+    return sums[0], sums[1], (sums[2] / count) if count > 0 else 0.0
@@ -0,0 +1,309 @@
+"""
+Fast readers for 2025.csv style meter exports
+
+read_columns maps the file into memory and, with NumPy, parses it in
+place: the field boundaries, the decimal digits and the date prefixes are
+read from one uint8 view of the mapping, without copying the text. A value
+is its digits as an integer divided by a power of ten, which is the same
+correctly rounded float that float() gives for the decimal text. Files the
+vectorized parser does not expect (CRLF line ends, blank lines, exponents,
+wrong field counts) and installs without NumPy use the Python parser, which
+splits the bytes of the file and converts each value with float().
+
+stream_daily_totals reads line by line instead and keeps no rows at all,
+only the file offset of each day, so a date range can be read back.
+
+read_store_columns loads the same columns from a compressed .mcol export
+written by shared/meter_store.py, without parsing any text.
+"""
+
+from array import array
+from datetime import date
+from itertools import groupby, repeat
+import mmap
+from operator import itemgetter
+import pathlib
+import sys
+import os
+from typing import Iterator, List, Optional, Tuple
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from daily_index import DailyIndex, DailyTotals, Totals
+from helpers import AMOUNT_COL, AVERAGE_TEMP, DATE_COL, PRODUCT_COL
+from shared.meter_store import read_store
+
+try:
+    import numpy as np
+except ImportError:  # the vectorized parser is optional
+    np = None
+
+MAX_DIGITS = 15  # every integer of up to 15 digits is exact in a float64
+
+
+class MeterColumns:
+    """Hourly meter values as typed columns, one entry per row."""
+
+    def __init__(self) -> None:
+        self.days = array("i")  # date ordinals of the local timestamp
+        self.consumption = array("d")
+        self.production = array("d")
+        self.temp = array("d")
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def to_index(self) -> DailyIndex:
+        """Builds the DailyIndex used by the reports from the columns."""
+        return DailyIndex.from_columns(self.days, self.consumption, self.production, self.temp)
+
+
+def _column_positions(header: bytes) -> List[int]:
+    names = [name.decode("utf-8-sig") for name in header.rstrip(b"\r").split(b";")]
+    try:
+        return [names.index(col) for col in (DATE_COL, AMOUNT_COL, PRODUCT_COL, AVERAGE_TEMP)] + [len(names)]
+    except ValueError:
+        raise ValueError(f"Unexpected header: {names}") from None
+
+
+def _decimal_column(values: List[bytes]) -> array:
+    # The comma decimals of one column are turned into dots in a single pass
+    if not values:
+        return array("d")
+    return array("d", list(map(float, b"\n".join(values).replace(b",", b".").split(b"\n"))))
+
+
+def read_columns(filename: str) -> MeterColumns:
+    """Reads a semicolon-separated meter export into MeterColumns."""
+    with open(filename, "rb") as file:
+        if np is not None:
+            try:
+                mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return MeterColumns()
+            with mm:
+                parsed = _parse_in_place(mm)
+            if parsed is not None:
+                return _columns_from_parsed(*parsed)
+        data = file.read()
+    return _parse_bytes(data)
+
+
+def _parse_bytes(data: bytes) -> MeterColumns:
+    """The Python parser: splits the bytes of the file and calls float() per value."""
+    columns = MeterColumns()
+    header_end = data.find(b"\n")
+    if header_end < 0:
+        return columns
+    ts_col, c_col, p_col, t_col, width = _column_positions(data[:header_end])
+
+    # Every line must have exactly as many fields as the header. Blank lines
+    # are skipped like csv.DictReader does; they are only looked for when a
+    # line has the wrong field count, so well-formed files are split as one buffer.
+    text = data[header_end + 1:]
+    if b"\r" in text:
+        text = text.replace(b"\r", b"")
+    if text.endswith(b"\n"):
+        text = text[:-1]
+    lines = text.split(b"\n") if text else []
+    separators = width - 1
+    if set(map(bytes.count, lines, repeat(b";"))) - {separators}:
+        lines = [line for line in lines if line.strip()]
+        for line in lines:
+            if line.count(b";") != separators:
+                raise ValueError(f"Every row must have {width} fields: {line!r}")
+        text = b"\n".join(lines)
+    fields = text.replace(b"\n", b";").split(b";") if lines else []
+
+    columns.consumption = _decimal_column(fields[c_col::width])
+    columns.production = _decimal_column(fields[p_col::width])
+    columns.temp = _decimal_column(fields[t_col::width])
+
+    # Rows of the same day are consecutive, so each date prefix is parsed once per run
+    days = columns.days
+    for prefix, run in groupby(fields[ts_col::width], itemgetter(slice(0, 10))):
+        ordinal = date.fromisoformat(prefix.decode("ascii")).toordinal()
+        days.extend(array("i", [ordinal]) * len(list(run)))
+    return columns
+
+
+Parsed = Tuple[List[bytes], "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]
+
+
+def _parse_in_place(mm: mmap.mmap) -> Optional[Parsed]:
+    """
+    Parses the mapping through a uint8 view. Returns the date prefix and row
+    count of each day and the three value columns, or None when the file
+    needs the Python parser. Only copies of the parsed values leave the
+    function, so the mapping can be closed afterwards.
+    """
+    header_end = mm.find(b"\n")
+    if header_end < 0:
+        return None
+    ts_col, c_col, p_col, t_col, width = _column_positions(mm[:header_end])
+    body = np.frombuffer(mm, dtype=np.uint8, offset=header_end + 1)
+    if len(body) == 0 or mm.find(b"\r") >= 0:
+        return None
+
+    # Every width-th delimiter, and only those, must be a line break
+    newline = body == ord("\n")
+    delimiters = np.flatnonzero(newline | (body == ord(";")))
+    line_ends = np.flatnonzero(newline)
+    if not newline[-1]:  # last line without a line break
+        delimiters = np.append(delimiters, len(body))
+        line_ends = np.append(line_ends, len(body))
+    if len(delimiters) != width * len(line_ends) or not np.array_equal(delimiters[width - 1::width], line_ends):
+        return None
+    starts = np.empty_like(delimiters)
+    starts[0] = 0
+    starts[1:] = delimiters[:-1] + 1
+
+    values = []
+    for col in (c_col, p_col, t_col):
+        column = _decimal_in_place(body, starts[col::width], delimiters[col::width])
+        if column is None:
+            return None
+        values.append(column)
+
+    ts_starts = starts[ts_col::width]
+    if np.any(delimiters[ts_col::width] - ts_starts < 10):
+        return None
+    prefixes = body[ts_starts[:, None] + np.arange(10)].view("S10")[:, 0]
+    day_starts = np.flatnonzero(prefixes[1:] != prefixes[:-1]) + 1
+    day_starts = np.concatenate(([0], day_starts))
+    hours = np.diff(np.append(day_starts, len(prefixes)))
+    return prefixes[day_starts].tolist(), hours, *values
+
+
+def _decimal_in_place(body: "np.ndarray", starts: "np.ndarray", ends: "np.ndarray") -> Optional["np.ndarray"]:
+    """
+    Converts fields of the form [-]digits[,digits] (or with a dot) to float64,
+    as the integer of their digits divided by 10 ** decimals. Returns None for
+    any other field, or for more than MAX_DIGITS digits.
+    """
+    lengths = ends - starts
+    if len(lengths) == 0:
+        return np.zeros(0)
+    longest = int(lengths.max())
+    if lengths.min() < 1 or longest > MAX_DIGITS + 2:
+        return None
+    positions = np.arange(longest)
+    inside = positions < lengths[:, None]
+    chars = body[np.minimum(starts[:, None] + positions, len(body) - 1)]
+    digits = chars - np.uint8(ord("0"))  # wraps around below "0"
+    is_digit = inside & (digits <= 9)
+    is_point = inside & ((chars == ord(",")) | (chars == ord(".")))
+    negative = chars[:, 0] == ord("-")
+    points = np.count_nonzero(is_point, axis=1)
+    digit_count = np.count_nonzero(is_digit, axis=1)
+    if (np.any(digit_count + points + negative != lengths) or np.any(points > 1)
+            or np.any(digit_count == 0) or digit_count.max() > MAX_DIGITS):
+        return None
+
+    number = np.zeros(len(lengths), dtype=np.int64)
+    for j in range(longest):
+        number = np.where(is_digit[:, j], number * 10 + digits[:, j], number)
+    point_at = np.where(points > 0, np.argmax(is_point, axis=1), lengths - 1)
+    decimals = lengths - 1 - point_at
+    result = number / np.power(10.0, decimals)
+    return np.where(negative, -result, result)
+
+
+def _columns_from_parsed(prefixes: List[bytes], hours: "np.ndarray", consumption: "np.ndarray",
+                         production: "np.ndarray", temp: "np.ndarray") -> MeterColumns:
+    columns = MeterColumns()
+    ordinals = [date.fromisoformat(prefix.decode("ascii")).toordinal() for prefix in prefixes]
+    columns.days.frombytes(np.repeat(np.array(ordinals, dtype=np.intc), hours).tobytes())  # array("i") is a C int
+    for target, values in ((columns.consumption, consumption), (columns.production, production), (columns.temp, temp)):
+        target.frombytes(values.tobytes())
+    return columns
+
+
+def read_store_columns(filename: str) -> MeterColumns:
+    """Reads a meter store file (see shared/meter_store.py) into MeterColumns."""
+    table = read_store(filename)
+    columns = MeterColumns()
+    if len(table) == 0:
+        return columns
+    try:
+        time_col = table[DATE_COL]
+        values = [table[col] for col in (AMOUNT_COL, PRODUCT_COL, AVERAGE_TEMP)]
+    except KeyError:
+        raise ValueError(f"Unexpected header: {table.names()}") from None
+    if time_col.kind != "t" or any(col.kind not in ("i", "f") for col in values):
+        raise ValueError(f"Unexpected column types in {filename}")
+    columns.days = time_col.day_ordinals()
+    columns.consumption, columns.production, columns.temp = (
+        col.values if col.kind == "f" else array("d", map(float, col.values)) for col in values
+    )
+    return columns
+
+
+class DayRows:
+    """
+    Reads the rows of a span of days back from a meter export, starting at
+    the byte offset of the first day. Refuses to read once the file changed.
+    """
+
+    def __init__(self, filename: str, positions: List[int]) -> None:
+        self.filename = filename
+        self.c_col, self.p_col, self.t_col, self.width = positions[1:]
+        self.offsets = array("q")  # byte offset of each day's first row
+        self.end = 0  # byte offset after the last row
+        self.stat = os.stat(filename)
+
+    def __call__(self, lo: int, hi: int) -> Iterator[Totals]:
+        stat = os.stat(self.filename)
+        if (stat.st_size, stat.st_mtime_ns) != (self.stat.st_size, self.stat.st_mtime_ns):
+            raise ValueError(f"{self.filename} changed after it was loaded")
+        remaining = (self.offsets[hi] if hi < len(self.offsets) else self.end) - self.offsets[lo]
+        c_col, p_col, t_col, width = self.c_col, self.p_col, self.t_col, self.width
+        with open(self.filename, "rb") as file:
+            file.seek(self.offsets[lo])
+            for line in file:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                fields = line.rstrip(b"\r\n").split(b";")
+                if len(fields) == width:  # blank lines were skipped while loading
+                    yield (
+                        float(fields[c_col].replace(b",", b".")),
+                        float(fields[p_col].replace(b",", b".")),
+                        float(fields[t_col].replace(b",", b".")),
+                    )
+
+
+def stream_daily_totals(filename: str) -> DailyTotals:
+    """
+    Reads a meter export line by line and folds each row straight into
+    DailyTotals, so memory stays proportional to the number of days.
+    """
+    with open(filename, "rb") as file:
+        header = file.readline()
+        positions = _column_positions(header.rstrip(b"\r\n")) if header else [0, 0, 0, 0, 0]
+        rows = DayRows(filename, positions)
+        totals = DailyTotals(rows)
+        ts_col, c_col, p_col, t_col, width = positions
+        offset = len(header)
+        day_prefix = None
+        day = None
+        for line in file:
+            start = offset
+            offset += len(line)
+            fields = line.rstrip(b"\r\n").split(b";")
+            if len(fields) != width:
+                if not line.strip():
+                    continue
+                raise ValueError(f"Every row must have {width} fields: {line!r}")
+            if fields[ts_col][:10] != day_prefix:
+                day_prefix = fields[ts_col][:10]
+                day = date.fromisoformat(day_prefix.decode("ascii"))
+                rows.offsets.append(start)
+            totals.add(
+                day,
+                float(fields[c_col].replace(b",", b".")),
+                float(fields[p_col].replace(b",", b".")),
+                float(fields[t_col].replace(b",", b".")),
+            )
+        rows.end = offset
+    return totals
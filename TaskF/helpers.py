@@ -1,5 +1,6 @@
 import pathlib
 from datetime import date, datetime
+from typing import Iterable, List
 mainMenu = [
     {"id": 1, "content": "Daily summary for a date range"},
     {"id": 2, "content": "Monthly summary for one month"},
@@ -47,6 +48,14 @@ def format_number(value: float) -> str:
     return f"{value:.2f}".replace(".", ",")
 
 
+def format_numbers(values: Iterable[float]) -> List[str]:
+    """Formats many floats like format_number, with one replace for all of them."""
+    values = tuple(values)
+    if not values:
+        return []
+    return ("%.2f\n" * len(values) % values).replace(".", ",").split("\n")[:-1]
+
+
 def month_name(month: int) -> str:
     """Returns the English month name for 1–12."""
     names = [
@@ -58,4 +67,7 @@ def month_name(month: int) -> str:
 
 def parse_timestamp(ts: str) -> datetime:
     """Parses an ISO timestamp (e.g. 2025-10-13T00:00:00) into a datetime."""
+    # fromisoformat is C code and keeps the +02:00/+03:00 offset of each row;
+    # decoding per day in Python, even with the tzinfo and hour deltas cached,
+    # is still about 7x slower (python benchmark.py timestamps)
     return datetime.fromisoformat(ts)
@@ -0,0 +1,98 @@
+"""
+Load test for the report service in server.py
+
+Opens a number of keep-alive connections and sends a mix of daily-range,
+monthly and yearly requests as fast as the server answers, then prints
+requests per second and latency percentiles.
+
+Run with: python load_test.py [--host 127.0.0.1] [--port 8080] [--connections 50] [--requests 20000]
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+import random
+import time
+from typing import List
+
+
+def request_targets(count: int, seed: int = 42) -> List[str]:
+    """Returns a reproducible mix of report requests."""
+    rng = random.Random(seed)
+    targets = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            start = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+            end = start + timedelta(days=rng.randrange(31))
+            targets.append(f"/daily?start={start:%d.%m.%Y}&end={end:%d.%m.%Y}")
+        elif kind < 0.9:
+            targets.append(f"/monthly?month={rng.randint(1, 12)}")
+        else:
+            targets.append("/yearly")
+    return targets
+
+
+async def open_connection(args: argparse.Namespace):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def worker(args: argparse.Namespace, targets: List[str], latencies: List[float]) -> None:
+    """Sends the given requests one after another over one connection."""
+    reader, writer = await open_connection(args)
+    try:
+        for target in targets:
+            started = time.perf_counter()
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: {args.host}\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            if b" 200 " not in status:
+                raise RuntimeError(f"{target}: {status.decode().strip()}")
+            latencies.append(time.perf_counter() - started)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def run(args: argparse.Namespace) -> None:
+    targets = request_targets(args.requests)
+    latencies: List[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        worker(args, targets[i::args.connections], latencies) for i in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {args.connections} connections in {elapsed:.2f} s")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    for p in (50, 90, 99):
+        print(f"p{p} latency: {percentile(latencies, p) * 1000:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the report service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Local HTTP/JSON report service for the 2025 meter data
+
+The data and its index are loaded once and kept in memory; every
+request is answered from the index. Endpoints (GET, JSON responses):
+
+ /daily?start=dd.mm.yyyy&end=dd.mm.yyyy   date range report (inclusive)
+ /monthly?month=1..12                     monthly report
+ /yearly                                  full-year report
+
+Run with: python server.py [--host 127.0.0.1] [--port 8080] [--unix PATH]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import json
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from daily_index import ReportData
+from helpers import path
+from task_e import DATE_FMT, daily_report, load_report_data, monthly_report, yearly_report
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    431: "Request Header Fields Too Large",
+}
+MAX_HEADERS = 100  # header lines per request; longer lines are limited by the StreamReader
+
+
+class BadRequest(Exception):
+    """Raised for requests with missing or invalid parameters."""
+
+
+def _param(query: Dict[str, List[str]], name: str) -> str:
+    values = query.get(name)
+    if not values:
+        raise BadRequest(f"Missing parameter: {name}")
+    return values[0]
+
+
+def _date_param(query: Dict[str, List[str]], name: str):
+    value = _param(query, name)
+    try:
+        return datetime.strptime(value, DATE_FMT).date()
+    except ValueError:
+        raise BadRequest(f"Invalid {name}: use dd.mm.yyyy (e.g., 13.10.2025)") from None
+
+
+def handle(index: ReportData, target: str) -> Tuple[int, Dict[str, Any]]:
+    """Returns the status code and JSON body for a request target such as /monthly?month=9."""
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    try:
+        if url.path == "/daily":
+            start = _date_param(query, "start")
+            end = _date_param(query, "end")
+            if end < start:
+                start, end = end, start
+            totals = index.range_totals(start, end)
+            lines = daily_report(index, start, end, totals)
+        elif url.path == "/monthly":
+            month = _param(query, "month")
+            if not month.isdigit() or not 1 <= int(month) <= 12:
+                raise BadRequest("Invalid month: use a number from 1 to 12")
+            totals = index.month_totals(int(month))
+            lines = monthly_report(index, int(month), totals)
+        elif url.path == "/yearly":
+            totals = index.all_totals()
+            lines = yearly_report(index, totals)
+        else:
+            return 404, {"error": f"Unknown report: {url.path}"}
+    except BadRequest as e:
+        return 400, {"error": str(e)}
+
+    consumption, production, avg_temp = totals
+    return 200, {
+        "consumption_kwh": consumption,
+        "production_kwh": production,
+        "average_temperature": avg_temp,
+        "lines": lines,
+    }
+
+
+class HeadersTooLarge(Exception):
+    """Raised when a request line or its headers exceed the limits."""
+
+
+async def read_head(reader: asyncio.StreamReader) -> Tuple[bytes, Dict[str, str]]:
+    """Reads the request line and headers. Returns an empty line at end of stream."""
+    try:
+        request_line = await reader.readline()
+        headers: Dict[str, str] = {}
+        if not request_line:
+            return request_line, headers
+        for _ in range(MAX_HEADERS + 1):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return request_line, headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except (asyncio.LimitOverrunError, ValueError):  # a line longer than the reader limit
+        raise HeadersTooLarge from None
+    raise HeadersTooLarge
+
+
+def respond(writer: asyncio.StreamWriter, status: int, body: Dict[str, Any], keep_alive: bool) -> None:
+    payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+        + payload
+    )
+
+
+async def serve_client(index: ReportData, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Serves HTTP/1.1 requests on one connection until the client closes it.
+    Requests carry no body: one that declares a body, or a malformed or
+    oversized head, is answered with an error and the connection is closed,
+    since the next request could not be found reliably.
+    """
+    try:
+        while True:
+            try:
+                request_line, headers = await read_head(reader)
+            except HeadersTooLarge:
+                respond(writer, 431, {"error": "Request line or headers too large"}, False)
+                await writer.drain()
+                break
+            if not request_line:
+                break
+
+            parts = request_line.decode("latin-1").split()
+            keep_alive = headers.get("connection", "").lower() != "close"
+            if len(parts) != 3:
+                status, body, keep_alive = 400, {"error": "Malformed request line"}, False
+            elif "transfer-encoding" in headers or headers.get("content-length", "0") != "0":
+                status, body, keep_alive = 400, {"error": "Requests must not have a body"}, False
+            elif parts[0] != "GET":
+                status, body = 405, {"error": "Only GET is supported"}
+            else:
+                status, body = handle(index, parts[1])
+
+            respond(writer, status, body, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_server(index: ReportData, host: str, port: int, unix_path: str | None = None) -> None:
+    """Starts the service and serves until cancelled."""
+    def client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        return serve_client(index, reader, writer)
+
+    if unix_path:
+        server = await asyncio.start_unix_server(client, path=unix_path)
+        print(f"Serving reports on unix:{unix_path}")
+    else:
+        server = await asyncio.start_server(client, host, port)
+        print(f"Serving reports on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """Loads the data once and serves reports until interrupted."""
+    parser = argparse.ArgumentParser(description="Serve 2025 electricity reports over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--streaming", action="store_true",
+                        help="keep only daily and monthly sums in memory and read date ranges back from the file")
+    args = parser.parse_args()
+
+    index = load_report_data(path / "2025.csv", args.streaming)
+    try:
+        asyncio.run(run_server(index, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
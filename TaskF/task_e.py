@@ -1,10 +1,20 @@
 # Copyright (c) 2025 Christian Wiss
 # License: MIT
 
+import argparse
 import csv
 from datetime import datetime, date
-from typing import List, Dict, Any
-from helpers import format_date, format_number, month_name, parse_timestamp, path
+import pathlib
+import sys
+from typing import List, Dict, Any, Optional, Tuple
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from daily_index import ReportData, Totals
+from fast_reader import read_columns, read_store_columns, stream_daily_totals
+from helpers import format_date, format_numbers, month_name, parse_timestamp, path
+from shared.instrument import Instrumentation, add_profile_argument
+from shared.meter_store import is_store
 
 
 
@@ -73,86 +83,57 @@ def ask_month() -> int:
         print("Invalid month. Enter a number from 1 to 12.")
 
 
-def create_daily_report(data: List[Dict[str, Any]]) -> List[str]:
-    """Builds a report for a selected date range (inclusive)."""
-    start = ask_date("Enter start date (dd.mm.yyyy): ")
-    end = ask_date("Enter end date (dd.mm.yyyy): ")
-
-    if end < start:
-        start, end = end, start
-
-    total_c = 0.0
-    total_p = 0.0
-    temp_sum = 0.0
-    count = 0
-
-    for row in data:
-        if start <= row["day"] <= end:
-            total_c += row["consumption"]
-            total_p += row["production"]
-            temp_sum += row["temp"]
-            count += 1
-
-    avg_temp = (temp_sum / count) if count > 0 else 0.0
-
+def report_lines(title: str, totals: Tuple[float, float, float]) -> List[str]:
+    """Formats report totals (consumption, production, average temperature) as lines."""
+    total_c, total_p, avg_temp = format_numbers(totals)
     return [
         "-" * 53,
-        f"Report for the period {format_date(start)}–{format_date(end)}",
-        f"- Total consumption: {format_number(total_c)} kWh",
-        f"- Total production: {format_number(total_p)} kWh",
-        f"- Average temperature: {format_number(avg_temp)} °C",
+        title,
+        f"- Total consumption: {total_c} kWh",
+        f"- Total production: {total_p} kWh",
+        f"- Average temperature: {avg_temp} °C",
     ]
 
 
-def create_monthly_report(data: List[Dict[str, Any]]) -> List[str]:
-    """Builds a monthly summary report for a selected month (1–12)."""
-    m = ask_month()
+def daily_report(index: ReportData, start: date, end: date, totals: Optional[Totals] = None) -> List[str]:
+    """Builds a report for a date range (inclusive), from totals already computed if given."""
+    if end < start:
+        start, end = end, start
+    return report_lines(
+        f"Report for the period {format_date(start)}–{format_date(end)}",
+        totals or index.range_totals(start, end),
+    )
 
-    total_c = 0.0
-    total_p = 0.0
-    temp_sum = 0.0
-    count = 0
 
-    for row in data:
-        if row["dt"].month == m:
-            total_c += row["consumption"]
-            total_p += row["production"]
-            temp_sum += row["temp"]
-            count += 1
+def monthly_report(index: ReportData, m: int, totals: Optional[Totals] = None) -> List[str]:
+    """Builds a monthly summary report for a month (1–12), from totals already computed if given."""
+    return report_lines(f"Report for the month: {month_name(m)}", totals or index.month_totals(m))
 
-    avg_temp = (temp_sum / count) if count > 0 else 0.0
 
-    return [
-        "-" * 53,
-        f"Report for the month: {month_name(m)}",
-        f"- Total consumption: {format_number(total_c)} kWh",
-        f"- Total production: {format_number(total_p)} kWh",
-        f"- Average temperature: {format_number(avg_temp)} °C",
-    ]
+def yearly_report(index: ReportData, totals: Optional[Totals] = None) -> List[str]:
+    """Builds a full-year summary report for 2025, from totals already computed if given."""
+    return report_lines("Report for the year: 2025", totals or index.all_totals())
 
 
-def create_yearly_report(data: List[Dict[str, Any]]) -> List[str]:
-    """Builds a full-year summary report for 2025."""
-    total_c = 0.0
-    total_p = 0.0
-    temp_sum = 0.0
-    count = 0
+def create_daily_report(index: ReportData, prof: Optional[Instrumentation] = None) -> List[str]:
+    """Builds a report for a selected date range (inclusive)."""
+    start = ask_date("Enter start date (dd.mm.yyyy): ")
+    end = ask_date("Enter end date (dd.mm.yyyy): ")
+    with (prof or Instrumentation()).stage("report"):  # timed after the prompts
+        return daily_report(index, start, end)
 
-    for row in data:
-        total_c += row["consumption"]
-        total_p += row["production"]
-        temp_sum += row["temp"]
-        count += 1
 
-    avg_temp = (temp_sum / count) if count > 0 else 0.0
+def create_monthly_report(index: ReportData, prof: Optional[Instrumentation] = None) -> List[str]:
+    """Builds a monthly summary report for a selected month (1–12)."""
+    month = ask_month()
+    with (prof or Instrumentation()).stage("report"):
+        return monthly_report(index, month)
 
-    return [
-        "-" * 53,
-        "Report for the year: 2025",
-        f"- Total consumption: {format_number(total_c)} kWh",
-        f"- Total production: {format_number(total_p)} kWh",
-        f"- Average temperature: {format_number(avg_temp)} °C",
-    ]
+
+def create_yearly_report(index: ReportData, prof: Optional[Instrumentation] = None) -> List[str]:
+    """Builds a full-year summary report for 2025."""
+    with (prof or Instrumentation()).stage("report"):
+        return yearly_report(index)
 
 
 def print_report_to_console(lines: List[str]) -> None:
@@ -166,9 +147,40 @@ def write_report_to_file(lines: List[str]) -> None:
         file.write("\n".join(lines))
 
 
-def main() -> None:
+def load_report_data(filename: str, streaming: bool = False) -> ReportData:
+    """
+    Loads the meter data for the reports. The default keeps the hourly values;
+    streaming keeps only daily and monthly sums, for data too large for memory,
+    and reads a date range back from the file when it is reported.
+    Files ending in .mcol are read as meter stores instead of CSV. A store
+    is decompressed whole, so it is always kept as hourly values.
+    """
+    if is_store(filename):
+        return read_store_columns(filename).to_index()
+    if streaming:
+        return stream_daily_totals(filename)
+    return read_columns(filename).to_index()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main function: reads data, shows menus, and controls report generation."""
-    data = read_data(path / "2025.csv")
+    parser = argparse.ArgumentParser(description="Electricity reports for 2025.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="keep only daily and monthly sums in memory and read date ranges back from the file")
+    parser.add_argument("--data", default=str(path / "2025.csv"),
+                        help="meter data as CSV or as a .mcol store from shared/meter_store.py")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    prof = Instrumentation.from_args(args.profile)
+    with prof.run():
+        run(args, prof)
+
+
+def run(args: argparse.Namespace, prof: Instrumentation) -> None:
+    """Runs the report menus for the parsed command line, timing each stage in prof."""
+    with prof.stage("load"):
+        index = load_report_data(args.data, args.streaming)  # every report is answered from it
+    prof.count("days", len(index.days))
 
     while True:
         choice = show_main_menu()
@@ -176,21 +188,24 @@ def main() -> None:
             break
 
         if choice == "1":
-            report = create_daily_report(data)
+            report = create_daily_report(index, prof)
         elif choice == "2":
-            report = create_monthly_report(data)
+            report = create_monthly_report(index, prof)
         elif choice == "3":
-            report = create_yearly_report(data)
+            report = create_yearly_report(index, prof)
         else:
             print("Invalid selection. Try again.")
             continue
+        prof.count("reports")
 
-        print_report_to_console(report)
+        with prof.stage("print"):
+            print_report_to_console(report)
 
         while True:
             next_choice = show_next_menu()
             if next_choice == "1":
-                write_report_to_file(report)
+                with prof.stage("write"):
+                    write_report_to_file(report)
                 print("Report written to report.txt (overwritten).")
             elif next_choice == "2":
                 break
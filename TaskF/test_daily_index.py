@@ -0,0 +1,58 @@
+from datetime import date, timedelta
+import pathlib
+import random
+
+from daily_index import DailyIndex
+from fast_reader import read_columns, stream_daily_totals
+
+# Hourly consumption of two days whose range sum is a half-cent: 5.075
+DAYS = [[1.768, 0.085, 0.923], [0.073, 1.627, 0.599]]
+FIRST = date(2025, 3, 1)
+LAST = FIRST + timedelta(days=len(DAYS) - 1)
+
+DATA = str(pathlib.Path(__file__).parent / "2025.csv")
+
+
+def write_days(csv_file):
+    lines = ["Time; Consumption (net) kWh; Production (net) kWh; Daily average temperature"]
+    for i, hours in enumerate(DAYS):
+        day = FIRST + timedelta(days=i)
+        for hour, consumption in enumerate(hours):
+            lines.append(f"{day}T{hour:02d}:00:00.000+02:00;{consumption:.3f}".replace(".", ",") + ";0,000;1,5")
+    csv_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_half_cent_range_prints_the_row_by_row_figure(tmp_path):
+    csv_file = tmp_path / "half_cent.csv"
+    write_days(csv_file)
+    scan = 0.0
+    for consumption in (c for hours in DAYS for c in hours):
+        scan += consumption
+
+    indexed = read_columns(str(csv_file)).to_index().range_totals(FIRST, LAST)
+    streamed = stream_daily_totals(str(csv_file)).range_totals(FIRST, LAST)
+    assert indexed[0] == streamed[0] == scan
+    assert f"{streamed[0]:.2f}" == "5.08"
+    assert indexed == streamed
+
+
+def test_streaming_matches_index_on_every_figure():
+    index = read_columns(DATA).to_index()
+    totals = stream_daily_totals(DATA)
+    assert index.all_totals() == totals.all_totals()
+    for month in range(1, 13):
+        assert index.month_totals(month) == totals.month_totals(month)
+    rng = random.Random(7)
+    first = date(2024, 12, 25)
+    for _ in range(300):
+        start = first + timedelta(days=rng.randrange(380))
+        end = start + timedelta(days=rng.randrange(120))
+        assert index.range_totals(start, end) == totals.range_totals(start, end)
+
+
+def test_index_built_from_rows_matches_columns():
+    index = DailyIndex()
+    for i, hours in enumerate(DAYS):
+        for consumption in hours:
+            index.add(FIRST + timedelta(days=i), consumption, 0.0, 1.5)
+    assert index.range_totals(FIRST, LAST)[0] == sum(c for hours in DAYS for c in hours)
@@ -0,0 +1,55 @@
+import pathlib
+import sys
+
+import pytest
+
+from fast_reader import _parse_bytes, read_columns, read_store_columns
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.meter_store import export_csv
+
+HEADER = b"Time; Consumption (net) kWh; Production (net) kWh; Daily average temperature\n"
+ROWS = b"2025-01-01T00:00:00.000+02:00;1,569;0,000;-4,5\n2025-01-02T00:00:00.000+02:00;-0,5;12;,5"
+
+
+def read_both(tmp_path, data):
+    csv_file = tmp_path / "meter.csv"
+    csv_file.write_bytes(data)
+    return read_columns(str(csv_file)), _parse_bytes(data)
+
+
+@pytest.mark.parametrize("data", [
+    HEADER + ROWS,  # parsed in place
+    HEADER + ROWS + b"\n",
+    HEADER + ROWS.replace(b"\n", b"\r\n"),  # the Python parser from here on
+    HEADER + ROWS.replace(b"\n", b"\n\n"),
+    HEADER + ROWS.replace(b"1,569", b"1.5e3"),
+    HEADER,
+])
+def test_in_place_parser_matches_float(tmp_path, data):
+    columns, expected = read_both(tmp_path, data)
+    for name in ("days", "consumption", "production", "temp"):
+        assert getattr(columns, name) == getattr(expected, name)
+
+
+def test_values_are_the_floats_of_their_text(tmp_path):
+    columns, _ = read_both(tmp_path, HEADER + ROWS)
+    assert list(columns.consumption) == [1.569, -0.5]
+    assert list(columns.temp) == [-4.5, 0.5]
+    assert len(set(columns.days)) == 2
+
+
+def test_wrong_field_count_is_an_error(tmp_path):
+    csv_file = tmp_path / "meter.csv"
+    csv_file.write_bytes(HEADER + b"2025-01-01T00:00:00.000+02:00;1,5;0,0\n")
+    with pytest.raises(ValueError, match="fields"):
+        read_columns(str(csv_file))
+
+
+def test_store_with_mixed_decimals_reads_like_the_csv(tmp_path):
+    # 1,569 and -0,5 have different numbers of decimals, and so do 0,000 and 12
+    columns, _ = read_both(tmp_path, HEADER + ROWS.replace(b";,5", b";0,5"))
+    stored = read_store_columns(export_csv(str(tmp_path / "meter.csv")))
+    for name in ("days", "consumption", "production", "temp"):
+        assert getattr(stored, name) == getattr(columns, name)
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import date
+
+from daily_index import DailyIndex
+from server import handle, serve_client
+from task_e import yearly_report
+
+
+def small_index():
+    index = DailyIndex()
+    index.add(date(2025, 1, 1), 1.5, 0.25, -2.0)
+    index.add(date(2025, 1, 2), 2.5, 0.75, -4.0)
+    return index
+
+
+async def exchange(request: bytes, limit: int = 2**16) -> bytes:
+    """Sends raw bytes to a served connection and returns everything it answers."""
+    index = small_index()
+    server = await asyncio.start_server(lambda r, w: serve_client(index, r, w), "127.0.0.1", 0, limit=limit)
+    async with server:
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        writer.write_eof()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    return response
+
+
+def test_yearly_report():
+    status, body = handle(small_index(), "/yearly")
+    assert status == 200
+    assert body["lines"] == yearly_report(small_index())
+    assert body["consumption_kwh"] == 4.0
+
+
+def test_keep_alive_serves_requests_in_turn():
+    response = asyncio.run(exchange(b"GET /yearly HTTP/1.1\r\n\r\nGET /nope HTTP/1.1\r\n\r\n"))
+    assert response.count(b"HTTP/1.1 200 OK") == 1
+    assert response.count(b"HTTP/1.1 404 Not Found") == 1
+
+
+def test_request_body_is_not_read_as_the_next_request():
+    request = b"POST /yearly HTTP/1.1\r\nContent-Length: 11\r\n\r\nGET /nope x"
+    response = asyncio.run(exchange(request))
+    assert response.startswith(b"HTTP/1.1 400 Bad Request")
+    assert b"Connection: close" in response
+    assert response.count(b"HTTP/1.1") == 1
+
+
+def test_oversized_header_line_is_answered_with_431():
+    request = b"GET /yearly HTTP/1.1\r\nX-Long: " + b"a" * 5000 + b"\r\n\r\n"
+    response = asyncio.run(exchange(request, limit=1024))
+    assert response.startswith(b"HTTP/1.1 431 Request Header Fields Too Large")
+    assert response.count(b"HTTP/1.1") == 1
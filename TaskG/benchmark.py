@@ -0,0 +1,537 @@
+"""
+Benchmarks for the TaskG reservation programs on generated data
+
+Usage:
+ python benchmark.py parsing [rows]
+ python benchmark.py memory [rows]
+ python benchmark.py parallel [rows]
+ python benchmark.py report [rows]
+ python benchmark.py output [rows]
+ python benchmark.py conflicts [rows]
+ python benchmark.py slots [rows]
+ python benchmark.py sqlite [rows]
+ python benchmark.py quarantine [rows]
+ python benchmark.py stream [rows]
+"""
+
+from __future__ import annotations
+
+from contextlib import redirect_stdout
+from datetime import date, datetime, time, timedelta
+import io
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time as timer
+import tracemalloc
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from conflicts import ConflictIndex, find_conflicts, reservation_interval
+from free_slots import SlotFinder
+from reservation_db import ReservationDatabase
+from reservation_index import ReservationIndex
+from reservation_table import ReservationTable
+from shared.helpers import Quarantine, ReportSink
+import task_g_class
+import task_g_Dict
+from task_g_class import (
+    Reservation,
+    convert_reservation,
+    fetch_reservations,
+    fetch_reservations_parallel,
+    iter_reservations,
+    reservation_totals_parallel,
+)
+from task_g_Dict import fetch_reservations as fetch_reservation_dicts
+
+RESOURCES = ["Forest Area 1", "Flower Room", "Red Room", "Storage Area N", "Botanical Lab"]
+
+
+def generate_reservations(reservation_file: str, rows: int, seed: int = 42) -> None:
+    """
+    Writes a reservations.txt style file with the given number of rows
+    """
+    rng = random.Random(seed)
+    with open(reservation_file, "w", encoding="utf-8") as f:
+        for i in range(rows):
+            f.write(
+                f"{i + 1}|Guest {i}|guest{i}@example.com|040{i % 10_000_000:07d}"
+                f"|2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                f"|{rng.randint(7, 20):02d}:{rng.choice((0, 15, 30, 45)):02d}"
+                f"|{rng.randint(1, 5)}|{rng.randint(1000, 5000) / 100:.2f}"
+                f"|{rng.choice(('True', 'False'))}|{rng.choice(RESOURCES)}"
+                f"|2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                f" {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}\n"
+            )
+
+
+def generate_bookings(rows: int, seed: int = 42, rooms: int | None = None) -> list[Reservation]:
+    """
+    Returns reservations in 2025 spread over one room per 200 bookings by
+    default, so rooms are booked about as densely as a real calendar
+    """
+    rng = random.Random(seed)
+    rooms = rooms or max(1, rows // 200)
+    first_day = date(2025, 1, 1)
+    created = datetime(2024, 12, 1)
+    return [
+        Reservation(
+            i + 1, f"Guest {i}", f"guest{i}@example.com", "0400000000",
+            first_day + timedelta(days=rng.randrange(365)),
+            time(rng.randint(7, 20), rng.choice((0, 15, 30, 45))),
+            rng.randint(1, 5), 20.0, True, f"Room {rng.randrange(rooms)}", created,
+        )
+        for i in range(rows)
+    ]
+
+
+def naive_conflicts(reservations: list[Reservation]) -> set[tuple[int, int]]:
+    """
+    The O(n²) check of every pair, kept as the baseline
+    """
+    found = set()
+    for i, a in enumerate(reservations):
+        a_start, a_end = reservation_interval(a)
+        for b in reservations[i + 1:]:
+            b_start, b_end = reservation_interval(b)
+            if a.resource == b.resource and a_start < b_end and b_start < a_end:
+                found.add((min(a.reservation_id, b.reservation_id), max(a.reservation_id, b.reservation_id)))
+    return found
+
+
+def convert_reservation_strptime(data: list[str]) -> Reservation:
+    """
+    The original strptime based conversion, kept as the baseline
+    """
+    time_str = data[5].strip()
+    time_format = "%H:%M:%S" if time_str.count(":") == 2 else "%H:%M"
+    return Reservation(
+        reservation_id=int(data[0]),
+        name=data[1].strip(),
+        email=data[2].strip(),
+        phone=data[3].strip(),
+        date=datetime.strptime(data[4].strip(), "%Y-%m-%d").date(),
+        time=datetime.strptime(time_str, time_format).time(),
+        duration=int(data[6]),
+        price=float(data[7]),
+        confirmed=data[8].strip() == "True",
+        resource=data[9].strip(),
+        created=datetime.strptime(data[10].strip(), "%Y-%m-%d %H:%M:%S"),
+    )
+
+
+def report(label: str, rows: int, seconds: float) -> None:
+    print(f"{label:<28} {seconds:8.3f} s  {rows / seconds:12,.0f} rows/s")
+
+
+def bench_parsing(reservation_file: str, rows: int) -> None:
+    """
+    Compares strptime conversion with the fixed-format fast path
+    """
+    with open(reservation_file, encoding="utf-8") as f:
+        lines = [line.split("|") for line in f]
+
+    start = timer.perf_counter()
+    for fields in lines:
+        convert_reservation_strptime(fields)
+    baseline = timer.perf_counter() - start
+    report("strptime", rows, baseline)
+
+    start = timer.perf_counter()
+    for fields in lines:
+        convert_reservation(fields)
+    fast = timer.perf_counter() - start
+    report("fast path", rows, fast)
+
+    start = timer.perf_counter()
+    for _ in iter_reservations(reservation_file):
+        pass
+    report("iter_reservations (file)", rows, timer.perf_counter() - start)
+
+    print(f"Speedup: {baseline / fast:.1f}x")
+
+
+def bench_memory(reservation_file: str, rows: int) -> None:
+    """
+    Measures the memory held by each in-memory representation, scaled to 1M rows
+    """
+    loaders = [
+        ("list[dict] (task_g_Dict)", fetch_reservation_dicts),
+        ("list[Reservation] slotted", lambda f: list(iter_reservations(f))),
+        ("ReservationTable", ReservationTable.from_file),
+    ]
+    for label, loader in loaders:
+        tracemalloc.start()
+        data = loader(reservation_file)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del data
+        per_million = current / rows * 1_000_000 / 2**20
+        print(f"{label:<28} {current / rows:8.0f} B/row  {per_million:10.1f} MiB per 1M rows")
+
+
+def bench_parallel(reservation_file: str, rows: int) -> None:
+    """
+    Compares single-process parsing with the process pool at the CPU count
+    """
+    workers = os.cpu_count() or 1
+    runs = [
+        ("fetch_reservations", lambda: fetch_reservations(reservation_file)),
+        (f"parallel, {workers} workers", lambda: fetch_reservations_parallel(reservation_file, workers)),
+        (f"totals only, {workers} workers", lambda: reservation_totals_parallel(reservation_file, workers)),
+    ]
+    for label, run in runs:
+        start = timer.perf_counter()
+        run()
+        report(label, rows, timer.perf_counter() - start)
+
+
+def five_pass_report(module, reservations) -> None:
+    """
+    Prints the report the original way, one section function after another
+    """
+    sections = [
+        module.confirmed_reservations,
+        module.long_reservations,
+        module.confirmation_statuses,
+        module.confirmation_summary,
+        module.total_revenue,
+    ]
+    for title, section in zip(module.SECTION_TITLES, sections):
+        print(title)
+        section(reservations)
+
+
+def fused_report(module, reservations) -> None:
+    """
+    Prints the report from the single-pass report_sections
+    """
+    for title, lines in zip(module.SECTION_TITLES, module.report_sections(reservations)):
+        print(title)
+        if lines:
+            print("\n".join(lines))
+
+
+def bench_report(reservation_file: str, rows: int) -> None:
+    """
+    Compares the five-pass report with report_sections for both TaskG variants
+    """
+    variants = [
+        ("class", task_g_class, fetch_reservations(reservation_file)),
+        ("dict", task_g_Dict, fetch_reservation_dicts(reservation_file)),
+    ]
+    for name, module, reservations in variants:
+        outputs = []
+        for label, build in (("five passes", five_pass_report), ("single pass", fused_report)):
+            buffer = io.StringIO()
+            start = timer.perf_counter()
+            with redirect_stdout(buffer):
+                build(module, reservations)
+            report(f"{name}: {label}", rows, timer.perf_counter() - start)
+            outputs.append(buffer.getvalue())
+        print(f"{name}: identical output: {outputs[0] == outputs[1]}")
+
+
+def bench_output(reservation_file: str, rows: int) -> None:
+    """
+    Compares print() per line with a ReportSink when writing the report to a file
+    """
+    reservations = fetch_reservations(reservation_file)
+    with tempfile.TemporaryDirectory() as tmp:
+        printed = os.path.join(tmp, "printed.txt")
+        start = timer.perf_counter()
+        with open(printed, "w", encoding="utf-8") as f:
+            for title, lines in zip(task_g_class.SECTION_TITLES, task_g_class.report_sections(reservations)):
+                print(title, file=f, flush=True)
+                for line in lines:
+                    print(line, file=f, flush=True)
+        report("print() per line", rows, timer.perf_counter() - start)
+
+        buffered = os.path.join(tmp, "buffered.txt")
+        start = timer.perf_counter()
+        with ReportSink.to_file(buffered) as sink:
+            task_g_class.write_report(task_g_class.report_sections(reservations), sink)
+        report("ReportSink to file", rows, timer.perf_counter() - start)
+
+        with open(printed, encoding="utf-8") as a, open(buffered, encoding="utf-8") as b:
+            print(f"identical output: {a.read() == b.read()}")
+
+
+def bench_conflicts(reservation_file: str, rows: int) -> None:
+    """
+    Bulk double-booking check and online checks of new bookings
+    """
+    bookings = generate_bookings(rows)
+
+    sample = [r for r in bookings if r.resource in ("Room 0", "Room 1", "Room 2")]
+    start = timer.perf_counter()
+    expected = naive_conflicts(sample)
+    seconds = timer.perf_counter() - start
+    report(f"naive pairs ({len(sample)} rows)", len(sample), seconds)
+    print(f"naive pairs on all rows would take about {seconds * (rows / len(sample)) ** 2 / 3600:,.0f} h")
+    result = {tuple(sorted((a.reservation_id, b.reservation_id))) for a, b in find_conflicts(sample)}
+    print(f"identical conflicts: {result == expected}")
+
+    start = timer.perf_counter()
+    pairs = find_conflicts(bookings)
+    report("find_conflicts (sweep line)", rows, timer.perf_counter() - start)
+    print(f"conflicting pairs: {len(pairs):,}")
+
+    start = timer.perf_counter()
+    index = ConflictIndex(bookings)
+    report("ConflictIndex build", rows, timer.perf_counter() - start)
+    print(f"accepted {len(index):,}, rejected {len(index.rejected):,}")
+
+    new = generate_bookings(100_000, seed=7, rooms=max(1, rows // 200))
+    for r in new:
+        r.reservation_id += rows
+    start = timer.perf_counter()
+    clashes = sum(index.has_conflict(r) for r in new)
+    seconds = timer.perf_counter() - start
+    report("has_conflict", len(new), seconds)
+    print(f"{seconds / len(new) * 1e6:.2f} µs per check, {clashes:,} of {len(new):,} new bookings conflict")
+
+    start = timer.perf_counter()
+    accepted = 0
+    for r in new:
+        if not index.has_conflict(r):
+            index.add(r)
+            accepted += 1
+    report("check + add", len(new), timer.perf_counter() - start)
+    print(f"added {accepted:,} bookings, index holds {len(index):,}")
+
+
+def bench_slots(reservation_file: str, rows: int) -> None:
+    """
+    Earliest free slot queries, for one room and for any of 20 rooms
+    """
+    bookings = generate_bookings(rows)
+    rooms = sorted({r.resource for r in bookings})
+    start = timer.perf_counter()
+    finder = SlotFinder(bookings)
+    report("SlotFinder build", rows, timer.perf_counter() - start)
+
+    rng = random.Random(1)
+    queries = [
+        (rng.choice(rooms), rng.randint(1, 8), datetime(2025, 1, 1) + timedelta(minutes=rng.randrange(365 * 1440)))
+        for _ in range(10_000)
+    ]
+    start = timer.perf_counter()
+    for room, hours, after in queries:
+        finder.earliest_slot(room, hours, after)
+    seconds = timer.perf_counter() - start
+    print(f"earliest_slot                {seconds / len(queries) * 1e6:8.1f} µs per query")
+
+    start = timer.perf_counter()
+    for _, hours, after in queries[:1000]:
+        finder.earliest_slot_any(rng.sample(rooms, 20), hours, after)
+    seconds = timer.perf_counter() - start
+    print(f"earliest_slot_any (20 rooms) {seconds / 1000 * 1e6:8.1f} µs per query")
+
+    # One room booked for 1 h every 90 minutes: the only 2 h slot is after the last booking
+    starts = [datetime(2025, 1, 1) + timedelta(minutes=90 * i) for i in range(min(rows, 100_000))]
+    packed = [
+        Reservation(i, "", "", "", at.date(), at.time(), 1, 0.0, True, "Packed Room", datetime(2024, 1, 1))
+        for i, at in enumerate(starts)
+    ]
+    packed_finder = SlotFinder(packed)
+    start = timer.perf_counter()
+    found = packed_finder.earliest_slot("Packed Room", 2, datetime(2025, 1, 1))
+    seconds = timer.perf_counter() - start
+    print(f"packed room, {len(packed):,} bookings: first 2 h slot {found} in {seconds * 1e6:.0f} µs")
+
+    room, hours, after = queries[0]
+    slot = finder.earliest_slot(room, hours, after)
+    booking = Reservation(rows + 1, "", "", "", slot.date(), slot.time(), hours, 0.0, True, room, datetime(2025, 1, 1))
+    start = timer.perf_counter()
+    for _ in range(1000):
+        finder.add(booking)
+        finder.remove(booking.reservation_id)
+    seconds = timer.perf_counter() - start
+    print(f"add + remove                 {seconds / 1000 * 1e6:8.1f} µs per pair")
+
+
+def bench_sqlite(reservation_file: str, rows: int) -> None:
+    """
+    Text file against the SQLite backend: loading, then the summary,
+    revenue and long reservation sections
+    """
+    def sections(summary, revenue, long) -> str:
+        buffer = io.StringIO()
+        with ReportSink(buffer) as sink:
+            summary(sink)
+            revenue(sink)
+            long(sink)
+            sink.flush()
+            return buffer.getvalue()
+
+    start = timer.perf_counter()
+    reservations = fetch_reservations(reservation_file)
+    report("text: fetch_reservations", rows, timer.perf_counter() - start)
+    start = timer.perf_counter()
+    expected = sections(
+        lambda sink: task_g_class.confirmation_summary(reservations, sink),
+        lambda sink: task_g_class.total_revenue(reservations, sink),
+        lambda sink: task_g_class.long_reservations(reservations, sink),
+    )
+    report("text: three sections", rows, timer.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp, ReservationDatabase(os.path.join(tmp, "r.sqlite")) as db:
+        start = timer.perf_counter()
+        db.load_file(reservation_file)
+        report("sqlite: bulk load", rows, timer.perf_counter() - start)
+        start = timer.perf_counter()
+        result = sections(db.confirmation_summary, db.total_revenue, db.long_reservations)
+        report("sqlite: three sections", rows, timer.perf_counter() - start)
+        print(f"identical output: {result == expected}")
+
+        start = timer.perf_counter()
+        found = db.query(resource="Red Room", confirmed=True, start=datetime(2025, 6, 1).date(),
+                         end=datetime(2025, 6, 7).date())
+        seconds = timer.perf_counter() - start
+        print(f"indexed query: {len(found):,} reservations in {seconds * 1000:.1f} ms")
+
+
+def bench_index(reservation_file: str, rows: int) -> None:
+    """
+    "Confirmed reservations for Red Room on one day" from a ReservationIndex
+    against a scan over every reservation
+    """
+    reservations = fetch_reservations(reservation_file)
+    start = timer.perf_counter()
+    index = ReservationIndex(reservations)
+    report("ReservationIndex build", rows, timer.perf_counter() - start)
+
+    rng = random.Random(1)
+    days = [date(2025, rng.randint(1, 12), rng.randint(1, 28)) for _ in range(1000)]
+    start = timer.perf_counter()
+    found = [index.on_date(day, "Red Room", True) for day in days]
+    seconds = timer.perf_counter() - start
+    print(f"indexed lookup               {seconds / len(days) * 1e6:8.1f} µs per query")
+
+    start = timer.perf_counter()
+    scanned = [
+        [r for r in reservations if r.date == day and r.resource == "Red Room" and r.is_confirmed()]
+        for day in days[:20]
+    ]
+    seconds = timer.perf_counter() - start
+    print(f"full scan                    {seconds / 20 * 1e6:8.1f} µs per query")
+    same = all(
+        sorted(a, key=lambda r: (r.time, r.reservation_id)) == b for a, b in zip(scanned, found)
+    )
+    print(f"identical results: {same}")
+
+
+# Ways a line gets broken in the quarantine benchmark, one per field that fails
+CORRUPTIONS = [
+    lambda fields: fields[:4] + ["2025-13-01"] + fields[5:],
+    lambda fields: fields[:6] + ["two"] + fields[7:],
+    lambda fields: fields[:7] + ["12,50"] + fields[8:],
+    lambda fields: fields[:3],
+]
+
+
+def bench_quarantine(reservation_file: str, rows: int) -> None:
+    """
+    Loading with and without the quarantine on clean data, then with one
+    line in 100 broken
+    """
+    start = timer.perf_counter()
+    expected = fetch_reservations(reservation_file)
+    report("fetch_reservations", rows, timer.perf_counter() - start)
+    start = timer.perf_counter()
+    quarantine = Quarantine()
+    checked = fetch_reservations(reservation_file, quarantine)
+    report("with quarantine", rows, timer.perf_counter() - start)
+    print(f"identical result: {checked == expected}, rejected: {len(quarantine)}")
+
+    start = timer.perf_counter()
+    fetch_reservation_dicts(reservation_file)
+    report("dicts", rows, timer.perf_counter() - start)
+    start = timer.perf_counter()
+    fetch_reservation_dicts(reservation_file, Quarantine())
+    report("dicts with quarantine", rows, timer.perf_counter() - start)
+
+    broken_file = reservation_file + ".broken"
+    broken = set()
+    with open(reservation_file, encoding="utf-8") as src, open(broken_file, "w", encoding="utf-8") as dst:
+        for i, line in enumerate(src):
+            if i % 100 == 50:
+                line = "|".join(CORRUPTIONS[len(broken) % len(CORRUPTIONS)](line.rstrip("\n").split("|"))) + "\n"
+                broken.add(i)
+            dst.write(line)
+    try:
+        try:
+            fetch_reservations(broken_file)
+        except ValueError as exc:
+            print(f"without quarantine: stops at the first broken line ({exc})")
+        with tempfile.TemporaryDirectory() as tmp:
+            start = timer.perf_counter()
+            with Quarantine(os.path.join(tmp, "rejects.tsv")) as quarantine:
+                loaded = fetch_reservations(broken_file, quarantine)
+            report("broken, with quarantine", rows, timer.perf_counter() - start)
+        kept = [r for i, r in enumerate(expected) if i not in broken]
+        print(f"rejected: {len(quarantine):,} of {len(broken):,} broken, valid rows identical: {loaded == kept}")
+    finally:
+        os.remove(broken_file)
+
+
+def bench_stream(reservation_file: str, rows: int) -> None:
+    """
+    The report from a list of reservations against the streaming report,
+    with the peak traced memory of each
+    """
+    def in_memory(sink: ReportSink) -> None:
+        task_g_class.write_report(task_g_class.report_sections(fetch_reservations(reservation_file)), sink)
+
+    def streaming(sink: ReportSink) -> None:
+        task_g_class.stream_report(iter_reservations(reservation_file), sink)
+
+    outputs = []
+    for label, build in (("fetch + report_sections", in_memory), ("stream_report", streaming)):
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as target:
+            start = timer.perf_counter()
+            with ReportSink(target) as sink:
+                build(sink)
+            report(label, rows, timer.perf_counter() - start)
+            target.seek(0)
+            outputs.append(target.read())
+        # A second run under tracemalloc, which slows it down too much to time
+        with tempfile.TemporaryFile("w", encoding="utf-8") as target:
+            tracemalloc.start()
+            with ReportSink(target) as sink:
+                build(sink)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"{'':<28} peak {peak / 1e6:8.1f} MB")
+    print(f"identical output: {outputs[0] == outputs[1]}")
+
+BENCHMARKS = {
+    "parsing": bench_parsing,
+    "memory": bench_memory,
+    "parallel": bench_parallel,
+    "report": bench_report,
+    "output": bench_output,
+    "conflicts": bench_conflicts,
+    "slots": bench_slots,
+    "sqlite": bench_sqlite,
+    "index": bench_index,
+    "quarantine": bench_quarantine,
+    "stream": bench_stream,
+}
+
+
+def main() -> None:
+    name = sys.argv[1] if len(sys.argv) > 1 else "parsing"
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    with tempfile.NamedTemporaryFile(suffix=".txt") as tmp:
+        generate_reservations(tmp.name, rows)
+        print(f"Benchmark '{name}' on {rows:,} rows")
+        BENCHMARKS[name](tmp.name, rows)
+
+
+if __name__ == "__main__":
+    main()
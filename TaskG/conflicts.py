@@ -0,0 +1,135 @@
+"""
+Double-booking detection per resource
+
+A reservation occupies its resource from date + time for duration hours.
+Intervals are half-open, so a booking that starts when another ends is not
+a conflict. Times are handled as whole minutes since 0001-01-01.
+
+ - find_conflicts checks a whole set of reservations with a sweep line per
+   resource: sort by start, keep a heap of the bookings still running.
+   O(n log n + k) for n reservations and k conflicting pairs.
+ - ConflictIndex keeps the accepted bookings of each resource sorted by
+   start. Accepted bookings never overlap, so a new booking can only clash
+   with its neighbours, which bisect finds in O(log n). When it is built
+   from existing data, bookings that overlap an earlier one are set aside
+   in `rejected` instead of being accepted.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+from task_g_class import Reservation
+
+
+def reservation_interval(r: Reservation) -> tuple[int, int]:
+    """Returns (start, end) of a reservation in minutes since 0001-01-01."""
+    start = r.date.toordinal() * 1440 + r.time.hour * 60 + r.time.minute
+    return start, start + max(r.duration, 0) * 60
+
+
+def find_conflicts(reservations: Iterable[Reservation]) -> list[tuple[Reservation, Reservation]]:
+    """
+    Returns every pair of reservations that overlap on the same resource.
+    Within a pair the earlier booking comes first; pairs are ordered by
+    resource and then by the start of the later booking.
+    """
+    keyed = sorted(
+        ((r.resource, *reservation_interval(r), r.reservation_id, r) for r in reservations),
+        key=itemgetter(0, 1, 2, 3),
+    )
+    conflicts: list[tuple[Reservation, Reservation]] = []
+    for _, bookings in groupby(keyed, key=itemgetter(0)):
+        running: list[tuple[int, int, int, Reservation]] = []  # heap of (end, start, id, reservation)
+        for _, start, end, reservation_id, r in bookings:
+            while running and running[0][0] <= start:
+                heapq.heappop(running)
+            if end <= start:  # zero-length bookings occupy nothing
+                continue
+            for _, _, _, other in sorted(running, key=itemgetter(1, 2)):
+                conflicts.append((other, r))
+            heapq.heappush(running, (end, start, reservation_id, r))
+    return conflicts
+
+
+class ConflictIndex:
+    """Non-overlapping bookings per resource, for checking new bookings as they arrive."""
+
+    def __init__(self, reservations: Iterable[Reservation] = ()) -> None:
+        # Sorted (start, end, id) per resource; zero-length bookings are only in _by_id
+        self._by_resource: dict[str, list[tuple[int, int, int]]] = {}
+        self._by_id: dict[int, Reservation] = {}
+        self.rejected: list[Reservation] = []  # overlapped an earlier booking while loading
+        keyed = sorted(
+            ((r.resource, *reservation_interval(r), r.reservation_id, r) for r in reservations),
+            key=itemgetter(0, 1, 2, 3),
+        )
+        for resource, bookings in groupby(keyed, key=itemgetter(0)):
+            slots: list[tuple[int, int, int]] = []
+            for _, start, end, reservation_id, r in bookings:
+                if reservation_id in self._by_id:
+                    raise ValueError(f"Reservation {reservation_id} is already indexed")
+                if end > start:
+                    if slots and start < slots[-1][1]:
+                        self.rejected.append(r)
+                        continue
+                    slots.append((start, end, reservation_id))
+                self._by_id[reservation_id] = r
+            if slots:
+                self._by_resource[resource] = slots
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, reservation_id: int) -> bool:
+        return reservation_id in self._by_id
+
+    def get(self, reservation_id: int) -> Reservation | None:
+        return self._by_id.get(reservation_id)
+
+    def conflicts(self, r: Reservation) -> list[Reservation]:
+        """Returns the accepted bookings that r would overlap, in start order."""
+        start, end = reservation_interval(r)
+        slots = self._by_resource.get(r.resource)
+        if not slots or end <= start:
+            return []
+        i = bisect_left(slots, (start,))
+        if i > 0 and slots[i - 1][1] > start:  # the booking before is still running
+            i -= 1
+        found = []
+        while i < len(slots) and slots[i][0] < end:
+            if slots[i][2] != r.reservation_id:
+                found.append(self._by_id[slots[i][2]])
+            i += 1
+        return found
+
+    def has_conflict(self, r: Reservation) -> bool:
+        return bool(self.conflicts(r))
+
+    def add(self, r: Reservation) -> None:
+        """Accepts a booking. Raises ValueError if it overlaps an accepted one."""
+        if r.reservation_id in self._by_id:
+            raise ValueError(f"Reservation {r.reservation_id} is already indexed")
+        clashes = self.conflicts(r)
+        if clashes:
+            ids = ", ".join(str(other.reservation_id) for other in clashes)
+            raise ValueError(f"Reservation {r.reservation_id} overlaps {r.resource} booking(s) {ids}")
+        start, end = reservation_interval(r)
+        if end > start:
+            insort(self._by_resource.setdefault(r.resource, []), (start, end, r.reservation_id))
+        self._by_id[r.reservation_id] = r
+
+    def remove(self, reservation_id: int) -> Reservation:
+        """Removes an accepted booking and returns it."""
+        r = self._by_id.pop(reservation_id)
+        start, end = reservation_interval(r)
+        if end > start:
+            slots = self._by_resource[r.resource]
+            del slots[bisect_left(slots, (start, end, reservation_id))]
+            if not slots:
+                del self._by_resource[r.resource]
+        return r
@@ -0,0 +1,173 @@
+"""
+Follow mode for a reservations file that is appended to while running
+
+A ReservationFollower remembers how far into the file it has read. Each
+poll() parses only the lines appended since the last poll and updates the
+running confirmation counts and confirmed revenue. If the file shrinks, is
+replaced (log rotation) or its first bytes change, the totals are rebuilt
+from the top.
+
+A last line without a line break may still be being written. It is read on
+the first poll, like the report programs read it, on the final poll when
+following stops, and otherwise once the file size has stayed the same for
+SETTLE_POLLS polls in a row, so a writer that stalls briefly mid-line does
+not lose its reservation. Lines that do not convert are quarantined with
+their line numbers instead of stopping the follower; without a quarantine
+file only the latest KEEP_REJECTS of them are kept in memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterator
+import os
+import pathlib
+import sys
+import time as timer
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import Quarantine
+from shared.instrument import Instrumentation, add_profile_argument
+from task_g_class import Reservation, convert_reservation
+
+HEAD_SIZE = 64
+SETTLE_POLLS = 3  # polls with an unchanged size before an unfinished last line is read
+KEEP_REJECTS = 1000  # rejects kept in memory when there is no quarantine file
+
+
+class ReservationFollower:
+    """Incrementally maintained totals for a growing reservations file."""
+
+    def __init__(self, reservation_file: str, quarantine: Quarantine | None = None) -> None:
+        self.reservation_file = reservation_file
+        self.quarantine = quarantine if quarantine is not None else Quarantine(keep=KEEP_REJECTS)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets everything read so far; the next poll starts from the top."""
+        self.offset = 0
+        self.line_number = 0  # lines read up to offset
+        self.last_size = -1  # file size seen by the previous poll
+        self.unchanged_polls = 0  # polls in a row that saw last_size
+        self.inode: int | None = None
+        self.head = b""  # first bytes of the file, to notice rewrites in place
+        self.confirmed_count = 0
+        self.not_confirmed_count = 0
+        self.revenue = 0.0
+
+    def _add(self, r: Reservation) -> None:
+        if r.is_confirmed():
+            self.confirmed_count += 1
+            self.revenue += r.total_price()
+        else:
+            self.not_confirmed_count += 1
+
+    def poll(self, final: bool = False) -> list[Reservation]:
+        """
+        Parses the lines appended since the previous poll and returns the
+        reservations among them. An unfinished last line is left for a later
+        poll unless this is the first read, the final poll, or the file has
+        not grown for SETTLE_POLLS polls.
+        """
+        try:
+            stat = os.stat(self.reservation_file)
+        except FileNotFoundError:  # between rotation and the new file appearing
+            return []
+        with open(self.reservation_file, "rb") as f:
+            if (
+                stat.st_ino != self.inode
+                or stat.st_size < self.offset
+                or f.read(len(self.head)) != self.head
+            ):
+                self.reset()
+                self.inode = stat.st_ino
+            self.unchanged_polls = self.unchanged_polls + 1 if stat.st_size == self.last_size else 0
+            self.last_size = stat.st_size
+            settled = final or self.offset == 0 or self.unchanged_polls >= SETTLE_POLLS
+            if stat.st_size == self.offset:
+                return []
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        if self.offset == 0:
+            self.head = data[:HEAD_SIZE]
+        end = len(data) if settled else data.rfind(b"\n") + 1
+
+        added: list[Reservation] = []
+        start = 0
+        while start < end:
+            stop = data.find(b"\n", start, end) + 1 or end
+            raw = data[start:stop]
+            # The offset only moves past lines that were converted or quarantined
+            self.offset += stop - start
+            self.line_number += 1
+            start = stop
+            try:
+                line = raw.decode("utf-8")
+            except UnicodeDecodeError as exc:
+                self.quarantine.reject(self.line_number, f"not UTF-8: {exc}", raw.decode("utf-8", "replace"))
+                continue
+            for r in self.quarantine.convert_lines([line], convert_reservation, self.line_number):
+                self._add(r)
+                added.append(r)
+        return added
+
+    def summary_lines(self) -> list[str]:
+        return [
+            f"- Confirmed reservations: {self.confirmed_count} pcs",
+            f"- Not confirmed reservations: {self.not_confirmed_count} pcs",
+            f"Total revenue from confirmed reservations: {self.revenue:.2f} €".replace(".", ","),
+        ]
+
+
+def follow_reservations(
+    follower: ReservationFollower,
+    interval: float = 1.0,
+    prof: Instrumentation | None = None,
+) -> Iterator[ReservationFollower]:
+    """
+    Polls the follower's file every `interval` seconds and yields the
+    follower whenever new reservations have been read. Runs until the caller
+    stops iterating; call follower.poll(final=True) then to read a last line
+    that was never finished.
+    """
+    prof = prof or Instrumentation()
+    while True:
+        with prof.stage("poll"):
+            added = follower.poll()
+        if added:
+            prof.count("reservations", len(added))
+            yield follower
+        timer.sleep(interval)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Prints reservation totals as the file grows.")
+    parser.add_argument("--quarantine", metavar="FILE", help="write lines that do not convert to FILE")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    prof = Instrumentation.from_args(args.profile)
+    reservation_file = pathlib.Path(__file__).parent / "reservations.txt"
+    # The summary is written when following is stopped with Ctrl+C
+    with prof.run(), Quarantine(args.quarantine, keep=KEEP_REJECTS) as quarantine:
+        follower = ReservationFollower(reservation_file, quarantine)
+        rejected = 0
+
+        def show() -> None:
+            nonlocal rejected
+            with prof.stage("print"):
+                print("\n".join(follower.summary_lines()), flush=True)
+            if len(quarantine) > rejected:
+                print(f"{len(quarantine) - rejected} malformed line(s) skipped", file=sys.stderr)
+                rejected = len(quarantine)
+
+        try:
+            for _ in follow_reservations(follower, prof=prof):
+                show()
+        except KeyboardInterrupt:
+            if follower.poll(final=True):  # a last line the writer never finished
+                show()
+
+
+if __name__ == "__main__":
+    main()
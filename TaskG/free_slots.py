@@ -0,0 +1,313 @@
+"""
+Earliest free slot search over the reservation calendar
+
+Each resource keeps its free time as sorted, disjoint intervals in whole
+minutes (see conflicts.reservation_interval), from the start of time to a
+far future end. The intervals are stored in blocks of about BLOCK entries,
+together with the first start and the longest gap of every block, so a
+search skips whole blocks that have no gap long enough:
+
+ - earliest_slot bisects to the free interval containing `after`, then
+   finds the next block with a long enough gap in a max segment tree over
+   the longest gaps, in O(log n) rather than one block at a time
+ - add / remove split or merge the free intervals around one booking, so
+   the structure is updated in place instead of being rebuilt
+
+Overlapping bookings in the source data are merged into one busy period.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from conflicts import reservation_interval
+from task_g_class import Reservation
+
+BLOCK = 64
+FOREVER = (date.max.toordinal() + 1) * 1440  # the end of the calendar, in minutes
+
+Interval = tuple[int, int]
+
+
+def to_minutes(moment: datetime) -> int:
+    """Returns a datetime as minutes since 0001-01-01, rounded up to a whole minute."""
+    minutes = moment.toordinal() * 1440 + moment.hour * 60 + moment.minute
+    return minutes + 1 if moment.second or moment.microsecond else minutes
+
+
+def from_minutes(minutes: int) -> datetime:
+    days, minute = divmod(minutes, 1440)
+    return datetime.fromordinal(days) + timedelta(minutes=minute)
+
+
+def merge_busy(intervals: Iterable[Interval]) -> list[Interval]:
+    """Merges intervals into sorted, disjoint busy periods. Empty intervals are dropped."""
+    merged: list[list[int]] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+class FreeIntervals:
+    """The free time of one resource as sorted, disjoint intervals."""
+
+    def __init__(self, busy: Iterable[Interval] = ()) -> None:
+        free: list[Interval] = []
+        position = 0
+        for start, end in merge_busy(busy):
+            if start > position:
+                free.append((position, start))
+            position = end
+        if position < FOREVER:
+            free.append((position, FOREVER))
+        self._blocks = [free[i:i + BLOCK] for i in range(0, len(free), BLOCK)]
+        self._starts = [block[0][0] for block in self._blocks]
+        self._longest = [max(e - s for s, e in block) for block in self._blocks]
+        self._maxima: list[int] | None = None  # segment tree over _longest, None when stale
+        self._build_maxima()
+
+    def __len__(self) -> int:
+        return sum(map(len, self._blocks))
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def _locate(self, t: int) -> tuple[int, int]:
+        # Block and position of the last interval starting at or before t (0, 0 if none)
+        b = max(bisect_right(self._starts, t) - 1, 0)
+        i = max(bisect_right(self._blocks[b], (t, FOREVER)) - 1, 0) if self._blocks else 0
+        return b, i
+
+    def _refresh(self, b: int) -> None:
+        block = self._blocks[b]
+        if not block:
+            del self._blocks[b], self._starts[b], self._longest[b]
+            self._maxima = None
+            return
+        if len(block) > 2 * BLOCK:
+            self._blocks[b + 1:b + 1] = [block[BLOCK:]]
+            del block[BLOCK:]
+            self._starts.insert(b + 1, 0)
+            self._longest.insert(b + 1, 0)
+            self._maxima = None
+            self._refresh(b + 1)
+        self._starts[b] = block[0][0]
+        self._longest[b] = max(e - s for s, e in block)
+        if self._maxima is not None:
+            self._set_maximum(b, self._longest[b])
+
+    def _build_maxima(self) -> list[int]:
+        # Leaves at size + b; padding leaves are -1 so they never hold a gap
+        size = 1 << max(len(self._longest) - 1, 0).bit_length()
+        tree = [-1] * size + self._longest + [-1] * (size - len(self._longest))
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._maxima = tree
+        return tree
+
+    def _set_maximum(self, b: int, longest: int) -> None:
+        tree = self._maxima
+        node = len(tree) // 2 + b
+        tree[node] = longest
+        while node > 1:
+            node //= 2
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+
+    def _next_block(self, b: int, length: int) -> int | None:
+        # The first block from b on whose longest gap is at least length
+        tree = self._maxima if self._maxima is not None else self._build_maxima()
+        size = len(tree) // 2
+        if b >= len(self._longest):
+            return None
+        node = size + b
+        while tree[node] < length:
+            while node & 1:  # a right child: climb until there is a right sibling
+                node //= 2
+            if node == 0:
+                return None
+            node += 1
+        while node < size:
+            node = 2 * node if tree[2 * node] >= length else 2 * node + 1
+        return node - size
+
+    def earliest(self, after: int, length: int) -> int | None:
+        """Returns the first minute >= after that starts `length` free minutes, or None."""
+        if not self._blocks:
+            return None
+        b, i = self._locate(after)
+        for s, e in self._blocks[b][i:]:
+            begin = max(s, after)
+            if e - begin >= length:
+                return begin
+        b = self._next_block(b + 1, max(length, 0))
+        if b is None:
+            return None
+        return next(s for s, e in self._blocks[b] if e - s >= length)
+
+    def is_free(self, start: int, end: int) -> bool:
+        if end <= start:
+            return True
+        if not self._blocks:
+            return False
+        b, i = self._locate(start)
+        s, e = self._blocks[b][i]
+        return s <= start and end <= e
+
+    def occupy(self, start: int, end: int) -> None:
+        """Marks [start, end) busy. Raises ValueError unless all of it is free."""
+        if end <= start:
+            return
+        if not self.is_free(start, end):
+            raise ValueError(f"Minutes {start}-{end} are not free")
+        b, i = self._locate(start)
+        block = self._blocks[b]
+        s, e = block[i]
+        block[i:i + 1] = [piece for piece in ((s, start), (end, e)) if piece[1] > piece[0]]
+        self._refresh(b)
+
+    def release(self, start: int, end: int) -> None:
+        """Marks [start, end) free again, joining it with free time on either side."""
+        if end <= start:
+            return
+        if self._blocks:
+            b, i = self._locate(start)
+            s, e = self._blocks[b][i]
+            if s < end and e > start:
+                raise ValueError(f"Minutes {start}-{end} are already partly free")
+            if e == start:  # free time right before
+                start = s
+                self._remove(b, i)
+        if self._blocks:
+            b, i = self._locate(end)
+            s, e = self._blocks[b][i]
+            if s == end:  # free time right after
+                end = e
+                self._remove(b, i)
+            elif start < s < end or start < e <= end:
+                raise ValueError(f"Minutes {start}-{end} are already partly free")
+        self._insert((start, end))
+
+    def _remove(self, b: int, i: int) -> None:
+        del self._blocks[b][i]
+        self._refresh(b)
+
+    def _insert(self, interval: Interval) -> None:
+        if not self._blocks:
+            self._blocks.append([interval])
+            self._starts.append(interval[0])
+            self._longest.append(interval[1] - interval[0])
+            self._maxima = None
+            return
+        b = max(bisect_right(self._starts, interval[0]) - 1, 0)
+        insort(self._blocks[b], interval)
+        self._refresh(b)
+
+
+class SlotFinder:
+    """Free intervals of every resource, kept up to date as bookings are added and removed."""
+
+    def __init__(self, reservations: Iterable[Reservation] = ()) -> None:
+        self._by_id: dict[int, Reservation] = {}
+        # Every booking per resource as sorted (start, end, id), to find the
+        # ones still covering a period when an overlapping booking is removed
+        self._bookings: dict[str, list[tuple[int, int, int]]] = {}
+        self._longest: dict[str, int] = {}
+        self._free: dict[str, FreeIntervals] = {}
+        keyed = sorted(
+            ((r.resource, *reservation_interval(r), r.reservation_id, r) for r in reservations),
+            key=itemgetter(0, 1, 2, 3),
+        )
+        for resource, rows in groupby(keyed, key=itemgetter(0)):
+            bookings = []
+            for _, start, end, reservation_id, r in rows:
+                if reservation_id in self._by_id:
+                    raise ValueError(f"Reservation {reservation_id} is already indexed")
+                self._by_id[reservation_id] = r
+                bookings.append((start, end, reservation_id))
+            self._bookings[resource] = bookings
+            self._longest[resource] = max(end - start for start, end, _ in bookings)
+            self._free[resource] = FreeIntervals((start, end) for start, end, _ in bookings)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, reservation_id: int) -> bool:
+        return reservation_id in self._by_id
+
+    def resources(self) -> list[str]:
+        return sorted(self._free)
+
+    def earliest_slot(self, resource: str, hours: float, after: datetime) -> datetime | None:
+        """
+        Returns the start of the earliest free period of `hours` hours for the
+        resource at or after `after`, or None if there is none before the end
+        of the calendar. A resource without bookings is free at once.
+        """
+        length = round(hours * 60)
+        start = to_minutes(after)
+        free = self._free.get(resource)
+        found = free.earliest(start, length) if free is not None else start
+        # None as well when the period would start or run past the end of the calendar
+        if found is None or found >= FOREVER or found + length > FOREVER:
+            return None
+        return from_minutes(found)
+
+    def earliest_slot_any(
+        self, resources: Iterable[str], hours: float, after: datetime
+    ) -> tuple[str, datetime] | None:
+        """
+        Returns (resource, start) of the earliest free period among the
+        resources. Ties go to the resource listed first.
+        """
+        best: tuple[str, datetime] | None = None
+        for resource in resources:
+            found = self.earliest_slot(resource, hours, after)
+            if found is not None and (best is None or found < best[1]):
+                best = (resource, found)
+        return best
+
+    def is_free(self, resource: str, start: datetime, hours: float) -> bool:
+        begin = to_minutes(start)
+        free = self._free.get(resource)
+        return free is None or free.is_free(begin, begin + round(hours * 60))
+
+    def add(self, r: Reservation) -> None:
+        """Books a reservation. Raises ValueError if its time is not free."""
+        if r.reservation_id in self._by_id:
+            raise ValueError(f"Reservation {r.reservation_id} is already indexed")
+        start, end = reservation_interval(r)
+        free = self._free.setdefault(r.resource, FreeIntervals())
+        free.occupy(start, end)
+        self._by_id[r.reservation_id] = r
+        insort(self._bookings.setdefault(r.resource, []), (start, end, r.reservation_id))
+        self._longest[r.resource] = max(self._longest.get(r.resource, 0), end - start)
+
+    def remove(self, reservation_id: int) -> Reservation:
+        """Cancels a booking. Time still covered by other bookings stays busy."""
+        r = self._by_id.pop(reservation_id)
+        start, end = reservation_interval(r)
+        bookings = self._bookings[r.resource]
+        del bookings[bisect_left(bookings, (start, end, reservation_id))]
+        if end <= start:
+            return r
+        # Bookings overlapping [start, end) start less than the longest booking before it
+        lo = bisect_left(bookings, (start - self._longest[r.resource],))
+        hi = bisect_left(bookings, (end,))
+        still_busy = merge_busy(
+            (max(s, start), min(e, end)) for s, e, _ in bookings[lo:hi] if e > start
+        )
+        free = self._free[r.resource]
+        free.release(start, end)
+        for s, e in still_busy:
+            free.occupy(s, e)
+        return r
@@ -0,0 +1,308 @@
+"""
+SQLite storage for reservations
+
+A ReservationDatabase keeps reservations in one table of a local SQLite file
+(or in memory). A text file is bulk loaded with a single executemany inside
+one transaction; the indexes on resource, date and confirmed are built after
+the rows are in, which is faster than updating them row by row.
+
+The confirmation summary and long reservations sections are answered by
+SQL aggregates and filters instead of a Python loop over every reservation.
+Revenue is added up in Python from the confirmed rows in file order. Rows
+keep the order of the source file (the `line` column), so the report
+output matches task_g_class.py line for line.
+
+Iterating the database yields Reservation objects, so it can be passed to
+any of the report functions in task_g_class.py like a list or a
+ReservationTable.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import date, datetime, time
+import os
+import pathlib
+import sqlite3
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import ReportSink, open_sink
+from shared.snapshot import file_digest, source_key
+from task_g_class import (
+    Reservation,
+    confirmed_line,
+    iter_reservations,
+    long_line,
+    revenue_line,
+    status_line,
+    summary_lines,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservations (
+    line INTEGER PRIMARY KEY,
+    reservation_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    date TEXT NOT NULL,
+    time TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    price REAL NOT NULL,
+    confirmed INTEGER NOT NULL,
+    resource TEXT NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source (
+    path TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 BLOB NOT NULL
+);
+"""
+
+INDEXES = {
+    "reservations_resource": "reservations (resource, date)",
+    "reservations_date": "reservations (date, time)",
+    "reservations_confirmed": "reservations (confirmed)",
+}
+
+COLUMNS = "reservation_id, name, email, phone, date, time, duration, price, confirmed, resource, created"
+
+LONG_DURATION = 3  # Reservation.is_long: more than this many hours
+
+
+def to_row(r: Reservation) -> tuple:
+    """Converts a Reservation to the values of one database row (without line)."""
+    return (
+        r.reservation_id, r.name, r.email, r.phone, r.date.isoformat(), r.time.isoformat(),
+        r.duration, r.price, int(r.confirmed), r.resource, r.created.isoformat(" "),
+    )
+
+
+def from_row(row: tuple) -> Reservation:
+    """Converts a row selected with COLUMNS back to a Reservation."""
+    return Reservation(
+        reservation_id=row[0],
+        name=row[1],
+        email=row[2],
+        phone=row[3],
+        date=date.fromisoformat(row[4]),
+        time=time.fromisoformat(row[5]),
+        duration=row[6],
+        price=row[7],
+        confirmed=bool(row[8]),
+        resource=row[9],
+        created=datetime.fromisoformat(row[10]),
+    )
+
+
+def _day_and_time(date_text: str, time_text: str) -> tuple[str, str]:
+    # "2025-11-12", "09:00:00" -> "12.11.2025", "09.00"
+    return f"{date_text[8:10]}.{date_text[5:7]}.{date_text[:4]}", f"{time_text[:2]}.{time_text[3:5]}"
+
+
+class ReservationDatabase:
+    """Reservations in a SQLite database, with SQL versions of the report sections."""
+
+    def __init__(self, db_file: str = ":memory:") -> None:
+        self.db_file = str(db_file)
+        # Autocommit mode: every bulk change below runs in its own explicit transaction
+        self.conn = sqlite3.connect(self.db_file, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        self._create_indexes()
+
+    def _create_indexes(self) -> None:
+        for name, target in INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self.conn.execute("BEGIN")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> ReservationDatabase:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load(self, reservations: Iterable[Reservation]) -> int:
+        """
+        Replaces the stored reservations in one transaction and returns how
+        many were loaded. The indexes are rebuilt after the insert.
+        """
+        with self._transaction() as conn:
+            for name in INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            conn.execute("DELETE FROM reservations")
+            conn.execute("DELETE FROM source")
+            conn.executemany(
+                f"INSERT INTO reservations (line, {COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((line, *to_row(r)) for line, r in enumerate(reservations)),
+            )
+            self._create_indexes()
+            (count,) = conn.execute("SELECT COUNT(*) FROM reservations").fetchone()
+        return count
+
+    def load_file(self, reservation_file: str) -> int:
+        """Bulk loads a reservations.txt file and remembers which version of it was loaded."""
+        # Keyed before the load, so a file changed meanwhile is not taken as current
+        mtime_ns, size, digest = source_key(reservation_file)
+        count = self.load(iter_reservations(reservation_file))
+        self.conn.execute(
+            "INSERT INTO source VALUES (?, ?, ?, ?)",
+            (os.path.abspath(reservation_file), mtime_ns, size, digest),
+        )
+        return count
+
+    def is_current(self, reservation_file: str) -> bool:
+        """True when the database was loaded from this version of the file."""
+        row = self.conn.execute("SELECT path, mtime_ns, size, sha256 FROM source").fetchone()
+        if row is None or row[0] != os.path.abspath(reservation_file):
+            return False
+        stat = os.stat(reservation_file)
+        if (row[1], row[2]) == (stat.st_mtime_ns, stat.st_size):
+            return True
+        if row[2] != stat.st_size or row[3] != file_digest(reservation_file):
+            return False
+        # Same content under a new mtime: remember it so the next check skips the hash
+        self.conn.execute("UPDATE source SET mtime_ns = ?", (stat.st_mtime_ns,))
+        return True
+
+    def insert(self, r: Reservation) -> None:
+        """Adds one reservation after the existing ones."""
+        self.conn.execute(
+            f"INSERT INTO reservations (line, {COLUMNS}) "
+            "VALUES ((SELECT COALESCE(MAX(line), -1) + 1 FROM reservations), ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            to_row(r),
+        )
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM reservations").fetchone()[0]
+
+    def __iter__(self) -> Iterator[Reservation]:
+        for row in self.conn.execute(f"SELECT {COLUMNS} FROM reservations ORDER BY line"):
+            yield from_row(row)
+
+    def query(
+        self,
+        resource: str | None = None,
+        confirmed: bool | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> list[Reservation]:
+        """
+        Returns reservations matching every given filter, ordered by date and
+        time like ReservationIndex.query. start and end are inclusive.
+        """
+        where, params = [], []
+        if resource is not None:
+            where.append("resource = ?")
+            params.append(resource)
+        if confirmed is not None:
+            where.append("confirmed = ?")
+            params.append(int(confirmed))
+        if start is not None:
+            where.append("date >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            where.append("date <= ?")
+            params.append(end.isoformat())
+        sql = f"SELECT {COLUMNS} FROM reservations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY date, time, reservation_id"
+        return [from_row(row) for row in self.conn.execute(sql, params)]
+
+    def confirmation_counts(self) -> tuple[int, int]:
+        """Returns (confirmed, not confirmed) reservation counts."""
+        confirmed, total = self.conn.execute(
+            "SELECT COALESCE(SUM(confirmed), 0), COUNT(*) FROM reservations"
+        ).fetchone()
+        return confirmed, total - confirmed
+
+    def revenue(self) -> float:
+        """
+        Returns the summed duration * price of confirmed reservations. The
+        products are added up in Python in file order, the same order as
+        task_g_class uses, because SQLite's SUM promises no order and newer
+        releases use compensated summation.
+        """
+        revenue = 0.0
+        for (amount,) in self.conn.execute(
+            "SELECT duration * price FROM reservations WHERE confirmed = 1 ORDER BY line"
+        ):
+            revenue += amount
+        return revenue
+
+    def long_reservation_lines(self) -> list[str]:
+        lines = []
+        for name, date_text, time_text, duration, resource in self.conn.execute(
+            "SELECT name, date, time, duration, resource FROM reservations WHERE duration > ? ORDER BY line",
+            (LONG_DURATION,),
+        ):
+            lines.append(long_line(name, *_day_and_time(date_text, time_text), duration, resource))
+        return lines
+
+    def long_reservations(self, sink: ReportSink | None = None) -> None:
+        with open_sink(sink) as out:
+            out.writelines(self.long_reservation_lines())
+
+    def confirmation_summary(self, sink: ReportSink | None = None) -> None:
+        confirmed_count, not_confirmed_count = self.confirmation_counts()
+        with open_sink(sink) as out:
+            out.writelines(summary_lines(confirmed_count, not_confirmed_count))
+
+    def total_revenue(self, sink: ReportSink | None = None) -> None:
+        with open_sink(sink) as out:
+            out.writeline(revenue_line(self.revenue()))
+
+    def report_sections(self) -> list[list[str]]:
+        """
+        Builds the five report sections like task_g_class.report_sections,
+        with one ordered scan for the per-reservation lines and SQL for the rest.
+        """
+        confirmed_lines: list[str] = []
+        status_lines: list[str] = []
+        for name, date_text, time_text, confirmed, resource in self.conn.execute(
+            "SELECT name, date, time, confirmed, resource FROM reservations ORDER BY line"
+        ):
+            if confirmed:
+                confirmed_lines.append(confirmed_line(name, resource, *_day_and_time(date_text, time_text)))
+            status_lines.append(status_line(name, bool(confirmed)))
+        return [
+            confirmed_lines,
+            self.long_reservation_lines(),
+            status_lines,
+            summary_lines(*self.confirmation_counts()),
+            [revenue_line(self.revenue())],
+        ]
+
+
+def database_path(reservation_file: str) -> str:
+    """Returns the database file name used for a reservations file."""
+    return f"{reservation_file}.sqlite"
+
+
+def load_reservation_db(reservation_file: str, db_file: str | None = None) -> ReservationDatabase:
+    """
+    Opens the database next to the reservations file, reloading it from the
+    file when it is missing or was loaded from a different version.
+    """
+    db = ReservationDatabase(db_file or database_path(str(reservation_file)))
+    if not db.is_current(str(reservation_file)):
+        db.load_file(str(reservation_file))
+    return db
+
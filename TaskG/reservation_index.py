@@ -0,0 +1,106 @@
+"""
+Secondary indexes over reservations
+
+A ReservationIndex answers lookups such as "confirmed reservations for
+Red Room on 2025-10-22" without scanning every reservation. Reservation
+date and creation time are sorted lists searched with bisect, and every
+resource has its own list sorted by date, so a resource and date range
+lookup is two bisects and a slice. Confirmation status is a hash index.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+
+from task_g_class import Reservation
+
+
+class ReservationIndex:
+    """Hash and sorted indexes over a set of reservations, keyed by reservation_id."""
+
+    def __init__(self, reservations: Iterable[Reservation] = ()) -> None:
+        self._by_id: dict[int, Reservation] = {}
+        self._by_confirmed: dict[bool, set[int]] = {True: set(), False: set()}
+        self._by_date: list[tuple] = []  # (date, time, reservation_id)
+        self._by_resource: dict[str, list[tuple]] = {}  # (date, time, reservation_id) per resource
+        self._by_created: list[tuple] = []  # (created, reservation_id)
+        for r in reservations:
+            self._add_to_hashes(r)
+            key = (r.date, r.time, r.reservation_id)
+            self._by_date.append(key)
+            self._by_resource.setdefault(r.resource, []).append(key)
+            self._by_created.append((r.created, r.reservation_id))
+        self._by_date.sort()
+        for keys in self._by_resource.values():
+            keys.sort()
+        self._by_created.sort()
+
+    def _add_to_hashes(self, r: Reservation) -> None:
+        if r.reservation_id in self._by_id:
+            raise ValueError(f"Reservation {r.reservation_id} is already indexed")
+        self._by_id[r.reservation_id] = r
+        self._by_confirmed[r.confirmed].add(r.reservation_id)
+
+    def insert(self, r: Reservation) -> None:
+        """Adds one reservation, keeping the sorted indexes in order."""
+        self._add_to_hashes(r)
+        key = (r.date, r.time, r.reservation_id)
+        insort(self._by_date, key)
+        insort(self._by_resource.setdefault(r.resource, []), key)
+        insort(self._by_created, (r.created, r.reservation_id))
+
+    def delete(self, reservation_id: int) -> Reservation:
+        """Removes a reservation from every index and returns it."""
+        r = self._by_id.pop(reservation_id)
+        key = (r.date, r.time, reservation_id)
+        keys = self._by_resource[r.resource]
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del self._by_resource[r.resource]
+        self._by_confirmed[r.confirmed].discard(reservation_id)
+        del self._by_date[bisect_left(self._by_date, key)]
+        del self._by_created[bisect_left(self._by_created, (r.created, reservation_id))]
+        return r
+
+    def get(self, reservation_id: int) -> Reservation | None:
+        return self._by_id.get(reservation_id)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, reservation_id: int) -> bool:
+        return reservation_id in self._by_id
+
+    def resources(self) -> list[str]:
+        return sorted(self._by_resource)
+
+    def query(
+        self,
+        resource: str | None = None,
+        confirmed: bool | None = None,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> list[Reservation]:
+        """
+        Returns reservations matching every given filter, ordered by date and time.
+        start and end are inclusive reservation dates; either may be left open.
+        """
+        keys = self._by_date if resource is None else self._by_resource.get(resource, [])
+        lo = 0 if start is None else bisect_left(keys, (start,))
+        hi = len(keys) if end is None else bisect_left(keys, (end + timedelta(days=1),))
+        by_id = self._by_id
+        if confirmed is None:
+            return [by_id[key[2]] for key in keys[lo:hi]]
+        wanted = self._by_confirmed[confirmed]
+        return [by_id[key[2]] for key in keys[lo:hi] if key[2] in wanted]
+
+    def on_date(self, day: date, resource: str | None = None, confirmed: bool | None = None) -> list[Reservation]:
+        return self.query(resource, confirmed, day, day)
+
+    def created_between(self, start: datetime, end: datetime) -> list[Reservation]:
+        """Returns reservations created in [start, end], oldest first."""
+        lo = bisect_left(self._by_created, (start,))
+        hi = bisect_left(self._by_created, (end, float("inf")))
+        return [self._by_id[key[1]] for key in self._by_created[lo:hi]]
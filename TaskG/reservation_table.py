@@ -0,0 +1,171 @@
+"""
+Columnar storage for reservations
+
+A ReservationTable keeps every field in its own compact column instead of one
+object per reservation. Numbers live in typed arrays, the confirmed flags in a
+bitmap and the resource names in a small table of interned strings. Iterating
+the table yields Reservation objects, so the report functions in
+task_g_class.py work on it unchanged.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time
+import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.snapshot import read_snapshot, source_key, write_snapshot
+from task_g_class import Reservation, iter_reservations
+
+
+class ReservationTable:
+    """Reservations stored column by column."""
+
+    def __init__(self) -> None:
+        self.ids = array("q")
+        self.names: list[str] = []
+        self.emails: list[str] = []
+        self.phones: list[str] = []
+        self.dates = array("i")  # date ordinals
+        self.times = array("i")  # seconds since midnight
+        self.durations = array("i")
+        self.prices = array("d")
+        self.confirmed = bytearray()  # one bit per reservation
+        self.resource_codes = array("I")  # "H" would overflow past 65,535 resources
+        self.resources: list[str] = []  # interned resource names, indexed by code
+        self.created = array("q")  # seconds since 0001-01-01
+        self._resource_lookup: dict[str, int] = {}
+        self._length = 0
+
+    @classmethod
+    def from_reservations(cls, reservations: Iterable[Reservation]) -> ReservationTable:
+        table = cls()
+        for r in reservations:
+            table.append(r)
+        return table
+
+    @classmethod
+    def from_file(cls, reservation_file: str) -> ReservationTable:
+        return cls.from_reservations(iter_reservations(reservation_file))
+
+    @classmethod
+    def from_columns(cls, rows: int, columns: dict) -> ReservationTable:
+        """Rebuilds a table from the output of columns()."""
+        table = cls()
+        for name in ("ids", "names", "emails", "phones", "dates", "times",
+                     "durations", "prices", "resource_codes", "resources", "created"):
+            setattr(table, name, columns[name])
+        table.confirmed = bytearray(columns["confirmed"])
+        if table.resource_codes.typecode != "I":  # snapshots written with 16-bit codes
+            table.resource_codes = array("I", table.resource_codes)
+        table._resource_lookup = {resource: code for code, resource in enumerate(table.resources)}
+        table._length = rows
+        return table
+
+    def columns(self) -> dict:
+        """Returns every column by name, with the confirmed bitmap as an array."""
+        return {
+            "ids": self.ids,
+            "names": self.names,
+            "emails": self.emails,
+            "phones": self.phones,
+            "dates": self.dates,
+            "times": self.times,
+            "durations": self.durations,
+            "prices": self.prices,
+            "confirmed": array("B", self.confirmed),
+            "resource_codes": self.resource_codes,
+            "resources": self.resources,
+            "created": self.created,
+        }
+
+    def append(self, r: Reservation) -> None:
+        i = self._length
+        self.ids.append(r.reservation_id)
+        self.names.append(r.name)
+        self.emails.append(r.email)
+        self.phones.append(r.phone)
+        self.dates.append(r.date.toordinal())
+        self.times.append(r.time.hour * 3600 + r.time.minute * 60 + r.time.second)
+        self.durations.append(r.duration)
+        self.prices.append(r.price)
+        if i % 8 == 0:
+            self.confirmed.append(0)
+        if r.confirmed:
+            self.confirmed[i >> 3] |= 1 << (i & 7)
+        self.resource_codes.append(self._resource_code(r.resource))
+        c = r.created
+        self.created.append(
+            c.toordinal() * 86400 + c.hour * 3600 + c.minute * 60 + c.second
+        )
+        self._length += 1
+
+    def _resource_code(self, resource: str) -> int:
+        code = self._resource_lookup.get(resource)
+        if code is None:
+            code = len(self.resources)
+            self.resources.append(sys.intern(resource))
+            self._resource_lookup[self.resources[code]] = code
+        return code
+
+    def is_confirmed(self, i: int) -> bool:
+        return bool(self.confirmed[i >> 3] & (1 << (i & 7)))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> Reservation:
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("reservation index out of range")
+        seconds = self.times[i]
+        created_days, created_seconds = divmod(self.created[i], 86400)
+        return Reservation(
+            reservation_id=self.ids[i],
+            name=self.names[i],
+            email=self.emails[i],
+            phone=self.phones[i],
+            date=date.fromordinal(self.dates[i]),
+            time=time(seconds // 3600, seconds // 60 % 60, seconds % 60),
+            duration=self.durations[i],
+            price=self.prices[i],
+            confirmed=self.is_confirmed(i),
+            resource=self.resources[self.resource_codes[i]],
+            created=datetime.fromordinal(created_days).replace(
+                hour=created_seconds // 3600,
+                minute=created_seconds // 60 % 60,
+                second=created_seconds % 60,
+            ),
+        )
+
+    def __iter__(self) -> Iterator[Reservation]:
+        for i in range(self._length):
+            yield self[i]
+
+    def nbytes(self) -> int:
+        """Returns the approximate memory used by the table, strings included."""
+        arrays = (self.ids, self.dates, self.times, self.durations,
+                  self.prices, self.resource_codes, self.created)
+        total = sum(sys.getsizeof(a) for a in arrays) + sys.getsizeof(self.confirmed)
+        for column in (self.names, self.emails, self.phones, self.resources):
+            total += sys.getsizeof(column) + sum(sys.getsizeof(s) for s in column)
+        return total
+
+
+def load_reservation_table(reservation_file: str) -> ReservationTable:
+    """
+    Loads reservations from the binary snapshot next to the file when it is
+    up to date, otherwise parses the file and writes a fresh snapshot.
+    """
+    snapshot = read_snapshot(str(reservation_file))
+    if snapshot is not None:
+        return ReservationTable.from_columns(*snapshot)
+    key = source_key(str(reservation_file))  # before reading, so a file changed meanwhile is not cached as current
+    table = ReservationTable.from_file(reservation_file)
+    write_snapshot(str(reservation_file), key, len(table), table.columns())
+    return table
@@ -21,8 +21,14 @@ int | str | str | str | date | time | int | float | bool | str | datetime
 
 """
 
-from datetime import datetime
+import argparse
 import pathlib
+import sys
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import Quarantine, ReportSink, open_sink, parse_date, parse_datetime, parse_time
+from shared.instrument import Instrumentation, add_profile_argument
 
 path = pathlib.Path(__file__).parent
 
@@ -41,31 +47,33 @@ def convert_reservation_data(reservation: list) -> dict:
     "name": reservation[1].strip(),
     "email": reservation[2].strip(),
     "phone": reservation[3].strip(),
-    "date": datetime.strptime(reservation[4].strip(), "%Y-%m-%d").date(),
-    "time": datetime.strptime(reservation[5].strip(), "%H:%M:%S").time()
-    if ":" in reservation[5].strip() and len(reservation[5].strip().split(":")) == 3
-    else datetime.strptime(reservation[5].strip(), "%H:%M").time(),
+    "date": parse_date(reservation[4].strip()),
+    "time": parse_time(reservation[5].strip()),
     "duration": int(reservation[6]),
     "price": float(reservation[7]),
     "confirmed": True if reservation[8].strip() == "True" else False,
     "resource": reservation[9].strip(),
-    "created": datetime.strptime(reservation[10].strip(), "%Y-%m-%d %H:%M:%S"),
+    "created": parse_datetime(reservation[10].strip()),
 }
 
 
-def fetch_reservations(reservation_file: str) -> list[dict]:
+def fetch_reservations(reservation_file: str, quarantine: Quarantine | None = None) -> list[dict]:
     """
     Reads reservations from a file and returns the reservations converted
     You don't need to modify this function!
 
     Parameters:
      reservation_file (str): Name of the file containing the reservations
+     quarantine (Quarantine): Optional. Lines the converter rejects are
+      quarantined with their line numbers and reasons instead of raising
 
     Returns:
      reservations (list): Read and converted reservations
     """
     reservations: list[dict] = []
     with open(reservation_file, "r", encoding="utf-8") as f:
+        if quarantine is not None:
+            return list(quarantine.convert_lines(f, convert_reservation_data))
         for line in f:
             if len(line.strip()) == 0:
                 continue
@@ -73,84 +81,156 @@ def fetch_reservations(reservation_file: str) -> list[dict]:
             reservations.append(convert_reservation_data(fields))
     return reservations
 
-def confirmed_reservations(reservations: list[dict]) -> None:
+
+def confirmed_reservations(reservations: list[dict], sink: ReportSink | None = None) -> None:
     """
     Print confirmed reservations
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
-    for r in reservations:
-        if r["confirmed"]:
-            print(
-                f'- {r["name"]}, {r["resource"]}, {r["date"].strftime("%d.%m.%Y")} at {r["time"].strftime("%H.%M")}'
-            )
+    with open_sink(sink) as out:
+        for r in reservations:
+            if r["confirmed"]:
+                out.writeline(
+                    f'- {r["name"]}, {r["resource"]}, {r["date"].strftime("%d.%m.%Y")} at {r["time"].strftime("%H.%M")}'
+                )
 
-def long_reservations(reservations : list[dict]) -> None:
+def long_reservations(reservations : list[dict], sink: ReportSink | None = None) -> None:
     """
     Print long reservations
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
-    for r in reservations:
-        if r["duration"] > 3: # If long
-           print(
-                f'- {r["name"]}, {r["date"].strftime("%d.%m.%Y")} at {r["time"].strftime("%H.%M")}, '
-                f'duration {r["duration"]} h, {r["resource"]}'
-            )
+    with open_sink(sink) as out:
+        for r in reservations:
+            if r["duration"] > 3: # If long
+                out.writeline(
+                    f'- {r["name"]}, {r["date"].strftime("%d.%m.%Y")} at {r["time"].strftime("%H.%M")}, '
+                    f'duration {r["duration"]} h, {r["resource"]}'
+                )
 
 
-def confirmation_statuses(reservations: list[list]) -> None:
+def confirmation_statuses(reservations: list[list], sink: ReportSink | None = None) -> None:
     """
     Print confirmation statuses
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
-    for r in reservations:
-        name: str = r["name"]
-        confirmed: bool = r["confirmed"]
-        print(f'{name} → {"Confirmed" if confirmed else "NOT Confirmed"}')
+    with open_sink(sink) as out:
+        for r in reservations:
+            name: str = r["name"]
+            confirmed: bool = r["confirmed"]
+            out.writeline(f'{name} → {"Confirmed" if confirmed else "NOT Confirmed"}')
 
-def confirmation_summary(reservations: list[list]) -> None:
+def confirmation_summary(reservations: list[list], sink: ReportSink | None = None) -> None:
     """
     Print confirmation summary
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
-    for r in reservations:
-        name: str = r["name"]
-        confirmed: bool = r["confirmed"]
-        print(f'{name} → {"Confirmed" if confirmed else "NOT Confirmed"}')
+    with open_sink(sink) as out:
+        for r in reservations:
+            name: str = r["name"]
+            confirmed: bool = r["confirmed"]
+            out.writeline(f'{name} → {"Confirmed" if confirmed else "NOT Confirmed"}')
 
-def total_revenue(reservations: list[list]) -> None:
+def total_revenue(reservations: list[list], sink: ReportSink | None = None) -> None:
     """
     Print total revenue
 
     Parameters:
      reservations (list): Reservations
+     sink (ReportSink): Output for the lines, the console by default
     """
     revenue = sum(r["duration"] * r["price"] for r in reservations if r["confirmed"])
-    print(f'Total revenue from confirmed reservations: {revenue:.2f} €'.replace(".", ","))
+    with open_sink(sink) as out:
+        out.writeline(f'Total revenue from confirmed reservations: {revenue:.2f} €'.replace(".", ","))
+
+SECTION_TITLES = [
+    "1) Confirmed Reservations",
+    "2) Long Reservations (≥ 3 h)",
+    "3) Reservation Confirmation Status",
+    "4) Confirmation Summary",
+    "5) Total Revenue from Confirmed Reservations",
+]
+
+def report_sections(reservations: list[dict]) -> list[list[str]]:
+    """
+    Build the lines of all five report sections in a single pass
+    Output matches the section functions above line for line
+
+    Parameters:
+     reservations (list): Reservations
+
+    Returns:
+     sections (list): One list of output lines per section
+    """
+    confirmed_lines: list[str] = []
+    long_lines: list[str] = []
+    status_lines: list[str] = []
+    revenue = 0.0
+
+    for r in reservations:
+        confirmed: bool = r["confirmed"]
+        long: bool = r["duration"] > 3
+        if confirmed or long:
+            date_str = r["date"].strftime("%d.%m.%Y")
+            time_str = r["time"].strftime("%H.%M")
+        if confirmed:
+            confirmed_lines.append(f'- {r["name"]}, {r["resource"]}, {date_str} at {time_str}')
+            status_lines.append(f'{r["name"]} → Confirmed')
+            revenue += r["duration"] * r["price"]
+        else:
+            status_lines.append(f'{r["name"]} → NOT Confirmed')
+        if long:
+            long_lines.append(
+                f'- {r["name"]}, {date_str} at {time_str}, duration {r["duration"]} h, {r["resource"]}'
+            )
+
+    return [
+        confirmed_lines,
+        long_lines,
+        status_lines,
+        status_lines,  # confirmation_summary prints the statuses as well
+        [f'Total revenue from confirmed reservations: {revenue:.2f} €'.replace(".", ",")],
+    ]
 
-def main():
+def main(argv=None):
     """
     Prints reservation information according to requirements
-    Reservation-specific printing is done in functions
-    """
-    reservations = fetch_reservations(path / "reservations.txt")
-    print("1) Confirmed Reservations")
-    confirmed_reservations(reservations)
-    print("2) Long Reservations (≥ 3 h)")
-    long_reservations(reservations)
-    print("3) Reservation Confirmation Status")
-    confirmation_statuses(reservations)
-    print("4) Confirmation Summary")
-    confirmation_summary(reservations)
-    print("5) Total Revenue from Confirmed Reservations")
-    total_revenue(reservations)
+    All sections are built in one pass over the reservations
+    """
+    parser = argparse.ArgumentParser(description="Prints the reservation report.")
+    parser.add_argument("--quarantine", metavar="FILE",
+                        help="reject malformed lines to FILE and keep loading instead of stopping")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    prof = Instrumentation.from_args(args.profile)
+    with prof.run():
+        with prof.stage("read"):
+            if args.quarantine:
+                with Quarantine(args.quarantine) as quarantine:
+                    reservations = fetch_reservations(path / "reservations.txt", quarantine)
+                prof.count("rejected", len(quarantine))
+                if len(quarantine):
+                    print(f"{len(quarantine)} malformed line(s) written to {args.quarantine}", file=sys.stderr)
+            else:
+                reservations = fetch_reservations(path / "reservations.txt")
+        prof.count("reservations", len(reservations))
+        with prof.stage("sections"):
+            sections = report_sections(reservations)
+        with prof.stage("output"), ReportSink() as sink:
+            for title, lines in zip(SECTION_TITLES, sections):
+                sink.writeline(title)
+                sink.writelines(lines)
 
 if __name__ == "__main__":
     main()
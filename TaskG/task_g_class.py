@@ -8,15 +8,34 @@
 
 from __future__ import annotations
 
+import argparse
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, date, time
+import os
 import pathlib
+import sys
+import tempfile
 
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent))  # for the shared package
+
+from shared.helpers import (
+    Quarantine,
+    ReportSink,
+    open_sink,
+    parse_date,
+    parse_datetime,
+    parse_time,
+    read_lines,
+    split_file,
+)
+from shared.instrument import Instrumentation, add_profile_argument
 
 path = pathlib.Path(__file__).parent
 
 
-@dataclass
+@dataclass(slots=True)
 class Reservation:
     reservation_id: int
     name: str
@@ -45,91 +64,347 @@ def convert_reservation(data: list[str]) -> Reservation:
     """
     Convert one reservation row (list of 11 strings) into a Reservation object.
     """
-    time_str = data[5].strip()
-    parsed_time = (
-        datetime.strptime(time_str, "%H:%M:%S").time()
-        if ":" in time_str and len(time_str.split(":")) == 3
-        else datetime.strptime(time_str, "%H:%M").time()
-    )
-
     return Reservation(
         reservation_id=int(data[0]),
         name=data[1].strip(),
         email=data[2].strip(),
         phone=data[3].strip(),
-        date=datetime.strptime(data[4].strip(), "%Y-%m-%d").date(),
-        time=parsed_time,
+        date=parse_date(data[4].strip()),
+        time=parse_time(data[5].strip()),
         duration=int(data[6]),
         price=float(data[7]),
         confirmed=True if data[8].strip() == "True" else False,
         resource=data[9].strip(),
-        created=datetime.strptime(data[10].strip(), "%Y-%m-%d %H:%M:%S"),
+        created=parse_datetime(data[10].strip()),
     )
 
 
-def fetch_reservations(reservation_file: str) -> list[Reservation]:
+def iter_reservations(reservation_file: str, quarantine: Quarantine | None = None) -> Iterator[Reservation]:
     """
-    Reads reservations from a file and returns converted reservations as objects.
-    Does NOT include a header row.
+    Reads reservations from a file one line at a time and yields them as objects.
+    Only the current line is held in memory. Does NOT include a header row.
+
+    Without a quarantine a malformed line raises ValueError. With one, lines
+    that convert_reservation rejects are quarantined with their line numbers
+    and reasons, and loading goes on.
     """
-    reservations: list[Reservation] = []
     with open(reservation_file, "r", encoding="utf-8") as f:
+        if quarantine is not None:
+            yield from quarantine.convert_lines(f, convert_reservation)
+            return
         for line in f:
             if len(line.strip()) == 0:
                 continue
-            fields = line.split("|")
-            reservations.append(convert_reservation(fields))
+            yield convert_reservation(line.split("|"))
+
+
+def fetch_reservations(reservation_file: str, quarantine: Quarantine | None = None) -> list[Reservation]:
+    """
+    Reads reservations from a file and returns converted reservations as objects.
+    Does NOT include a header row. See iter_reservations for the quarantine.
+    """
+    return list(iter_reservations(reservation_file, quarantine))
+
+
+def _parse_chunk(reservation_file: str, start: int, end: int) -> list[Reservation]:
+    return [
+        convert_reservation(line.split("|"))
+        for line in read_lines(reservation_file, start, end)
+        if len(line.strip()) != 0
+    ]
+
+
+def _total_chunk(reservation_file: str, start: int, end: int) -> tuple[int, int, float]:
+    confirmed_count = 0
+    not_confirmed_count = 0
+    revenue = 0.0
+    for r in _parse_chunk(reservation_file, start, end):
+        if r.is_confirmed():
+            confirmed_count += 1
+            revenue += r.total_price()
+        else:
+            not_confirmed_count += 1
+    return confirmed_count, not_confirmed_count, revenue
+
+
+def fetch_reservations_parallel(reservation_file: str, workers: int | None = None) -> list[Reservation]:
+    """
+    Reads reservations like fetch_reservations, but parses newline-aligned byte
+    chunks of the file in a process pool. Reservations are returned in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_file(reservation_file, workers)
+    reservations: list[Reservation] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_parse_chunk, reservation_file, start, end) for start, end in chunks]
+        for future in futures:
+            reservations.extend(future.result())
     return reservations
 
 
-def confirmed_reservations(reservations: list[Reservation]) -> None:
+def reservation_totals_parallel(
+    reservation_file: str, workers: int | None = None
+) -> list[tuple[int, int, float]]:
+    """
+    Parses the file in a process pool without sending reservations back.
+    Returns one (confirmed count, not confirmed count, confirmed revenue)
+    partial aggregate per chunk, in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = split_file(reservation_file, workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_total_chunk, reservation_file, start, end) for start, end in chunks]
+        return [future.result() for future in futures]
+
+
+def confirmed_line(name: str, resource: str, day: str, clock: str) -> str:
+    return f"- {name}, {resource}, {day} at {clock}"
+
+
+def long_line(name: str, day: str, clock: str, duration: int, resource: str) -> str:
+    return f"- {name}, {day} at {clock}, duration {duration} h, {resource}"
+
+
+def status_line(name: str, confirmed: bool) -> str:
+    return f'{name} → {"Confirmed" if confirmed else "NOT Confirmed"}'
+
+
+def summary_lines(confirmed_count: int, not_confirmed_count: int) -> list[str]:
+    return [
+        f"- Confirmed reservations: {confirmed_count} pcs",
+        f"- Not confirmed reservations: {not_confirmed_count} pcs",
+    ]
+
+
+def revenue_line(revenue: float) -> str:
+    return f"Total revenue from confirmed reservations: {revenue:.2f} €".replace(".", ",")
+
+
+def reservation_lines(r: Reservation) -> tuple[str | None, str | None, str]:
+    """
+    Returns the lines of one reservation in report sections 1, 2 and 3:
+    (confirmed line, long line, status line). A reservation that is not
+    confirmed or not long has None for that section.
+    """
+    confirmed = r.is_confirmed()
+    long = r.is_long()
+    if not (confirmed or long):
+        return None, None, status_line(r.name, False)
+    day = r.date.strftime("%d.%m.%Y")
+    clock = r.time.strftime("%H.%M")
+    return (
+        confirmed_line(r.name, r.resource, day, clock) if confirmed else None,
+        long_line(r.name, day, clock, r.duration, r.resource) if long else None,
+        status_line(r.name, confirmed),
+    )
+
+
+def confirmed_reservations(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for r in reservations:
+            if r.is_confirmed():
+                out.writeline(reservation_lines(r)[0])
+
+
+def long_reservations(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for r in reservations:
+            if r.is_long():
+                out.writeline(reservation_lines(r)[1])
+
+
+def confirmation_statuses(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for r in reservations:
+            out.writeline(status_line(r.name, r.confirmed))
+
+
+def confirmation_summary(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    confirmed_count = 0
+    not_confirmed_count = 0
     for r in reservations:
         if r.is_confirmed():
-            print(
-                f'- {r.name}, {r.resource}, {r.date.strftime("%d.%m.%Y")} at {r.time.strftime("%H.%M")}'
-            )
+            confirmed_count += 1
+        else:
+            not_confirmed_count += 1
+    with open_sink(sink) as out:
+        out.writelines(summary_lines(confirmed_count, not_confirmed_count))
 
 
-def long_reservations(reservations: list[Reservation]) -> None:
-    for r in reservations:
-        if r.is_long():
-            print(
-                f'- {r.name}, {r.date.strftime("%d.%m.%Y")} at {r.time.strftime("%H.%M")}, '
-                f'duration {r.duration} h, {r.resource}'
-            )
+def total_revenue(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    revenue = sum(r.total_price() for r in reservations if r.is_confirmed())
+    with open_sink(sink) as out:
+        out.writeline(revenue_line(revenue))
 
 
-def confirmation_statuses(reservations: list[Reservation]) -> None:
+SPILL_CHUNK = 64 * 1024  # characters copied at a time from a spilled section
+
+SECTION_TITLES = [
+    "1) Confirmed Reservations",
+    "2) Long Reservations (≥ 3 h)",
+    "3) Reservation Confirmation Status",
+    "4) Confirmation Summary",
+    "5) Total Revenue from Confirmed Reservations",
+]
+
+
+def fold_report(reservations: Iterable[Reservation], confirmed_out: Callable[[str], None],
+                long_out: Callable[[str], None], status_out: Callable[[str], None]) -> list[list[str]]:
+    """
+    Passes the section 1, 2 and 3 lines of every reservation to the three
+    callables, in file order, and returns the lines of sections 4 and 5.
+    """
+    confirmed_count = 0
+    not_confirmed_count = 0
+    revenue = 0.0
     for r in reservations:
-        print(f'{r.name} → {"Confirmed" if r.confirmed else "NOT Confirmed"}')
+        confirmed, long, status = reservation_lines(r)
+        if confirmed is not None:
+            confirmed_out(confirmed)
+            confirmed_count += 1
+            revenue += r.total_price()
+        else:
+            not_confirmed_count += 1
+        if long is not None:
+            long_out(long)
+        status_out(status)
+    return [summary_lines(confirmed_count, not_confirmed_count), [revenue_line(revenue)]]
 
 
-def confirmation_summary(reservations: list[Reservation]) -> None:
-    confirmed_count = sum(1 for r in reservations if r.is_confirmed())
-    not_confirmed_count = len(reservations) - confirmed_count
-    print(
-        f"- Confirmed reservations: {confirmed_count} pcs\n"
-        f"- Not confirmed reservations: {not_confirmed_count} pcs"
-    )
+def report_sections(reservations: Iterable[Reservation]) -> list[list[str]]:
+    """
+    Builds the lines of all five report sections in a single pass.
+    The output matches the five section functions above line for line.
+    """
+    confirmed_lines: list[str] = []
+    long_lines: list[str] = []
+    status_lines: list[str] = []
+    totals = fold_report(reservations, confirmed_lines.append, long_lines.append, status_lines.append)
+    return [confirmed_lines, long_lines, status_lines, *totals]
 
 
-def total_revenue(reservations: list[Reservation]) -> None:
-    revenue = sum(r.total_price() for r in reservations if r.is_confirmed())
-    print(f'Total revenue from confirmed reservations: {revenue:.2f} €'.replace(".", ","))
-
-
-def main() -> None:
-    reservations = fetch_reservations(path / "reservations.txt")
-    print("1) Confirmed Reservations")
-    confirmed_reservations(reservations)
-    print("2) Long Reservations (≥ 3 h)")
-    long_reservations(reservations)
-    print("3) Reservation Confirmation Status")
-    confirmation_statuses(reservations)
-    print("4) Confirmation Summary")
-    confirmation_summary(reservations)
-    print("5) Total Revenue from Confirmed Reservations")
-    total_revenue(reservations)
+def stream_report(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    """
+    Writes the five report sections in a single pass with constant memory.
+    Section 1 goes straight to the sink, sections 2 and 3 are spilled to
+    temporary files that are copied after it, and sections 4 and 5 come from
+    running totals. The output matches write_report(report_sections(...)).
+    """
+    with (
+        open_sink(sink) as out,
+        tempfile.TemporaryFile("w+", encoding="utf-8") as long_file,
+        tempfile.TemporaryFile("w+", encoding="utf-8") as status_file,
+    ):
+        out.writeline(SECTION_TITLES[0])
+        totals = fold_report(
+            reservations,
+            out.writeline,
+            lambda line: long_file.write(line + "\n"),
+            lambda line: status_file.write(line + "\n"),
+        )
+        for title, spill in ((SECTION_TITLES[1], long_file), (SECTION_TITLES[2], status_file)):
+            out.writeline(title)
+            spill.seek(0)
+            while chunk := spill.read(SPILL_CHUNK):
+                out.write(chunk)
+        for title, lines in zip(SECTION_TITLES[3:], totals):
+            out.writeline(title)
+            out.writelines(lines)
+
+
+def write_report(sections: list[list[str]], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for title, lines in zip(SECTION_TITLES, sections):
+            out.writeline(title)
+            out.writelines(lines)
+
+
+def lookup_line(r: Reservation) -> str:
+    line = confirmed_line(r.name, r.resource, r.date.strftime("%d.%m.%Y"), r.time.strftime("%H.%M"))
+    return line if r.is_confirmed() else line + " (NOT Confirmed)"
+
+
+def write_lookup(reservations: Iterable[Reservation], sink: ReportSink | None = None) -> None:
+    with open_sink(sink) as out:
+        for r in reservations:
+            out.writeline(lookup_line(r))
+
+
+def main(argv: list[str] | None = None) -> None:
+    # Imported here because reservation_table and reservation_db build on this module
+    from reservation_db import load_reservation_db
+    from reservation_index import ReservationIndex
+    from reservation_table import load_reservation_table
+
+    parser = argparse.ArgumentParser(
+        description="Prints the reservation report in a single streaming pass over reservations.txt."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--table", action="store_true",
+                        help="build the report from the in-memory table (binary snapshot when current)")
+    source.add_argument("--sqlite", action="store_true",
+                        help="answer the report from the SQLite database next to reservations.txt")
+    parser.add_argument("--quarantine", metavar="FILE",
+                        help="reject malformed lines to FILE instead of stopping (streaming mode)")
+    parser.add_argument("--on", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="list the reservations on this day from an index instead of printing the report")
+    parser.add_argument("--resource", help="with --on: only reservations of this resource")
+    parser.add_argument("--confirmed", action="store_true", help="with --on: only confirmed reservations")
+    add_profile_argument(parser)
+    args = parser.parse_args(argv)
+    if args.quarantine and (args.table or args.sqlite):
+        parser.error("--quarantine reads the text file and cannot be combined with --table or --sqlite")
+    if args.quarantine and args.on:
+        parser.error("--quarantine applies to the report and cannot be combined with --on")
+    if (args.resource or args.confirmed) and not args.on:
+        parser.error("--resource and --confirmed filter an --on lookup")
+    prof = Instrumentation.from_args(args.profile)
+    with prof.run():
+        if args.on:
+            confirmed = True if args.confirmed else None
+            query = dict(resource=args.resource, confirmed=confirmed, start=args.on, end=args.on)
+            if args.sqlite:
+                with prof.stage("read"):
+                    db = load_reservation_db(path / "reservations.txt")
+                with db, prof.stage("lookup"):
+                    found = db.query(**query)
+            else:
+                # The same hash and date indexes the booking front-end keeps in memory
+                with prof.stage("read"):
+                    if args.table:
+                        index = ReservationIndex(load_reservation_table(path / "reservations.txt"))
+                    else:
+                        index = ReservationIndex(fetch_reservations(path / "reservations.txt"))
+                with prof.stage("lookup"):
+                    found = index.query(**query)
+            prof.count("found", len(found))
+            with prof.stage("output"):
+                write_lookup(found)
+        elif args.sqlite:
+            with prof.stage("read"):
+                db = load_reservation_db(path / "reservations.txt")
+            with db:
+                prof.count("reservations", len(db))
+                with prof.stage("sections"):
+                    sections = db.report_sections()
+            with prof.stage("output"):
+                write_report(sections)
+        elif args.table:
+            # Warm runs load the binary snapshot; one pass fills all five sections
+            with prof.stage("read"):
+                table = load_reservation_table(path / "reservations.txt")
+            prof.count("reservations", len(table))
+            with prof.stage("sections"):
+                sections = report_sections(table)
+            with prof.stage("output"):
+                write_report(sections)
+        else:
+            # Reading, the sections and the output overlap in one pass
+            with prof.stage("stream"), Quarantine(args.quarantine) as quarantine:
+                stream_report(iter_reservations(path / "reservations.txt", quarantine if args.quarantine else None))
+            if len(quarantine):
+                prof.count("rejected", len(quarantine))
+                print(f"{len(quarantine)} malformed line(s) written to {args.quarantine}", file=sys.stderr)
 
 
 if __name__ == "__main__":
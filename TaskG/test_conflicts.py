@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from conflicts import ConflictIndex, find_conflicts, reservation_interval
+from task_g_class import Reservation
+
+ROOMS = ["Red Room", "Blue Room", "Green Room"]
+
+
+def random_booking(rng, reservation_id):
+    at = datetime(2025, 1, 1) + timedelta(minutes=15 * rng.randrange(4 * 24 * 14))
+    return Reservation(
+        reservation_id, "", "", "", at.date(), at.time(), rng.randint(0, 5), 0.0, True,
+        rng.choice(ROOMS), datetime(2024, 1, 1),
+    )
+
+
+def overlap(a, b):
+    (a_start, a_end), (b_start, b_end) = reservation_interval(a), reservation_interval(b)
+    # Zero-length bookings occupy nothing
+    return a.resource == b.resource and max(a_start, b_start) < min(a_end, b_end)
+
+
+def start_order(r):
+    return (*reservation_interval(r), r.reservation_id)
+
+
+def brute_conflicts(reservations):
+    # Every pair, earlier booking first
+    pairs = set()
+    for i, a in enumerate(reservations):
+        for b in reservations[i + 1:]:
+            if overlap(a, b):
+                first, second = sorted((a, b), key=start_order)
+                pairs.add((first.reservation_id, second.reservation_id))
+    return pairs
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_find_conflicts_matches_brute_force(seed):
+    rng = random.Random(seed)
+    reservations = [random_booking(rng, reservation_id) for reservation_id in range(300)]
+    conflicts = find_conflicts(reservations)
+
+    pairs = [(a.reservation_id, b.reservation_id) for a, b in conflicts]
+    assert sorted(pairs) == sorted(brute_conflicts(reservations))  # each pair once
+    order = [(b.resource, start_order(b), reservation_interval(a)[0], a.reservation_id) for a, b in conflicts]
+    assert order == sorted(order)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_conflict_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    loaded = [random_booking(rng, reservation_id) for reservation_id in range(200)]
+    index = ConflictIndex(loaded)
+
+    # Loading keeps each booking that starts after the previously kept one ends
+    accepted, rejected = [], []
+    for r in sorted(loaded, key=lambda r: (r.resource, *start_order(r))):
+        (rejected if any(overlap(r, other) for other in accepted) else accepted).append(r)
+    assert index.rejected == rejected
+    assert len(index) == len(accepted)
+
+    for reservation_id in range(200, 1000):
+        if accepted and rng.random() < 0.3:
+            r = accepted.pop(rng.randrange(len(accepted)))
+            assert index.remove(r.reservation_id) == r
+            continue
+        r = random_booking(rng, reservation_id)
+        expected = sorted((other for other in accepted if overlap(r, other)), key=start_order)
+        assert index.conflicts(r) == expected
+        if expected:
+            with pytest.raises(ValueError):
+                index.add(r)
+        else:
+            index.add(r)
+            accepted.append(r)
+        assert len(index) == len(accepted)
@@ -0,0 +1,91 @@
+import pathlib
+import shutil
+
+from follow import KEEP_REJECTS, SETTLE_POLLS, ReservationFollower
+from task_g_class import fetch_reservations
+
+SHIPPED = pathlib.Path(__file__).parent / "reservations.txt"
+
+LINE = "301|New Guest|new@example.com|0400000000|2025-12-24|10:00|2|10.00|True|Red Room|2025-12-01 12:00:00"
+
+
+def expected_totals(reservations):
+    confirmed = [r for r in reservations if r.is_confirmed()]
+    return len(confirmed), len(reservations) - len(confirmed), sum(r.total_price() for r in confirmed)
+
+
+def test_shipped_file_matches_report(tmp_path):
+    # The shipped file ends without a line break; its last reservation must count
+    reservation_file = tmp_path / "reservations.txt"
+    shutil.copy(SHIPPED, reservation_file)
+    assert not SHIPPED.read_bytes().endswith(b"\n")
+
+    follower = ReservationFollower(reservation_file)
+    added = follower.poll()
+
+    reservations = fetch_reservations(SHIPPED)
+    assert added == reservations
+    confirmed, not_confirmed, revenue = expected_totals(reservations)
+    assert (follower.confirmed_count, follower.not_confirmed_count) == (confirmed, not_confirmed)
+    assert f"{follower.revenue:.2f}" == f"{revenue:.2f}"
+
+
+def test_unfinished_line_waits_until_the_file_stops_growing(tmp_path):
+    reservation_file = tmp_path / "reservations.txt"
+    reservation_file.write_text(SHIPPED.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    follower = ReservationFollower(reservation_file)
+    follower.poll()
+
+    with open(reservation_file, "a", encoding="utf-8") as f:
+        f.write(LINE[:40])
+    assert follower.poll() == []  # still growing
+    with open(reservation_file, "a", encoding="utf-8") as f:
+        f.write(LINE[40:])
+    assert follower.poll() == []  # grew again since the last poll
+    for _ in range(SETTLE_POLLS - 1):
+        assert follower.poll() == []  # a writer may stall for a poll or two
+    added = follower.poll()  # same size for SETTLE_POLLS polls
+    assert [r.reservation_id for r in added] == [301]
+    assert follower.offset == reservation_file.stat().st_size
+
+
+def test_final_poll_reads_the_unfinished_line(tmp_path):
+    reservation_file = tmp_path / "reservations.txt"
+    reservation_file.write_text(SHIPPED.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    follower = ReservationFollower(reservation_file)
+    follower.poll()
+
+    with open(reservation_file, "a", encoding="utf-8") as f:
+        f.write(LINE)
+    assert follower.poll() == []
+    assert [r.reservation_id for r in follower.poll(final=True)] == [301]
+
+
+def test_malformed_line_is_quarantined_and_reading_goes_on(tmp_path):
+    reservation_file = tmp_path / "reservations.txt"
+    reservation_file.write_text(SHIPPED.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+    follower = ReservationFollower(reservation_file)
+    first = follower.poll()
+
+    with open(reservation_file, "a", encoding="utf-8") as f:
+        f.write("302|Broken|x|y|2025-13-01|10:00|2|10.00|True|Red Room|2025-12-01 12:00:00\n")
+        f.write(LINE + "\n")
+    added = follower.poll()
+
+    assert [r.reservation_id for r in added] == [301]
+    assert len(follower.quarantine) == 1
+    line_number, reason, line = follower.quarantine.rejects[0]
+    assert line_number == len(first) + 1
+    assert reason.startswith("reservationDate")
+    assert line.startswith("302|")
+    assert follower.offset == reservation_file.stat().st_size
+
+
+def test_rejects_kept_in_memory_are_bounded(tmp_path):
+    reservation_file = tmp_path / "reservations.txt"
+    reservation_file.write_text("broken\n" * (KEEP_REJECTS + 10), encoding="utf-8")
+    follower = ReservationFollower(reservation_file)
+    assert follower.poll() == []
+    assert len(follower.quarantine) == KEEP_REJECTS + 10
+    assert len(follower.quarantine.rejects) == KEEP_REJECTS
+    assert follower.quarantine.rejects[-1][0] == KEEP_REJECTS + 10  # the latest are kept
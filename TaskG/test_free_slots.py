@@ -0,0 +1,107 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from free_slots import BLOCK, FreeIntervals, SlotFinder, merge_busy
+from task_g_class import Reservation
+
+START = datetime(2025, 1, 1)
+
+
+def booking(reservation_id, resource, at, hours):
+    return Reservation(
+        reservation_id, "", "", "", at.date(), at.time(), hours, 0.0, True, resource, datetime(2024, 1, 1)
+    )
+
+
+def brute_earliest(busy, after, length):
+    # Walks every busy period from the start of time
+    position = after
+    for s, e in merge_busy(busy):
+        if e <= position:
+            continue
+        if s - position >= length:
+            return position
+        position = e
+    return position
+
+
+def test_free_intervals_match_brute_force():
+    rng = random.Random(22)
+    free = FreeIntervals()
+    busy: list[tuple[int, int]] = []
+    for step in range(3000):
+        if busy and rng.random() < 0.3:
+            start, end = busy.pop(rng.randrange(len(busy)))
+            free.release(start, end)
+        else:
+            start = rng.randrange(20_000)
+            end = start + rng.randint(1, 30)
+            if all(e <= start or end <= s for s, e in busy):
+                free.occupy(start, end)
+                busy.append((start, end))
+        if step % 10 == 0:
+            after, length = rng.randrange(20_000), rng.randint(0, 90)
+            assert free.earliest(after, length) == brute_earliest(busy, after, length)
+    assert len(free) > 2 * BLOCK  # enough intervals to spread over several blocks
+    gaps = list(free)
+    assert gaps == sorted(gaps) and all(e < s for (_, e), (s, _) in zip(gaps, gaps[1:]))
+
+
+def test_long_gaps_found_across_many_blocks():
+    # Gaps of 1-5 minutes, with a few long ones spread over about 150 blocks
+    rng = random.Random(3)
+    busy, position = [], 0
+    for _ in range(10_000):
+        gap = rng.randint(30, 200) if rng.random() < 0.002 else rng.randint(1, 5)
+        busy.append((position + gap, position + gap + 10))
+        position += gap + 10
+    free = FreeIntervals(busy)
+    for _ in range(300):
+        after, length = rng.randrange(position), rng.randint(1, 200)
+        assert free.earliest(after, length) == brute_earliest(busy, after, length)
+    # Filling the long gaps one by one moves the answer along
+    while (found := free.earliest(0, 30)) is not None and found < position:
+        free.occupy(found, found + 30)
+        busy.append((found, found + 30))
+        assert free.earliest(0, 30) == brute_earliest(busy, 0, 30)
+
+
+def test_slot_finder_matches_brute_force():
+    rng = random.Random(7)
+    rooms = ["Red Room", "Blue Room", "Green Room"]
+    bookings = {}
+    for reservation_id in range(600):
+        at = START + timedelta(hours=rng.randrange(24 * 60))
+        bookings[reservation_id] = booking(reservation_id, rng.choice(rooms), at, rng.randint(0, 6))
+    finder = SlotFinder(bookings.values())
+
+    def check():
+        for _ in range(50):
+            room, hours = rng.choice(rooms), rng.randint(0, 8)
+            after = START + timedelta(minutes=rng.randrange(24 * 60 * 62))
+            busy = merge_busy(
+                (start := datetime.combine(r.date, r.time), start + timedelta(hours=r.duration))
+                for r in bookings.values()
+                if r.resource == room
+            )
+            expected = brute_earliest(busy, after, timedelta(hours=hours))
+            assert finder.earliest_slot(room, hours, after) == expected
+
+    check()
+    # Remove overlapping bookings and add new ones in the freed time
+    for reservation_id in rng.sample(sorted(bookings), 200):
+        assert finder.remove(reservation_id) == bookings.pop(reservation_id)
+    for reservation_id in range(600, 800):
+        room, hours = rng.choice(rooms), rng.randint(1, 4)
+        at = finder.earliest_slot(room, hours, START + timedelta(hours=rng.randrange(24 * 60)))
+        finder.add(bookings.setdefault(reservation_id, booking(reservation_id, room, at, hours)))
+    check()
+
+
+def test_end_of_calendar():
+    finder = SlotFinder([booking(1, "Red Room", datetime(2025, 1, 1, 10), 2)])
+    assert finder.earliest_slot("Red Room", 0, datetime.max) is None
+    assert finder.earliest_slot("Empty Room", 0, datetime.max) is None
+    last_hour = datetime.combine(date.max, time(23, 0))
+    assert finder.earliest_slot("Red Room", 1, last_hour) == last_hour
+    assert finder.earliest_slot("Red Room", 2, last_hour) is None
@@ -0,0 +1,40 @@
+import os
+import pathlib
+import shutil
+
+import reservation_db
+from reservation_db import ReservationDatabase
+
+SHIPPED = pathlib.Path(__file__).parent / "reservations.txt"
+
+
+def test_file_changed_during_load_is_not_current(tmp_path, monkeypatch):
+    reservation_file = tmp_path / "reservations.txt"
+    shutil.copy(SHIPPED, reservation_file)
+    read = reservation_db.iter_reservations
+
+    def append_while_reading(filename):
+        yield from read(filename)
+        with open(filename, "a", encoding="utf-8") as f:
+            f.write("\n")
+
+    monkeypatch.setattr(reservation_db, "iter_reservations", append_while_reading)
+    with ReservationDatabase() as db:
+        db.load_file(str(reservation_file))
+        assert not db.is_current(str(reservation_file))
+
+
+def test_touched_file_stays_current(tmp_path, monkeypatch):
+    reservation_file = tmp_path / "reservations.txt"
+    shutil.copy(SHIPPED, reservation_file)
+    with ReservationDatabase() as db:
+        db.load_file(str(reservation_file))
+        stat = os.stat(reservation_file)
+        os.utime(reservation_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert db.is_current(str(reservation_file))
+
+        def no_hashing(filename):
+            raise AssertionError("the stored mtime should have been refreshed")
+
+        monkeypatch.setattr(reservation_db, "file_digest", no_hashing)
+        assert db.is_current(str(reservation_file))
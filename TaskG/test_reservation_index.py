@@ -0,0 +1,99 @@
+import random
+import shutil
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from reservation_db import ReservationDatabase
+from reservation_index import ReservationIndex
+import task_g_class
+from task_g_class import Reservation
+
+ROOMS = ["Red Room", "Blue Room", "Green Room"]
+
+
+def random_reservation(rng, reservation_id):
+    return Reservation(
+        reservation_id, f"Guest {reservation_id}", "", "", date(2025, 1, 1) + timedelta(days=rng.randrange(30)),
+        time(rng.randint(7, 20), rng.choice((0, 30))), rng.randint(1, 5), 10.0, rng.random() < 0.5,
+        rng.choice(ROOMS), datetime(2024, 12, 1) + timedelta(minutes=rng.randrange(60 * 24 * 30)),
+    )
+
+
+def scan(reservations, resource=None, confirmed=None, start=None, end=None):
+    return sorted(
+        (
+            r for r in reservations
+            if (resource is None or r.resource == resource)
+            and (confirmed is None or r.confirmed == confirmed)
+            and (start is None or r.date >= start)
+            and (end is None or r.date <= end)
+        ),
+        key=lambda r: (r.date, r.time, r.reservation_id),
+    )
+
+
+def random_query(rng):
+    start = date(2025, 1, 1) + timedelta(days=rng.randrange(-2, 32))
+    return dict(
+        resource=rng.choice([None, *ROOMS, "No Room"]),
+        confirmed=rng.choice([None, True, False]),
+        start=rng.choice([None, start]),
+        end=rng.choice([None, start, start + timedelta(days=rng.randrange(10))]),
+    )
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_queries_match_a_full_scan(seed):
+    rng = random.Random(seed)
+    reservations = {i: random_reservation(rng, i) for i in range(500)}
+    index = ReservationIndex(reservations.values())
+
+    for reservation_id in range(500, 1500):
+        if rng.random() < 0.4:
+            r = reservations.pop(rng.choice(list(reservations)))
+            assert index.delete(r.reservation_id) == r
+        else:
+            reservations[reservation_id] = random_reservation(rng, reservation_id)
+            index.insert(reservations[reservation_id])
+        if reservation_id % 20 == 0:
+            query = random_query(rng)
+            assert index.query(**query) == scan(reservations.values(), **query)
+            day = query["start"] or date(2025, 1, 15)
+            expected = scan(reservations.values(), query["resource"], None, day, day)
+            assert index.on_date(day, query["resource"]) == expected
+    assert len(index) == len(reservations)
+    assert index.resources() == sorted({r.resource for r in reservations.values()})
+
+    start, end = datetime(2024, 12, 10), datetime(2024, 12, 20)
+    assert index.created_between(start, end) == sorted(
+        (r for r in reservations.values() if start <= r.created <= end), key=lambda r: (r.created, r.reservation_id)
+    )
+
+
+def test_matches_the_database_query():
+    rng = random.Random(5)
+    reservations = [random_reservation(rng, i) for i in range(500)]
+    index = ReservationIndex(reservations)
+    with ReservationDatabase() as db:
+        db.load(reservations)
+        for _ in range(50):
+            query = random_query(rng)
+            assert index.query(**query) == db.query(**query)
+
+
+def test_on_lookup_from_every_source(tmp_path, monkeypatch, capsys):
+    # --table and --sqlite write their snapshot and database next to the file
+    shutil.copy(task_g_class.path / "reservations.txt", tmp_path / "reservations.txt")
+    monkeypatch.setattr(task_g_class, "path", tmp_path)
+    expected = [
+        task_g_class.lookup_line(r)
+        for r in task_g_class.fetch_reservations(tmp_path / "reservations.txt")
+        if r.date == date(2025, 10, 22) and r.resource == "Red Room"
+    ]
+    assert expected
+    outputs = []
+    for source in ([], ["--table"], ["--sqlite"]):
+        task_g_class.main(["--on", "2025-10-22", "--resource", "Red Room", *source])
+        outputs.append(capsys.readouterr().out.splitlines())
+    assert outputs == [expected] * 3
@@ -0,0 +1,6 @@
+"""
+Modules shared by the Task folders
+
+Each Task program puts the repository root on sys.path and imports these
+as shared.<module>, so every folder uses the same copy.
+"""
@@ -0,0 +1,198 @@
+"""
+Timing and memory instrumentation for the report programs
+
+Instrumentation is off unless the REPORT_PROFILE environment variable is set
+or the program is started with --profile. Both take a comma-separated list
+of modes:
+
+ timing   | wall time and call count of every stage, plus counters
+ memory   | peak traced memory of every stage (tracemalloc, slower)
+ cprofile | the functions with the highest cumulative time (cProfile)
+
+"1", "on" or a bare --profile mean "timing,memory". When enabled, a JSON
+summary is written to stderr at the end of the run, or to the file named by
+REPORT_PROFILE_FILE. When disabled, stages and counters cost almost nothing.
+
+Usage in a main:
+
+ prof = Instrumentation.from_args(args.profile)
+ with prof.run():
+     with prof.stage("read"):
+         rows = read_data(filename)
+     prof.count("rows", len(rows))
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterator
+from contextlib import contextmanager
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+ENV_VAR = "REPORT_PROFILE"
+FILE_ENV_VAR = "REPORT_PROFILE_FILE"
+MODES = ("timing", "memory", "cprofile")
+DEFAULT_MODES = "timing,memory"
+TOP_FUNCTIONS = 15
+
+def parse_modes(value: str | None) -> set[str]:
+    """Turns a REPORT_PROFILE / --profile value into a set of modes."""
+    if not value or value.strip().lower() in ("0", "off", "false", "no"):
+        return set()
+    if value.strip().lower() in ("1", "on", "true", "yes"):
+        value = DEFAULT_MODES
+    modes = {mode.strip().lower() for mode in value.split(",") if mode.strip()}
+    unknown = modes.difference(MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode(s): {', '.join(sorted(unknown))} (use {', '.join(MODES)})")
+    return modes | {"timing"}
+
+
+def profile_value(value: str) -> str:
+    """argparse type of --profile: returns the value once parse_modes accepts it."""
+    try:
+        parse_modes(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def add_profile_argument(parser: argparse.ArgumentParser) -> None:
+    """Adds the --profile [MODES] option to a program's argument parser."""
+    parser.add_argument(
+        "--profile", nargs="?", const=DEFAULT_MODES, default=None, metavar="MODES", type=profile_value,
+        help=f"write a JSON timing summary to stderr; MODES is a comma list of {', '.join(MODES)}",
+    )
+
+
+class Instrumentation:
+    """Collects per-stage timings, peak memory and counters for one run."""
+
+    def __init__(self, modes: set[str] | None = None) -> None:
+        self.modes = set(modes or ())
+        self.enabled = bool(self.modes)
+        self.stages: dict[str, dict[str, float]] = {}
+        self.counters: dict[str, int] = {}
+        self._open: list[list[Any]] = []  # [name, started, peak bytes] of the active stages
+        self._profiler: cProfile.Profile | None = None
+
+    @classmethod
+    def from_args(cls, flag: str | None = None) -> Instrumentation:
+        """
+        Builds the instrumentation from --profile, falling back to REPORT_PROFILE.
+        An invalid REPORT_PROFILE is reported on stderr and ignored.
+        """
+        if flag is not None:
+            return cls(parse_modes(flag))
+        value = os.environ.get(ENV_VAR)
+        try:
+            return cls(parse_modes(value))
+        except ValueError as e:
+            print(f"Ignoring {ENV_VAR}={value!r}: {e}", file=sys.stderr)
+            return cls()
+
+    @contextmanager
+    def run(self) -> Iterator[Instrumentation]:
+        """Wraps a whole program run and writes the summary when it ends."""
+        if not self.enabled:
+            yield self
+            return
+        own_tracing = "memory" in self.modes and not tracemalloc.is_tracing()
+        if own_tracing:
+            tracemalloc.start()
+        if "cprofile" in self.modes:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        try:
+            with self.stage("total"):
+                yield self
+        finally:
+            if self._profiler is not None:
+                self._profiler.disable()
+            self.emit()
+            if own_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as a stage. Repeated stages are added up."""
+        if not self.enabled:
+            yield
+            return
+        memory = "memory" in self.modes and tracemalloc.is_tracing()
+        if memory:
+            self._close_peak()
+        frame = [name, time.perf_counter(), 0]
+        self._open.append(frame)
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - frame[1]
+            if memory:
+                self._close_peak()
+            self._open.pop()
+            stats = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            stats["seconds"] += seconds
+            stats["calls"] += 1
+            if memory:
+                stats["peak_bytes"] = max(stats.get("peak_bytes", 0), frame[2])
+
+    def _close_peak(self) -> None:
+        # Credits the peak since the last reset to every open stage, so nested
+        # stages and their parents all see it
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._open:
+            frame[2] = max(frame[2], peak)
+        tracemalloc.reset_peak()
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Adds n to a counter, e.g. the number of rows read."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict[str, Any]:
+        """Returns the collected figures as a JSON-friendly dict."""
+        result: dict[str, Any] = {
+            "program": os.path.basename(sys.argv[0]),
+            "modes": sorted(self.modes),
+            "stages": {
+                name: {key: round(value, 6) if key == "seconds" else value for key, value in stats.items()}
+                for name, stats in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+        if "memory" in self.modes and tracemalloc.is_tracing():
+            result["peak_bytes"] = max((s.get("peak_bytes", 0) for s in self.stages.values()), default=0)
+        if self._profiler is not None:
+            result["functions"] = self._top_functions()
+        return result
+
+    def _top_functions(self) -> list[dict[str, Any]]:
+        stats = pstats.Stats(self._profiler).stats  # type: ignore[attr-defined]
+        rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+        return [
+            {
+                "function": f"{os.path.basename(file)}:{line}({func})",
+                "calls": calls,
+                "total_seconds": round(total, 6),
+                "cumulative_seconds": round(cumulative, 6),
+            }
+            for (file, line, func), (_, calls, total, cumulative, _) in rows
+        ]
+
+    def emit(self) -> None:
+        """Writes the summary as JSON to REPORT_PROFILE_FILE or stderr."""
+        text = json.dumps(self.summary(), indent=2, ensure_ascii=False)
+        target = os.environ.get(FILE_ENV_VAR)
+        if target:
+            with open(target, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text, file=sys.stderr)
@@ -0,0 +1,327 @@
+"""
+Compressed columnar files for semicolon-separated meter exports
+
+A store file (.mcol) holds the columns of a week*.csv or 2025.csv export:
+
+ header   | magic, rows, column count, flags
+ columns  | kind, format details, name length and payload length of each column
+ names    | the UTF-8 column names from the CSV header
+ payload  | the zlib-compressed array bytes of each column, in the same order
+
+Column kinds:
+
+ t | ISO timestamps: local wall clock as int64 microseconds since 1970-01-01,
+   |   followed by the int32 UTC offset in seconds when the column has one
+ i | integers as int64 (the Wh columns of the week files)
+ f | decimals as float64 with their separator and number of decimals,
+   |   followed by the uint8 number of decimals of every value when they differ
+ s | anything else, as newline-separated UTF-8 text
+
+Every value is checked to format back to exactly the text it came from, so
+a store converts back to the same CSV file byte for byte (fields that would
+need csv quoting are not expected in these exports). Blank lines hold no
+row and are left out of the store.
+
+Neither conversion writes over its own input file.
+
+Usage:
+ python shared/meter_store.py export <file.csv> [file.mcol]
+ python shared/meter_store.py import <file.mcol> [file.csv]
+"""
+
+from __future__ import annotations
+
+from array import array
+from datetime import datetime, timedelta, timezone
+import csv
+import os
+import struct
+import sys
+import zlib
+
+MAGIC = b"MCOL0001"
+SUFFIX = ".mcol"
+HEADER = struct.Struct("<8sQIB")
+COLUMN = struct.Struct("<ccBBHQ")
+
+TRAILING_NEWLINE = 1  # header flag: the CSV ends with a line break
+CRLF = 2  # header flag: lines end with \r\n
+HAS_OFFSET = 1  # timestamp flag: values carry a UTC offset
+MIXED_PLACES = 2  # decimal flag: values carry their own number of decimals
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DAY_MICROSECONDS = 86_400_000_000
+TIMESPECS = ["hours", "minutes", "seconds", "milliseconds", "microseconds"]
+
+Column = array | list[str]
+
+
+class StoreColumn:
+    """One decoded column of a store and how its values were written in the CSV."""
+
+    def __init__(self, name: str, kind: str, values: Column, offsets: array | None = None,
+                 separator: str = "", digits: int = 0, places: array | None = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.values = values
+        self.offsets = offsets  # UTC offsets in seconds, timestamps only
+        self.separator = separator  # "T" or " " for timestamps, "," or "." for decimals
+        self.digits = digits  # TIMESPECS position for timestamps, decimals for "f"
+        self.places = places  # decimals of each value, "f" columns whose values differ only
+
+    def texts(self) -> list[str]:
+        """Formats the values back to the strings of the CSV file."""
+        if self.kind == "s":
+            return list(self.values)
+        if self.kind == "i":
+            return [str(v) for v in self.values]
+        if self.kind == "f":
+            if self.places is None:
+                text = [f"{v:.{self.digits}f}" for v in self.values]
+            else:
+                text = [f"{v:.{places}f}" for v, places in zip(self.values, self.places)]
+            return [t.replace(".", ",") for t in text] if self.separator == "," else text
+        return [ts.isoformat(self.separator, TIMESPECS[self.digits]) for ts in self.datetimes()]
+
+    def datetimes(self) -> list[datetime]:
+        """Returns the timestamps as datetimes, aware when the CSV had offsets."""
+        local = [EPOCH + timedelta(microseconds=us) for us in self.values]
+        if self.offsets is None:
+            return local
+        zones: dict[int, timezone] = {}
+        for seconds in set(self.offsets):
+            zones[seconds] = timezone(timedelta(seconds=seconds))
+        return [ts.replace(tzinfo=zones[seconds]) for ts, seconds in zip(local, self.offsets)]
+
+    def day_ordinals(self) -> array:
+        """Returns the date ordinal of each local timestamp."""
+        return array("i", [EPOCH_ORDINAL + us // DAY_MICROSECONDS for us in self.values])
+
+
+class MeterTable:
+    """The columns of one store file, in CSV column order."""
+
+    def __init__(self, columns: list[StoreColumn], rows: int, flags: int = 0) -> None:
+        self.columns = columns
+        self.rows = rows
+        self.flags = flags  # TRAILING_NEWLINE and CRLF
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, name: str) -> StoreColumn:
+        for column in self.columns:
+            if column.name == name:
+                return column
+        raise KeyError(name)
+
+    def names(self) -> list[str]:
+        return [column.name for column in self.columns]
+
+    def days(self) -> array:
+        """Date ordinals of the first column, which holds the timestamps."""
+        first = self.columns[0]
+        if first.kind != "t":
+            raise ValueError(f"First column {first.name!r} does not hold timestamps")
+        return first.day_ordinals()
+
+    def text_rows(self) -> list[list[str]]:
+        """Returns the header and all rows as strings, like csv.reader would."""
+        return [self.names(), *map(list, zip(*(column.texts() for column in self.columns)))]
+
+
+def _timestamp_column(name: str, texts: list[str]) -> StoreColumn | None:
+    first = texts[0]
+    if len(first) < 11 or first[10] not in "T ":
+        return None
+    separator = first[10]
+    try:
+        stamps = [datetime.fromisoformat(t) for t in texts]
+    except ValueError:
+        return None
+    aware = stamps[0].tzinfo is not None
+    if any((ts.tzinfo is not None) != aware for ts in stamps):
+        return None
+    for digits, spec in enumerate(TIMESPECS):
+        if stamps[0].isoformat(separator, spec) == first:
+            break
+    else:
+        return None
+    if any(ts.isoformat(separator, spec) != t for ts, t in zip(stamps, texts)):
+        return None
+
+    step = timedelta(microseconds=1)
+    values = array("q", [(ts.replace(tzinfo=None) - EPOCH) // step for ts in stamps])
+    offsets = array("i", [int(ts.utcoffset().total_seconds()) for ts in stamps]) if aware else None
+    return StoreColumn(name, "t", values, offsets, separator, digits)
+
+
+def _integer_column(name: str, texts: list[str]) -> StoreColumn | None:
+    try:
+        values = array("q", [int(t) for t in texts])
+    except (ValueError, OverflowError):
+        return None
+    column = StoreColumn(name, "i", values)
+    return column if column.texts() == texts else None
+
+
+def _decimal_column(name: str, texts: list[str]) -> StoreColumn | None:
+    separator = "," if any("," in t for t in texts) else "."
+    try:
+        values = array("d", [float(t.replace(",", ".")) for t in texts])
+        places = array("B", [len(t) - 1 - t.rfind(separator) if separator in t else 0 for t in texts])
+    except (ValueError, OverflowError):
+        return None
+    digits = places[0]
+    if places.count(digits) == len(places):
+        places = None
+    column = StoreColumn(name, "f", values, separator=separator, digits=digits, places=places)
+    return column if column.texts() == texts else None
+
+
+def to_column(name: str, texts: list[str]) -> StoreColumn:
+    """Picks the most compact kind that reproduces every text of the column."""
+    if texts:
+        for build in (_timestamp_column, _integer_column, _decimal_column):
+            column = build(name, texts)
+            if column is not None:
+                return column
+    return StoreColumn(name, "s", texts)
+
+
+def read_csv_table(csv_file: str) -> MeterTable:
+    """Reads a semicolon-separated export into a MeterTable, skipping blank lines."""
+    with open(csv_file, "r", encoding="utf-8", newline="") as f:
+        text = f.read()
+    lines = [row for row in csv.reader(text.splitlines(), delimiter=";") if row]
+    if not lines:
+        raise ValueError(f"{csv_file} has no header row")
+    header, rows = lines[0], lines[1:]
+    if any(len(row) != len(header) for row in rows):
+        raise ValueError(f"Every row of {csv_file} must have {len(header)} fields")
+    if rows:
+        columns = [to_column(name, list(texts)) for name, texts in zip(header, zip(*rows))]
+    else:
+        columns = [StoreColumn(name, "s", []) for name in header]
+    flags = (TRAILING_NEWLINE if text.endswith("\n") else 0) | (CRLF if "\r\n" in text else 0)
+    return MeterTable(columns, len(rows), flags)
+
+
+def write_store(table: MeterTable, store_file: str) -> None:
+    """Writes a MeterTable to a store file, replacing it atomically."""
+    descriptors = []
+    payloads = []
+    for column in table.columns:
+        flags = 0
+        if column.kind == "s":
+            data = "\n".join(column.values).encode("utf-8")
+        else:
+            data = column.values.tobytes()
+            if column.offsets is not None:
+                data += column.offsets.tobytes()
+                flags |= HAS_OFFSET
+            if column.places is not None:
+                data += column.places.tobytes()
+                flags |= MIXED_PLACES
+        payload = zlib.compress(data, 6)
+        name = column.name.encode("utf-8")
+        descriptors.append(COLUMN.pack(
+            column.kind.encode(), (column.separator or "\0").encode(), column.digits, flags, len(name), len(payload)
+        ) + name)
+        payloads.append(payload)
+
+    tmp = f"{store_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, table.rows, len(descriptors), table.flags))
+        f.writelines(descriptors)
+        f.writelines(payloads)
+    os.replace(tmp, store_file)
+
+
+def read_store(store_file: str) -> MeterTable:
+    """Reads a store file written by write_store."""
+    with open(store_file, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{store_file} is not a meter store file")
+    _, rows, count, flags = HEADER.unpack_from(data, 0)
+
+    offset = HEADER.size
+    layout = []
+    for _ in range(count):
+        kind, separator, digits, column_flags, name_len, nbytes = COLUMN.unpack_from(data, offset)
+        offset += COLUMN.size
+        name = data[offset:offset + name_len].decode("utf-8")
+        offset += name_len
+        layout.append((name, kind.decode(), separator.decode().strip("\0"), digits, column_flags, nbytes))
+
+    columns = []
+    for name, kind, separator, digits, column_flags, nbytes in layout:
+        raw = zlib.decompress(data[offset:offset + nbytes])
+        offset += nbytes
+        offsets = None
+        places = None
+        if kind == "s":
+            values: Column = raw.decode("utf-8").split("\n") if rows else []
+        else:
+            values = array("d" if kind == "f" else "q")
+            values.frombytes(raw[:rows * 8])
+            if kind == "t" and column_flags & HAS_OFFSET:
+                offsets = array("i")
+                offsets.frombytes(raw[rows * 8:])
+            if kind == "f" and column_flags & MIXED_PLACES:
+                places = array("B", raw[rows * 8:])
+        if any(part is not None and len(part) != rows for part in (values, offsets, places)):
+            raise ValueError(f"Column {name!r} of {store_file} is truncated")
+        columns.append(StoreColumn(name, kind, values, offsets, separator, digits, places))
+    return MeterTable(columns, rows, flags)
+
+
+def write_csv_table(table: MeterTable, csv_file: str) -> None:
+    """Writes a MeterTable back to a semicolon-separated export."""
+    newline = "\r\n" if table.flags & CRLF else "\n"
+    text = newline.join(";".join(row) for row in table.text_rows())
+    with open(csv_file, "w", encoding="utf-8", newline="") as f:
+        f.write(text + newline if table.flags & TRAILING_NEWLINE else text)
+
+
+def is_store(filename: str | os.PathLike) -> bool:
+    return os.fspath(filename).endswith(SUFFIX)
+
+
+def _check_output(source: str, target: str) -> None:
+    """Raises ValueError when target is the same file as source."""
+    if os.path.realpath(source) == os.path.realpath(target) or (
+        os.path.exists(target) and os.path.samefile(source, target)
+    ):
+        raise ValueError(f"Refusing to overwrite the input file {source}")
+
+
+def export_csv(csv_file: str, store_file: str | None = None) -> str:
+    """Converts a CSV export to a store file and returns its name."""
+    store_file = store_file or os.path.splitext(csv_file)[0] + SUFFIX
+    _check_output(csv_file, store_file)
+    write_store(read_csv_table(csv_file), store_file)
+    return store_file
+
+
+def import_store(store_file: str, csv_file: str | None = None) -> str:
+    """Converts a store file back to a CSV export and returns its name."""
+    csv_file = csv_file or os.path.splitext(store_file)[0] + ".csv"
+    _check_output(store_file, csv_file)
+    write_csv_table(read_store(store_file), csv_file)
+    return csv_file
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) not in (2, 3) or args[0] not in ("export", "import"):
+        print(__doc__.rsplit("Usage:", 1)[1].rstrip())
+        sys.exit(2)
+    convert = export_csv if args[0] == "export" else import_store
+    print(convert(*args[1:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Binary snapshots of parsed reservation columns
+
+A snapshot stores typed columns in one file next to the source text file:
+
+ header   | magic, source mtime_ns, source size, source sha256, rows, column count
+ columns  | name, typecode and byte length of each column
+ payload  | the raw array bytes of each column, in the same order
+
+Number columns are array typecodes, "s" marks a column of strings stored as
+newline-separated UTF-8 (reservation fields never contain newlines).
+Snapshots are read through mmap and are ignored when the source has changed
+or any column does not hold exactly `rows` values.
+"""
+
+from __future__ import annotations
+
+from array import array
+import hashlib
+import mmap
+import os
+import struct
+
+MAGIC = b"RSNAP001"
+HEADER = struct.Struct("<8sqq32sQI")
+COLUMN = struct.Struct("<16scQ")
+
+Column = array | list[str]
+SourceKey = tuple[int, int, bytes]  # mtime_ns, size, sha256 of the source file
+
+
+def snapshot_path(source_file: str) -> str:
+    """Returns the snapshot file name used for a source file."""
+    return f"{source_file}.cache"
+
+
+def file_digest(filename: str) -> bytes:
+    """Returns the SHA-256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def source_key(source_file: str) -> SourceKey:
+    """
+    Returns the mtime, size and content hash of a file. Take the key before
+    reading the file: if it changes while it is read, the key describes the
+    older version and the snapshot is rejected later instead of trusted.
+    """
+    stat = os.stat(source_file)
+    return stat.st_mtime_ns, stat.st_size, file_digest(source_file)
+
+
+def write_snapshot(source_file: str, key: SourceKey, rows: int, columns: dict[str, Column]) -> None:
+    """
+    Writes the columns to the snapshot of source_file under the key taken
+    with source_key before the columns were read. The file is replaced
+    atomically.
+    """
+    mtime_ns, size, digest = key
+    payloads: list[tuple[str, bytes, bytes]] = []
+    for name, column in columns.items():
+        if isinstance(column, array):
+            payloads.append((name, column.typecode.encode(), column.tobytes()))
+        else:
+            payloads.append((name, b"s", "\n".join(column).encode("utf-8")))
+
+    target = snapshot_path(source_file)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, mtime_ns, size, digest, rows, len(payloads)))
+        for name, typecode, data in payloads:
+            f.write(COLUMN.pack(name.encode("ascii"), typecode, len(data)))
+        for _, _, data in payloads:
+            f.write(data)
+    os.replace(tmp, target)
+
+
+def read_snapshot(source_file: str) -> tuple[int, dict[str, Column]] | None:
+    """
+    Returns (rows, columns) from the snapshot of source_file, or None when the
+    snapshot is missing, unreadable or belongs to a different version of the source.
+    A snapshot whose mtime differs is still used if the content hash matches,
+    and its header then takes the new mtime so the next read skips the hash.
+    """
+    target = snapshot_path(source_file)
+    try:
+        stat = os.stat(source_file)
+        f = open(target, "rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+        with mm:
+            if len(mm) < HEADER.size:
+                return None
+            magic, mtime_ns, size, digest, rows, count = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                return None
+            touched = (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size)
+            if touched and (size != stat.st_size or digest != file_digest(source_file)):
+                return None
+
+            offset = HEADER.size
+            layout = []
+            for _ in range(count):
+                name, typecode, nbytes = COLUMN.unpack_from(mm, offset)
+                layout.append((name.rstrip(b"\0").decode("ascii"), typecode.decode(), nbytes))
+                offset += COLUMN.size
+
+            columns: dict[str, Column] = {}
+            for name, typecode, nbytes in layout:
+                if offset + nbytes > len(mm):
+                    return None
+                if typecode == "s":
+                    try:
+                        column = mm[offset:offset + nbytes].decode("utf-8").split("\n") if rows else []
+                    except UnicodeDecodeError:
+                        return None
+                else:
+                    try:
+                        column = array(typecode)
+                    except ValueError:  # not an array typecode
+                        return None
+                    if nbytes != rows * column.itemsize:
+                        return None
+                    column.frombytes(mm[offset:offset + nbytes])
+                if len(column) != rows:
+                    return None
+                columns[name] = column
+                offset += nbytes
+    if touched:
+        try:
+            with open(target, "r+b") as f:
+                f.write(HEADER.pack(MAGIC, stat.st_mtime_ns, size, digest, rows, count))
+        except OSError:
+            pass  # read-only location: the hash is checked again next time
+    return rows, columns
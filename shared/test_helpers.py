@@ -0,0 +1,49 @@
+from shared.helpers import Quarantine, parse_date
+
+LINE = (
+    "201|Moomin Valley|moomin@example.org|0509876543|2025-11-12|09:00|2|18.50|True|Forest Area 1"
+    "|2025-08-12 14:33:20\n"
+)
+
+
+def convert_counting(calls):
+    def convert(fields):
+        calls.append(fields[0])
+        return int(fields[0]), parse_date(fields[4].strip()).day, int(fields[6]), float(fields[7])
+    return convert
+
+
+def test_structurally_broken_lines_skip_the_converter():
+    fields = LINE.split("|")
+    broken = [
+        "|".join(fields[:3]),  # too few fields
+        "|".join(["x201", *fields[1:]]),
+        "|".join([*fields[:6], "two", *fields[7:]]),
+    ]
+    calls = []
+    quarantine = Quarantine()
+    assert list(quarantine.convert_lines([LINE, *broken], convert_counting(calls))) == [(201, 12, 2, 18.5)]
+    assert calls == ["201"]
+    assert [(n, reason.split(":")[0]) for n, reason, _ in quarantine.rejects] == [
+        (2, "expected 11 fields, found 3"),
+        (3, "reservationId"),
+        (4, "durationHours"),
+    ]
+
+
+def test_lines_passing_the_pre_check_are_still_checked():
+    fields = LINE.split("|")
+    calls = []
+    quarantine = Quarantine()
+    lines = [
+        "|".join([" 202", *fields[1:]]),  # fails the pre-check but converts
+        "|".join([*fields[:4], "2025-13-01", *fields[5:]]),  # passes it but does not convert
+        "\n",
+        "|".join([*fields[:7], "12,50", *fields[8:]]),
+    ]
+    converted = list(quarantine.convert_lines(lines, convert_counting(calls)))
+    assert converted == [(202, 12, 2, 18.5)]
+    assert [(n, reason.split(":")[0]) for n, reason, _ in quarantine.rejects] == [
+        (2, "reservationDate"),
+        (4, "price"),
+    ]
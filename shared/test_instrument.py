@@ -0,0 +1,29 @@
+import argparse
+
+import pytest
+
+from shared.instrument import ENV_VAR, Instrumentation, add_profile_argument
+
+
+def parse(argv):
+    parser = argparse.ArgumentParser()
+    add_profile_argument(parser)
+    return parser.parse_args(argv)
+
+
+def test_profile_modes_are_validated_by_argparse(capsys):
+    assert parse(["--profile", "memory"]).profile == "memory"
+    assert parse(["--profile"]).profile == "timing,memory"
+    with pytest.raises(SystemExit):
+        parse(["--profile", "bogus"])
+    assert "Unknown profile mode(s): bogus" in capsys.readouterr().err
+
+
+def test_invalid_environment_value_is_ignored(monkeypatch, capsys):
+    monkeypatch.setenv(ENV_VAR, "bogus")
+    prof = Instrumentation.from_args(None)
+    assert not prof.enabled
+    assert "Ignoring REPORT_PROFILE='bogus'" in capsys.readouterr().err
+
+    monkeypatch.setenv(ENV_VAR, "cprofile")
+    assert Instrumentation.from_args(None).modes == {"cprofile", "timing"}
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from shared.meter_store import export_csv, import_store, read_store
+
+TEXT = "Time;Consumption\n2025-01-01T00:00:00;0,5\n\n2025-01-01T01:00:00;0,7\n\n"
+
+
+def test_blank_lines_are_skipped(tmp_path):
+    csv_file = tmp_path / "week.csv"
+    csv_file.write_text(TEXT, encoding="utf-8")
+    store = export_csv(str(csv_file))
+    back = import_store(store, str(tmp_path / "back.csv"))
+    with open(back, encoding="utf-8") as f:
+        assert f.read() == TEXT.replace("\n\n", "\n")
+
+
+def test_output_may_not_be_the_input(tmp_path):
+    csv_file = tmp_path / "week.csv"
+    csv_file.write_text(TEXT, encoding="utf-8")
+    os.symlink(csv_file, tmp_path / "link.csv")
+    with pytest.raises(ValueError, match="overwrite"):
+        export_csv(str(csv_file), str(tmp_path / "link.csv"))
+    os.rename(export_csv(str(csv_file)), tmp_path / "misnamed.csv")
+    with pytest.raises(ValueError, match="overwrite"):
+        import_store(str(tmp_path / "misnamed.csv"))
+    assert csv_file.read_text(encoding="utf-8") == TEXT
+
+
+def test_decimals_with_different_places_are_stored_as_numbers(tmp_path):
+    text = "Time;Consumption;Temperature\n2025-01-01T00:00:00;0,5;1.25\n2025-01-01T01:00:00;12;-0.125\n"
+    csv_file = tmp_path / "week.csv"
+    csv_file.write_text(text, encoding="utf-8")
+    store = export_csv(str(csv_file))
+    table = read_store(store)
+    assert [table[name].kind for name in ("Consumption", "Temperature")] == ["f", "f"]
+    assert list(table["Consumption"].values) == [0.5, 12.0]
+    back = import_store(store, str(tmp_path / "back.csv"))
+    with open(back, encoding="utf-8") as f:
+        assert f.read() == text
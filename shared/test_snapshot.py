@@ -0,0 +1,47 @@
+from array import array
+import os
+
+import pytest
+
+from shared import snapshot
+from shared.snapshot import HEADER, read_snapshot, snapshot_path, source_key, write_snapshot
+
+COLUMNS = {"ids": array("q", [1, 2, 3]), "names": ["a", "b", "c"]}
+
+
+def test_touched_source_refreshes_the_header(tmp_path, monkeypatch):
+    source = tmp_path / "reservations.txt"
+    source.write_text("three rows\n", encoding="utf-8")
+    write_snapshot(str(source), source_key(str(source)), 3, COLUMNS)
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert read_snapshot(str(source)) == (3, COLUMNS)  # same content under a new mtime
+    with open(snapshot_path(str(source)), "rb") as f:
+        assert HEADER.unpack(f.read(HEADER.size))[1] == os.stat(source).st_mtime_ns
+
+    def no_hashing(filename):
+        raise AssertionError("the refreshed header should match without hashing")
+
+    monkeypatch.setattr(snapshot, "file_digest", no_hashing)
+    assert read_snapshot(str(source)) == (3, COLUMNS)
+
+
+def test_source_changed_while_read_is_not_cached(tmp_path):
+    source = tmp_path / "reservations.txt"
+    source.write_text("three rows\n", encoding="utf-8")
+    key = source_key(str(source))
+    source.write_text("four rows!!\n", encoding="utf-8")  # same size, written during the parse
+    write_snapshot(str(source), key, 3, COLUMNS)
+    assert read_snapshot(str(source)) is None
+
+
+@pytest.mark.parametrize("columns", [
+    {"ids": array("q", [1, 2]), "names": ["a", "b", "c"]},
+    {"ids": array("q", [1, 2, 3]), "names": ["a", "b"]},
+])
+def test_columns_must_hold_every_row(tmp_path, columns):
+    source = tmp_path / "reservations.txt"
+    source.write_text("three rows\n", encoding="utf-8")
+    write_snapshot(str(source), source_key(str(source)), 3, columns)
+    assert read_snapshot(str(source)) is None